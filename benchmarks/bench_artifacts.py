@@ -0,0 +1,88 @@
+"""Cold-start time and memory of the pickle/CSV loaders vs the artifact store.
+
+    python -m benchmarks.bench_artifacts --runs 5
+
+Each run loads everything the three pages need in a fresh interpreter and
+reads ``/proc/self/status``.  ``anon`` is private memory every worker pays
+for; ``file`` is mapped page cache shared between workers.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PRELUDE = """
+import time, json, os
+import numpy as np, pandas as pd
+def status():
+    fields = {}
+    with open('/proc/self/status') as f:
+        for line in f:
+            key, _, value = line.partition(':')
+            if key in ('VmRSS', 'RssAnon', 'RssFile'):
+                fields[key] = int(value.split()[0]) / 1024
+    return fields
+before = status()
+start = time.perf_counter()
+"""
+
+PICKLE_PATH = """
+import pickle
+with open('pages/df.pkl', 'rb') as f:
+    df = pickle.load(f)
+new_df = pd.read_csv('pages/Analysis_datasets/data_viz1.csv')
+with open('pages/Analysis_datasets/feature_text.pkl', 'rb') as f:
+    feature_text = pickle.load(f)
+location_df = pd.read_pickle('pages/Recommender_System/location_distance.pkl')
+sims = [pd.read_pickle(f'pages/Recommender_System/cosine_sim{i}.pkl') for i in (1, 2, 3)]
+touched = sum(float(np.asarray(s).sum()) for s in sims) + float(location_df.to_numpy().sum())
+"""
+
+STORE_PATH = """
+from real_estate.artifacts import ArtifactStore
+from real_estate.recommender_index import FeatureIndex
+from real_estate.spatial import GeoGrid, NearbyLists
+store = ArtifactStore()
+df = store.table('predictor_inputs')
+new_df = store.table('dashboard')
+feature_text = store.text('feature_text')
+places = store.table('places')
+geo = GeoGrid.load(store, 'recommender/geo')
+nearby = NearbyLists.load(store, 'recommender/nearby')
+index = FeatureIndex.load(store)
+touched = sum(float(np.sum(getattr(b, 'data', b))) for b in index.blocks) + float(geo.keys.sum()) + float(nearby.meters.sum())
+"""
+
+EPILOGUE = """
+elapsed = time.perf_counter() - start
+after = status()
+print(json.dumps({'seconds': elapsed, **{k: after[k] - before.get(k, 0) for k in after}}))
+"""
+
+
+def measure(body):
+    code = PRELUDE + body + EPILOGUE
+    out = subprocess.run([sys.executable, '-c', code], cwd=REPO_DIR, check=True,
+                         capture_output=True, text=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    for label, body in (('pickle/csv', PICKLE_PATH), ('store', STORE_PATH)):
+        runs = [measure(body) for _ in range(args.runs)]
+        seconds = statistics.median(r['seconds'] for r in runs)
+        anon = statistics.median(r.get('RssAnon', 0) for r in runs)
+        shared = statistics.median(r.get('RssFile', 0) for r in runs)
+        print(f"{label:<11} load={seconds * 1e3:8.1f} ms  anon={anon:7.1f} MB  file={shared:7.1f} MB")
+
+
+if __name__ == '__main__':
+    main()
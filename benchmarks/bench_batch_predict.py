@@ -0,0 +1,58 @@
+"""Chunked bulk valuation against one-shot ``predict_batch``, on adversarial row orders.
+
+    REAL_ESTATE_PRICE_PIPELINE=pipeline.pkl python -m benchmarks.bench_batch_predict --chunksize 500
+
+``read_csv`` infers dtypes per chunk, so with the training CSV sorted by a
+categorical column some chunks see it as all numeric (``balcony`` 0-3
+before '3+').  For every ``CATEGORICAL_COLUMNS`` sort order the file is
+scored by ``batch_predict.run`` in chunks of ``--chunksize`` rows, into a
+CSV and into a Parquet file (whose schema must hold across chunks), and
+the output is compared with ``predict_batch`` over the whole frame; the
+script exits non-zero when a run raises or any price differs.
+"""
+import argparse
+import os
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from real_estate.batch_predict import PREDICTION_COLUMN, run
+from real_estate.price_model import CATEGORICAL_COLUMNS, TRAINING_CSV, predict_batch
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--csv', default=TRAINING_CSV)
+    parser.add_argument('--chunksize', type=int, default=500)
+    parser.add_argument('--workers', type=int, default=1)
+    args = parser.parse_args()
+
+    df = pd.read_csv(args.csv)
+    df['row'] = np.arange(len(df))
+    expected = predict_batch(df)
+
+    ok = True
+    print(f"{'sorted by':<16} {'output':<8} {'rows':>7} {'rows/s':>9} {'max |diff|':>11}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for column in ['row'] + [c for c in CATEGORICAL_COLUMNS if c in df.columns]:
+            source = os.path.join(tmp, 'in.csv')
+            df.sort_values(column, kind='stable').to_csv(source, index=False)
+            for output, read in (('csv', pd.read_csv), ('parquet', pd.read_parquet)):
+                scored = os.path.join(tmp, f'out.{output}')
+                try:
+                    rows, seconds = run(source, scored, args.chunksize, args.workers)
+                except Exception as e:
+                    ok = False
+                    print(f"{column:<16} {output:<8} FAILED: {type(e).__name__}: {e}")
+                    continue
+                out = read(scored).sort_values('row')
+                diff = float(np.max(np.abs(out[PREDICTION_COLUMN].to_numpy() - expected)))
+                ok &= rows == len(df) and diff <= 1e-9
+                print(f"{column:<16} {output:<8} {rows:>7,} {rows / seconds:>9,.0f} {diff:>11.3g}")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
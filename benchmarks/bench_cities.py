@@ -0,0 +1,95 @@
+"""Memory and latency of serving many cities through the ``CityModels`` LRU.
+
+    REAL_ESTATE_MODEL_CACHE=... python -m benchmarks.bench_cities --cities 8 --max-cities 2 4 8
+
+Copies of the Gurgaon store stand in for ``--cities`` cities, each with its
+own registry entry for the price pipeline.  For every ``--max-cities`` a
+fresh interpreter replays the same skewed request stream (city ``i`` drawn
+with weight ``1 / (i + 1)``), each request predicting one price and asking
+for five recommendations, and reports the resident memory it ends with,
+city loads and evictions, and request latency.
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+from real_estate.artifacts import DEFAULT_ROOT, REPO_CITY
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+WORKLOAD = """
+import json, os, sys, time
+import numpy as np
+from real_estate.cities import CityModels
+from real_estate.prediction_cache import cached_predict
+from real_estate.price_model import FEATURE_COLUMNS
+
+artifacts_dir, n_cities, max_cities, n_requests = sys.argv[1], int(sys.argv[2]), int(sys.argv[3]), int(sys.argv[4])
+names = [f'city{i:02d}' for i in range(n_cities)]
+models = CityModels(artifacts_dir, max_cities)
+rng = np.random.default_rng(0)
+weights = 1 / np.arange(1, n_cities + 1)
+stream = rng.choice(n_cities, n_requests, p=weights / weights.sum())
+latencies, peak = [], 0
+for i, c in enumerate(stream):
+    start = time.perf_counter()
+    city = models.get(names[c])
+    inputs = city.store.table('predictor_inputs')
+    row = inputs.iloc[[i % len(inputs)]][FEATURE_COLUMNS].to_numpy(dtype=object).tolist()
+    predictor = city.predictor
+    cached_predict(row, predictor.pipeline, predictor.sha256, predictor.cache)
+    recommender = city.recommender
+    recommender.index.top_k(i % recommender.index.size, 5)
+    latencies.append(time.perf_counter() - start)
+    with open('/proc/self/status') as f:
+        rss = next(int(line.split()[1]) for line in f if line.startswith('VmRSS')) / 1024
+    peak = max(peak, rss)
+latencies = np.array(latencies) * 1e3
+print(json.dumps({'peak_mb': peak, 'rss_mb': rss, 'loads': models.loads, 'evictions': models.evictions,
+                  'p50_ms': float(np.median(latencies)), 'p99_ms': float(np.percentile(latencies, 99)),
+                  'mean_ms': float(latencies.mean())}))
+"""
+
+
+def make_cities(artifacts_dir, n):
+    """``n`` copies of the repository store, each with its pipeline registered."""
+    from real_estate.intervals import load_intervals
+    from real_estate.model_registry import PRICE_PIPELINE, registry
+
+    load_intervals()        # calibrates the shared model if needed
+    blob = registry.resolve(PRICE_PIPELINE)[0]
+    env = {}
+    for i in range(n):
+        name = f'city{i:02d}'
+        shutil.copytree(DEFAULT_ROOT, os.path.join(artifacts_dir, name))
+        env[f'REAL_ESTATE_PRICE_PIPELINE_{name.upper()}'] = blob
+    return env
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--cities', type=int, default=8)
+    parser.add_argument('--max-cities', type=int, nargs='+', default=[2, 4, 8])
+    parser.add_argument('--requests', type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{args.cities} copies of the {REPO_CITY} store, {args.requests} requests")
+    print(f"{'max cities':>10} {'peak MB':>8} {'end MB':>8} {'loads':>6} {'evicted':>8} "
+          f"{'p50 ms':>8} {'p99 ms':>8} {'mean ms':>8}")
+    with tempfile.TemporaryDirectory() as artifacts_dir:
+        env = {**os.environ, **make_cities(artifacts_dir, args.cities)}
+        for max_cities in args.max_cities:
+            out = subprocess.run([sys.executable, '-c', WORKLOAD, artifacts_dir, str(args.cities),
+                                  str(max_cities), str(args.requests)],
+                                 cwd=REPO_DIR, env=env, check=True, capture_output=True, text=True).stdout
+            r = json.loads(out.strip().splitlines()[-1])
+            print(f"{max_cities:>10} {r['peak_mb']:>8.0f} {r['rss_mb']:>8.0f} {r['loads']:>6} {r['evictions']:>8} "
+                  f"{r['p50_ms']:>8.2f} {r['p99_ms']:>8.0f} {r['mean_ms']:>8.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,192 @@
+"""Crawler throughput against a local fixture site.
+
+    python -m benchmarks.bench_crawler --search-pages 20 --per-page 25 --latency-ms 50 --error-rate 0.05
+
+The fixture serves 99acres-shaped search pages (``/flats-in-<city>-ffid-page-N``)
+and detail pages built from a deterministic generator.  It fails
+``--error-rate`` of the requests with HTTP 503, leaves the society heading
+off every 13th search tuple (the notebook skips those) and answers the
+``--blocked`` requests after the first 100 with a page without listings, as
+a blocked IP sees.
+
+The crawl is run in three sessions over the same state directory: one
+capped by ``max_pages``, one cancelled mid-flight, and one resuming to the
+end, and the shards are merged.  A sequential blocking loop timed on a
+sample, like the notebook's, is the baseline.  ``tests/test_crawler.py``
+checks that the merge holds every listing exactly once.
+"""
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from real_estate.crawler.crawl import crawl, search_urls
+from real_estate.crawler.frontier import SEARCH, Frontier
+from real_estate.crawler.shards import ShardWriter, merge_shards
+
+CITY = 'gurgaon'
+
+
+def listing(page, i, per_page):
+    n = page * per_page + i
+    return {
+        'id': f'P{n:07d}',
+        'property_name': f'{i % 4 + 1} BHK Flat in Sector {n % 115 + 1}',
+        'society': None if n % 13 == 0 else f'Society {n % 97}',
+        'price': f'{1 + n % 50 / 10:.1f} Cr',
+        'area': f'₹ {5000 + n % 9000:,}/sq.ft.',
+        'bedRoom': f'{i % 4 + 1} Bedrooms',
+        'furnishDetails': ['1 Fan', '2 Light'] if n % 2 else [],
+        'features': [f'Feature {k}' for k in range(n % 5)],
+        'nearbyLocations': ['Metro', f'School {n % 7}'],
+    }
+
+
+def search_html(page, per_page):
+    tuples = []
+    for i in range(per_page):
+        item = listing(page, i, per_page)
+        society = f'<div id="srp_tuple_society_heading">{item["society"]}</div>' if item['society'] else ''
+        tuples.append(f'<section data-hydration-on-demand="true"><a class="srpTuple__propertyName" '
+                      f'href="/property/{page}/{i}">{item["property_name"]}</a>{society}'
+                      f'<td id="srp_tuple_price_per_unit_area">{item["area"]}</td></section>')
+    return f'<html><body><div data-label="SEARCH">{"".join(tuples)}</div></body></html>'
+
+
+def detail_html(page, i, per_page):
+    item = listing(page, i, per_page)
+    furnish = ''.join(f'<li>{x}</li>' for x in item['furnishDetails'])
+    features = ''.join(f'<li>{x}</li>' for x in item['features'])
+    nearby = ''.join(f'<span class="NearByLocation__infoText">{x}</span>' for x in item['nearbyLocations'])
+    return (f'<html><body><span id="pdPrice2">{item["price"]}</span><span id="bedRoomNum">{item["bedRoom"]}</span>'
+            f'<div class="NearByLocation__tagWrap">{nearby}</div>'
+            + (f'<ul id="FurnishDetails">{furnish}</ul><ul id="features"></ul>' if furnish else '')
+            + f'<ul id="features">{features}</ul><span id="Prop_Id">{item["id"]}</span></body></html>')
+
+
+def expected_rows(pages, per_page):
+    return {item['id']: item for item in (listing(page, i, per_page) for page in pages for i in range(per_page))
+            if item['society']}
+
+
+async def start_fixture(per_page, latency, error_rate, blocked, seed=0):
+    from aiohttp import web
+
+    rng = random.Random(seed)
+    served = [0]
+
+    def gate():
+        served[0] += 1
+        if rng.random() < error_rate:
+            return web.Response(status=503)
+        if 100 < served[0] <= 100 + blocked:
+            return web.Response(text='<html><body>Access Denied</body></html>', content_type='text/html')
+        return None
+
+    async def search(request):
+        await asyncio.sleep(latency)
+        page = int(request.match_info['page'])
+        return gate() or web.Response(text=search_html(page, per_page), content_type='text/html')
+
+    async def detail(request):
+        await asyncio.sleep(latency)
+        page, i = int(request.match_info['page']), int(request.match_info['i'])
+        return gate() or web.Response(text=detail_html(page, i, per_page), content_type='text/html')
+
+    app = web.Application()
+    app.router.add_get(f'/flats-in-{CITY}-ffid-page-{{page}}', search)
+    app.router.add_get('/property/{page}/{i}', detail)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f'http://127.0.0.1:{port}'
+
+
+def sequential_pages_per_minute(base_url, per_page):
+    """The notebook loop without its sleeps: blocking fetch + parse, one page at a time."""
+    import requests
+
+    from real_estate.crawler.parse import parse_detail_page, parse_search_page
+
+    start, pages = time.perf_counter(), 0
+    url = f'{base_url}/flats-in-{CITY}-ffid-page-1'
+    for link, meta in parse_search_page(requests.get(url, timeout=10).text, url)[:20]:
+        parse_detail_page(requests.get(link, timeout=10).text, link, meta)
+        pages += 1
+    return (pages + 1) / (time.perf_counter() - start) * 60
+
+
+def session(state_dir, shard_rows):
+    frontier = Frontier(os.path.join(state_dir, 'frontier.sqlite'))
+    return frontier, ShardWriter(os.path.join(state_dir, 'shards'), frontier, shard_rows)
+
+
+async def run(args):
+    runner, base_url = await start_fixture(args.per_page, args.latency_ms / 1000, args.error_rate, args.blocked)
+    pages = range(1, args.search_pages + 1)
+    expected = expected_rows(pages, args.per_page)
+    total_pages = len(pages) + len(expected)
+    options = dict(rate=args.rate, backoff=0.05, retries=6)
+    pool = ProcessPoolExecutor(args.parse_workers) if args.parse_workers else None
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            first = True
+            for label in ('capped', 'cancelled', 'resumed'):
+                frontier, shards = session(tmp, args.shard_rows)
+                if first:
+                    frontier.add(search_urls(base_url, CITY, pages), SEARCH)
+                    first = False
+                job = crawl(frontier, shards, options, pool, args.concurrency,
+                            max_pages=total_pages // 3 if label == 'capped' else None,
+                            max_blocked=args.blocked + 1)
+                if label == 'cancelled':
+                    task = asyncio.ensure_future(job)
+                    await asyncio.sleep(args.cancel_after)
+                    task.cancel()
+                    try:
+                        await task
+                    except asyncio.CancelledError:
+                        pass
+                    print(f"{label}: cancelled after {args.cancel_after}s with {shards.buffered} rows buffered")
+                else:
+                    stats = await job
+                    print(f"{label}: {stats.summary()}")
+                frontier.close()
+
+            frontier, shards = session(tmp, args.shard_rows)
+            out = os.path.join(tmp, 'flats.parquet')
+            start = time.perf_counter()
+            rows = merge_shards(shards.paths(), out, os.path.join(tmp, 'flats.csv'))
+            print(f"merged {len(shards.paths())} shards, {rows} rows in {time.perf_counter() - start:.3f}s; "
+                  f"frontier {frontier.counts()}")
+            frontier.close()
+        baseline = await asyncio.to_thread(sequential_pages_per_minute, base_url, args.per_page)
+        print(f"sequential baseline: {baseline:.0f} pages/min")
+    finally:
+        if pool:
+            pool.shutdown()
+        await runner.cleanup()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--search-pages', type=int, default=20)
+    parser.add_argument('--per-page', type=int, default=25)
+    parser.add_argument('--latency-ms', type=float, default=50)
+    parser.add_argument('--error-rate', type=float, default=0.05)
+    parser.add_argument('--blocked', type=int, default=3, help="blocked answers after the first 100 requests")
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--rate', type=float, default=0, help="requests per second per host (0 = unlimited)")
+    parser.add_argument('--parse-workers', type=int, default=os.cpu_count())
+    parser.add_argument('--shard-rows', type=int, default=100)
+    parser.add_argument('--cancel-after', type=float, default=1.0)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == '__main__':
+    main()
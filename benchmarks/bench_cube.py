@@ -0,0 +1,79 @@
+"""Dashboard interaction cost: raw filter + groupby vs the sector cube.
+
+    python -m benchmarks.bench_cube --scales 1 10 100 300
+
+The listing table is replicated ``scale`` times with jittered prices and
+areas, and 5% of the areas and prices per sqft blanked.  Each interaction applies a price range and a sector selection, then
+computes the map's per-sector means and the key statistics, once on raw rows
+(the old page) and once on cube cells, and checks that both agree.
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from real_estate.artifacts import ArtifactStore
+from real_estate.cube import SectorCube
+
+MAP_COLUMNS = ['price', 'price_per_sqft', 'built_up_area', 'latitude', 'longitude']
+
+
+def synthetic(df, scale, seed=0):
+    rng = np.random.default_rng(seed)
+    out = pd.concat([df] * scale, ignore_index=True)
+    jitter = rng.uniform(0.9, 1.1, len(out))
+    out['price'] = (out['price'] * jitter).round(2)
+    out['built_up_area'] = out['built_up_area'] * jitter
+    # Missing measures, as in scraped listings, so means must skip NaN.
+    for column in ('price_per_sqft', 'built_up_area'):
+        out.loc[rng.random(len(out)) < 0.05, column] = np.nan
+    return out
+
+
+def raw_interaction(df, price_range, sectors):
+    filtered = df[df['price'].between(*price_range) & df['sector'].isin(sectors)]
+    means = filtered.groupby('sector').mean(numeric_only=True)[MAP_COLUMNS]
+    return (len(filtered), filtered['price'].mean(), filtered['price_per_sqft'].mean(),
+            filtered['bedRoom'].mode()[0], means)
+
+
+def cube_interaction(cube, price_range, sectors):
+    cells = cube.select(price_range, sectors)
+    means = cube.sector_means(cells)[MAP_COLUMNS]
+    stats = cube.key_stats(cells)
+    return stats['count'], stats['mean_price'], stats['mean_price_per_sqft'], stats['mode_bedroom'], means
+
+
+def timed(fn, *args, repeat=5):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scales', type=int, nargs='+', default=[1, 10, 100])
+    args = parser.parse_args()
+
+    base = ArtifactStore().table('dashboard')
+    sectors = list(pd.unique(base['sector']))[:25]
+    print(f"{'rows':>10} {'cells':>7} {'build s':>8} {'raw ms':>8} {'cube ms':>8}")
+    for scale in args.scales:
+        df = synthetic(base, scale)
+        start = time.perf_counter()
+        cube = SectorCube.from_listings(df)
+        build = time.perf_counter() - start
+        raw_s, raw = timed(raw_interaction, df, (1, 6), sectors)
+        cube_s, fast = timed(cube_interaction, cube, (1, 6), sectors)
+        # NaN measures (price_per_sqft, built_up_area) are skipped by both means.
+        assert raw[0] == fast[0] and np.allclose(raw[1:3], fast[1:3]) and raw[3] == fast[3], (raw[:4], fast[:4])
+        assert np.allclose(raw[4].to_numpy(), fast[4].to_numpy(), equal_nan=True), (raw[4] - fast[4]).abs().max()
+        print(f"{len(df):>10,} {len(cube.cube):>7,} {build:>8.2f} {raw_s * 1e3:>8.2f} {cube_s * 1e3:>8.2f}")
+
+
+if __name__ == '__main__':
+    main()
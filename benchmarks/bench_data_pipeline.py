@@ -0,0 +1,85 @@
+"""Full vs incremental runs of the data pipeline, with an equivalence check.
+
+    python -m benchmarks.bench_data_pipeline --scale 10 --delta 300
+
+``flats_cleaned2.csv`` is replicated ``--scale`` times with jittered prices
+(so every copy is a distinct listing) and its last ``--delta`` rows are held
+back.  The pipeline first runs over the base rows, as yesterday's build,
+then over everything, as today's scrape; a cold full build over everything
+is timed for comparison, and a no-op rerun must skip every stage.
+
+Incremental outputs must equal each stage applied in one pass to its whole
+input with the state the cache recorded, i.e. reusing cached rows never
+changes a result.
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from real_estate.data_pipeline import DEFAULT_SOURCE, StageCache, chain, fingerprints, load_source, run
+
+
+def synthetic(df, scale, seed=0):
+    rng = np.random.default_rng(seed)
+    out = pd.concat([df] * scale, ignore_index=True)
+    if scale > 1:
+        out['price'] = (out['price'] * rng.uniform(0.9, 1.1, len(out))).round(3)
+    return out
+
+
+def timed(label, *args, **kwargs):
+    start = time.perf_counter()
+    output, records = run(*args, verbose=False, **kwargs)
+    seconds = time.perf_counter() - start
+    summary = ', '.join(f"{r['stage']} {r['status']} {r['processed']}/{r['rows_in']}" for r in records)
+    print(f"{label:<12} {seconds:7.2f}s  {summary}")
+    return seconds, records
+
+
+def check_equivalence(root, source, start, target):
+    """Every stage's output equals a one-pass apply with the cached state."""
+    cache = StageCache(os.path.join(root, 'cache'))
+    df = load_source([source])
+    for stage in chain(start, target):
+        if stage.dedupe:
+            df = df.iloc[np.sort(np.unique(fingerprints(df), return_index=True)[1])]
+        expected = stage.apply(df.reset_index(drop=True), cache.meta(stage.name)['state']).reset_index(drop=True)
+        out = os.path.join(root, 'out', stage.output)
+        if out.endswith('.pkl'):
+            pd.testing.assert_frame_equal(pd.read_pickle(out), expected, check_dtype=False)
+        else:
+            with open(out) as f:
+                assert f.read() == expected.to_csv(index=False), f"{stage.name} output differs"
+        df = expected
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scale', type=int, default=10)
+    parser.add_argument('--delta', type=int, default=300, help="new listings in today's scrape")
+    args = parser.parse_args()
+
+    data = synthetic(pd.read_csv(DEFAULT_SOURCE), args.scale)
+    with tempfile.TemporaryDirectory() as tmp:
+        base, full = os.path.join(tmp, 'base.csv'), os.path.join(tmp, 'full.csv')
+        data.iloc[:-args.delta].to_csv(base, index=False)
+        data.to_csv(full, index=False)
+        print(f"{len(data):,} listings, {args.delta} new")
+
+        cold, _ = timed('cold full', [full], root=os.path.join(tmp, 'cold'))
+        root = os.path.join(tmp, 'incremental')
+        timed('yesterday', [base], root=root)
+        delta, _ = timed('today', [full], root=root)
+        noop, records = timed('no-op', [full], root=root)
+        assert all(r['status'] == 'cached' for r in records)
+        check_equivalence(root, full, 'features', 'predictor_inputs')
+        print(f"ok: incremental outputs match one-pass stages; delta run {cold / delta:.1f}x faster "
+              f"than a full rebuild, no-op {cold / noop:.0f}x")
+
+
+if __name__ == '__main__':
+    main()
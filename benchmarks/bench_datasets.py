@@ -0,0 +1,41 @@
+"""Memory of the page tables and cost of populating widget options.
+
+    python -m benchmarks.bench_datasets
+"""
+import os
+import time
+
+import pandas as pd
+
+from real_estate.artifacts import REPO_DIR
+from real_estate.cities import cities
+from real_estate.datasets import WIDGET_COLUMNS
+
+SOURCES = {
+    'predictor_inputs': lambda: pd.read_pickle(os.path.join(REPO_DIR, 'pages', 'df.pkl')),
+    'dashboard': lambda: pd.read_csv(os.path.join(REPO_DIR, 'pages', 'Analysis_datasets', 'data_viz1.csv')),
+}
+
+
+def per_call(fn, repeat=200):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    city = cities.get()
+    print(f"{'table':<18} {'source MB':>10} {'optimized MB':>13} {'unique+sort ms':>15} {'options ms':>11}")
+    for name, load in SOURCES.items():
+        source = load()
+        optimized = city.store.table(name)
+        columns = WIDGET_COLUMNS[name]
+        old = per_call(lambda: [sorted(source[c].unique()) for c in columns])
+        new = per_call(lambda: [city.options(name, c) for c in columns])
+        print(f"{name:<18} {source.memory_usage(deep=True).sum() / 1e6:>10.2f} "
+              f"{optimized.memory_usage(deep=True).sum() / 1e6:>13.2f} {old * 1e3:>15.3f} {new * 1e3:>11.4f}")
+
+
+if __name__ == '__main__':
+    main()
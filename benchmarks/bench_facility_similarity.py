@@ -0,0 +1,108 @@
+"""Sparse ``FacilitySimilarity`` against the dense ``cosine_sim1`` pickle.
+
+    python -m benchmarks.bench_facility_similarity --sizes 1000 5000 20000 100000
+
+For the real catalogue every similarity row must equal ``cosine_sim1.pkl``.
+Synthetic catalogues draw each property's facilities from the real ones;
+up to ``--dense-limit`` properties the dense N x N matrix is built as the
+notebook did (``cosine_similarity`` in float64) and top-k results must
+agree, beyond that its size is extrapolated.
+
+Reported per size: memory of each form, per-query latency (dense row +
+top-k; sparse mat-vec + top-k) and the build time of each.
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.dense_baseline import DenseRecommender
+from real_estate.artifacts import REPO_DIR
+from real_estate.facility_similarity import FacilitySimilarity
+from real_estate.features import extract_list
+
+APARTMENTS = os.path.join(REPO_DIR, 'Data Preprocessing', 'appartments.csv')
+DENSE_PICKLE = os.path.join(REPO_DIR, 'pages', 'Recommender_System', 'cosine_sim1.pkl')
+
+
+def real_facilities():
+    df = pd.read_csv(APARTMENTS)
+    df = df[df['PropertyName'] != 'PropertyName']
+    return df['PropertyName'].tolist(), extract_list(df['TopFacilities'])
+
+
+def synthetic_texts(lists, n, seed=0):
+    """Each property takes as many facilities as a random real one, drawn from the real pool."""
+    rng = np.random.default_rng(seed)
+    pool = np.array(sorted({item for items in lists for item in items}))
+    counts = np.array([len(items) for items in lists])[rng.integers(0, len(lists), n)]
+    return [' '.join(rng.choice(pool, size=min(c, len(pool)), replace=False)) for c in counts]
+
+
+def per_query(func, queries):
+    start = time.perf_counter()
+    for query in queries:
+        func(query)
+    return (time.perf_counter() - start) / len(queries)
+
+
+def check_real():
+    names, lists = real_facilities()
+    similarity = FacilitySimilarity.fit(lists.str.join(' '), names)
+    dense = pd.read_pickle(DENSE_PICKLE)
+    matrix_bytes = similarity.nbytes
+    rows = np.vstack([similarity.row(i) for i in range(similarity.size)])
+    assert np.allclose(rows, dense, atol=1e-5), "similarity rows differ from cosine_sim1.pkl"
+    print(f"ok: {similarity.size} rows equal cosine_sim1.pkl "
+          f"(dense {dense.nbytes / 1e3:.0f} KB, sparse {matrix_bytes / 1e3:.0f} KB)")
+    return lists
+
+
+def run(n, lists, n_queries, dense_limit):
+    from sklearn.metrics.pairwise import cosine_similarity
+
+    texts = synthetic_texts(lists, n)
+    start = time.perf_counter()
+    similarity = FacilitySimilarity.fit(texts, range(n))
+    fit = time.perf_counter() - start
+    queries = np.random.default_rng(1).choice(n, size=min(n_queries, n), replace=False)
+    matrix_bytes = similarity.nbytes
+
+    sparse_query = per_query(lambda q: similarity.top_k(q, 10), queries)
+
+    dense_bytes, dense_query, dense_build = n * n * 8, float('nan'), float('nan')
+    if n <= dense_limit:
+        start = time.perf_counter()
+        engine = DenseRecommender([cosine_similarity(similarity.matrix.tocsr().astype(np.float64))])
+        dense_build = time.perf_counter() - start
+        dense_query = per_query(lambda q: engine.top_k(q, 10, (1.0,)), queries)
+        for q in queries:
+            _, scores = engine.top_k(q, 10, (1.0,))
+            got, got_scores = similarity.top_k(q, 10)
+            assert np.allclose(got_scores, scores, atol=1e-5), f"top-k scores differ for row {q}"
+        del engine
+
+    estimated = '' if n <= dense_limit else '~'
+    print(f"{n:>8,} {estimated + f'{dense_bytes / 1e6:.1f}':>11} {matrix_bytes / 1e6:>10.2f} "
+          f"{dense_query * 1e6:>9.0f} {sparse_query * 1e6:>10.0f} {dense_build:>9.2f} {fit:>7.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 5000, 20000, 100000])
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--dense-limit', type=int, default=8000, help="largest N to build the dense matrix for")
+    args = parser.parse_args()
+
+    lists = check_real()
+    print(f"{'N':>8} {'dense MB':>11} {'sparse MB':>10} {'dense us':>9} {'sparse us':>10} "
+          f"{'dense s':>9} {'fit s':>7}")
+    for n in args.sizes:
+        run(n, lists, args.queries, args.dense_limit)
+    print("ok: sparse rows and top-k match the dense matrix")
+
+
+if __name__ == '__main__':
+    main()
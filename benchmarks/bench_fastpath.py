@@ -0,0 +1,44 @@
+"""Per-row latency of the compiled price predictor vs sklearn.
+
+    REAL_ESTATE_PRICE_PIPELINE=pipeline.pkl python -m benchmarks.bench_fastpath
+
+Latency is measured for single rows and small batches, which is what the
+page and the service send.  Parity with ``pipeline.predict``, missing values
+included, is checked by ``tests/test_fastpath.py``.
+"""
+import argparse
+import time
+
+from real_estate.fastpath import compile_pipeline
+from real_estate.model_registry import load_model
+from real_estate.price_model import TRAINING_CSV, load_training_data
+
+
+def per_call(fn, arg, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(arg)
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--csv', default=TRAINING_CSV)
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    pipeline = load_model()
+    fast = compile_pipeline(pipeline)
+    X, _ = load_training_data(args.csv)
+
+    rows = X[fast.input_columns].values.tolist()
+    print(f"{'batch':>6} {'sklearn ms':>11} {'fast ms':>9} {'speedup':>8}")
+    for n in (1, 8, 64):
+        frame = X.iloc[:n]
+        slow = per_call(pipeline.predict, frame, args.repeat)
+        quick = per_call(fast.predict, rows[:n], args.repeat)
+        print(f"{n:>6} {slow * 1e3:>11.2f} {quick * 1e3:>9.2f} {slow / quick:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
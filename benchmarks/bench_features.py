@@ -0,0 +1,239 @@
+"""Row-wise notebook feature code vs ``real_estate.features``: speed.
+
+    python -m benchmarks.bench_features --rows 1000000
+    python -m benchmarks.bench_features --rows 200000 --distinct
+
+``--rows`` synthetic listings are drawn column by column from the real
+ones, so combinations are new but values repeat as in a scrape.
+``--distinct`` makes every text value unique (an inert prefix/suffix), the
+worst case for the per-distinct-value parsing.
+
+The row-wise versions below are the notebooks' own; ``tests/test_features.py``
+checks that every vectorised transform equals them and that
+``flats_cleaned3.csv`` is reproduced.
+"""
+import argparse
+import ast
+import os
+import re
+import time
+
+import numpy as np
+import pandas as pd
+
+from real_estate import features, preprocessing
+from real_estate.artifacts import REPO_DIR
+
+SOURCE = os.path.join(REPO_DIR, 'Data Preprocessing', 'flats_cleaned2.csv')
+EXPECTED = os.path.join(REPO_DIR, 'Data Preprocessing', 'flats_cleaned3.csv')
+APARTMENTS = os.path.join(REPO_DIR, 'Data Preprocessing', 'appartments.csv')
+
+
+# The notebooks' row-at-a-time versions (feature-engineering, feature-selection, recommender-system).
+
+def get_super_built_up_area(text):
+    match = re.search(r'Super Built up area (\d+\.?\d*)', text)
+    return float(match.group(1)) if match else None
+
+
+def get_area(text, area_type):
+    match = re.search(area_type + r'\s*:\s*(\d+\.?\d*)', text)
+    return float(match.group(1)) if match else None
+
+
+def convert_to_sqft(text, area_value):
+    if area_value is None:
+        return None
+    match = re.search(r'{} \((\d+\.?\d*) sq.m.\)'.format(area_value), text)
+    return float(match.group(1)) * 10.7639 if match else area_value
+
+
+def get_plot_area(text):
+    match = re.search(r'Plot area (\d+\.?\d*)', text)
+    return float(match.group(1)) if match else None
+
+
+def convert_scale(row):
+    if np.isnan(row['area']) or np.isnan(row['built_up_area']):
+        return row['built_up_area']
+    if round(row['area'] / row['built_up_area']) == 9.0:
+        return row['built_up_area'] * 9
+    if round(row['area'] / row['built_up_area']) == 11.0:
+        return row['built_up_area'] * 10.7
+    return row['built_up_area']
+
+
+def old_areas(df):
+    out = pd.DataFrame(index=df.index)
+    text = df['areaWithType']
+    out['super_built_up_area'] = text.apply(get_super_built_up_area)
+    out['super_built_up_area'] = [convert_to_sqft(t, v) for t, v in zip(text, out['super_built_up_area'])]
+    out['built_up_area'] = text.apply(lambda x: get_area(x, 'Built Up area'))
+    out['built_up_area'] = [convert_to_sqft(t, v) for t, v in zip(text, out['built_up_area'])]
+    out['carpet_area'] = text.apply(lambda x: get_area(x, 'Carpet area'))
+    out['carpet_area'] = [convert_to_sqft(t, v) for t, v in zip(text, out['carpet_area'])]
+    out = out.astype(float)
+    none = out.isna().all(axis=1)
+    plot = pd.DataFrame({'area': df.loc[none, 'area'], 'built_up_area': text[none].apply(get_plot_area)})
+    out.loc[none, 'built_up_area'] = plot.astype(float).apply(convert_scale, axis=1)
+    return out
+
+
+def old_rooms(df):
+    return pd.DataFrame({c: df['additionalRoom'].str.contains(c).astype(int) for c in features.ROOM_COLUMNS})
+
+
+def categorize_age_possession(value):
+    if pd.isna(value):
+        return "Undefined"
+    if "0 to 1 Year Old" in value or "Within 6 months" in value or "Within 3 months" in value:
+        return "New Property"
+    if "1 to 5 Year Old" in value:
+        return "Relatively New"
+    if "5 to 10 Year Old" in value:
+        return "Moderately Old"
+    if "10+ Year Old" in value:
+        return "Old Property"
+    if "Under Construction" in value or "By" in value:
+        return "Under Construction"
+    try:
+        int(value.split(" ")[-1])
+        return "Under Construction"
+    except ValueError:
+        return "Undefined"
+
+
+def get_furnishing_count(details, furnishing):
+    if isinstance(details, str):
+        if f"No {furnishing}" in details:
+            return 0
+        pattern = re.compile(rf"(\d+) {furnishing}")
+        match = pattern.search(details)
+        if match:
+            return int(match.group(1))
+        elif furnishing in details:
+            return 1
+    return 0
+
+
+def old_furnishing_counts(details, vocabulary):
+    return np.array([[get_furnishing_count(d, f) for f in vocabulary] for d in details],
+                    dtype=float).reshape(len(details), len(vocabulary))
+
+
+def old_luxury_score(values):
+    lists = values.apply(lambda x: ast.literal_eval(x) if isinstance(x, str) and x.startswith('[') else [])
+    return lists.apply(lambda items: sum(features.LUXURY_WEIGHTS.get(f, 0) for f in set(items)))
+
+
+def categorize_luxury(score):
+    if 0 <= score < 50:
+        return "Low"
+    elif 50 <= score < 150:
+        return "Medium"
+    elif 150 <= score <= 175:
+        return "High"
+    else:
+        return None
+
+
+def categorize_floor(floor):
+    if 0 <= floor <= 2:
+        return "Low Floor"
+    elif 3 <= floor <= 10:
+        return "Mid Floor"
+    elif 11 <= floor <= 51:
+        return "High Floor"
+    else:
+        return None
+
+
+def old_distance_to_meters(distance_str):
+    try:
+        if 'Km' in distance_str or 'KM' in distance_str:
+            return float(distance_str.split()[0]) * 1000
+        elif 'Meter' in distance_str or 'meter' in distance_str:
+            return float(distance_str.split()[0])
+        else:
+            return None
+    except Exception:
+        return None
+
+
+def extract_list(s):
+    return re.findall(r"'(.*?)'", s)
+
+
+def distance_values():
+    text = pd.read_csv(APARTMENTS)['LocationAdvantages'].dropna()
+    return pd.Series(text.str.findall(r"""['"]\s*:\s*['"]([^'"]*)['"]""").explode().dropna().to_numpy())
+
+
+def synthetic(df, distances, facilities, rows, distinct, seed=0):
+    rng = np.random.default_rng(seed)
+    out = pd.DataFrame({c: df[c].to_numpy()[rng.integers(0, len(df), rows)] for c in df.columns})
+    out['distance'] = distances.to_numpy()[rng.integers(0, len(distances), rows)]
+    out['TopFacilities'] = facilities.to_numpy()[rng.integers(0, len(facilities), rows)]
+    out['floorNum'] = out['floorNum'].astype(float)
+    if distinct:
+        tag = pd.Series(np.arange(rows).astype(str))
+        text = lambda c: out[c].notna() & out[c].astype(str).str.startswith('[')
+        out['areaWithType'] = out['areaWithType'] + ' #' + tag
+        out['additionalRoom'] = out['additionalRoom'] + ',#' + tag
+        out['agePossession'] = tag + ' ' + out['agePossession']
+        for column in ('furnishDetails', 'features', 'TopFacilities'):
+            listed = text(column)
+            out.loc[listed, column] = out.loc[listed, column].str[:-1] + ", 'row " + tag[listed] + "']"
+        out['distance'] = out['distance'] + ' #' + tag
+    return out
+
+
+TRANSFORMS = [
+    ('built_up_area', lambda d, s: old_areas(d),
+     lambda d, s: features.area_columns(d['areaWithType'], d['area'])),
+    ('room_flags', lambda d, s: old_rooms(d), lambda d, s: features.room_flags(d['additionalRoom'])),
+    ('agePossession', lambda d, s: d['agePossession'].apply(categorize_age_possession),
+     lambda d, s: features.age_possession_category(d['agePossession'])),
+    ('furnishing_counts', lambda d, s: old_furnishing_counts(d['furnishDetails'], s['vocabulary']),
+     lambda d, s: features.furnishing_counts(d['furnishDetails'], s['vocabulary'])),
+    ('luxury_score', lambda d, s: old_luxury_score(d['features']), lambda d, s: features.luxury_score(d['features'])),
+    ('luxury_category', lambda d, s: d['luxury_score'].apply(categorize_luxury),
+     lambda d, s: features.luxury_category(d['luxury_score'])),
+    ('floor_category', lambda d, s: d['floorNum'].apply(categorize_floor),
+     lambda d, s: features.floor_category(d['floorNum'])),
+    ('distance_to_meters', lambda d, s: d['distance'].apply(old_distance_to_meters),
+     lambda d, s: features.distance_to_meters(d['distance'])),
+    ('extract_list', lambda d, s: d['TopFacilities'].fillna('').apply(extract_list),
+     lambda d, s: features.extract_list(d['TopFacilities'])),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--distinct', action='store_true', help="make every text value unique")
+    args = parser.parse_args()
+
+    source = pd.read_csv(SOURCE)
+    state = preprocessing.fit_features(source)
+    distances = distance_values()
+    facilities = pd.read_csv(APARTMENTS)['TopFacilities']
+    real = source.assign(luxury_score=preprocessing.engineer_features(source, state)['luxury_score'])
+    data = synthetic(real, distances, facilities, args.rows, args.distinct)
+    print(f"{args.rows:,} synthetic rows{' (distinct text)' if args.distinct else ''}")
+    print(f"{'transform':<20} {'row-wise s':>11} {'vectorised s':>13} {'speedup':>8}")
+    total_old = total_new = 0.0
+    for name, old, new in TRANSFORMS:
+        start = time.perf_counter()
+        old(data, state)
+        old_s = time.perf_counter() - start
+        start = time.perf_counter()
+        new(data, state)
+        new_s = time.perf_counter() - start
+        total_old, total_new = total_old + old_s, total_new + new_s
+        print(f"{name:<20} {old_s:>11.2f} {new_s:>13.3f} {old_s / new_s:>7.1f}x")
+    print(f"{'total':<20} {total_old:>11.2f} {total_new:>13.3f} {total_old / total_new:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
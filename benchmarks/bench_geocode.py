@@ -0,0 +1,88 @@
+"""Geocoder throughput against a local Nominatim-style stub server.
+
+    python -m benchmarks.bench_geocode --localities 500 --latency-ms 50 --error-rate 0.05
+
+The stub answers ``/search`` after ``--latency-ms`` with JSON coordinates,
+fails ``--error-rate`` of the requests with HTTP 503 and reports "not
+found" for every tenth locality.  The geocoder runs twice against a fresh
+cache: the first run fetches (with retries), the second is served from the
+cache.  A sequential blocking baseline mirrors the old ``latlong_scraper.py``
+loop.  ``tests/test_geocode.py`` checks the results against the same stub.
+"""
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+
+from real_estate.geocode import GeocodeCache, Geocoder, NominatimBackend
+
+
+async def start_stub(latency, error_rate, seed=0):
+    from aiohttp import web
+
+    rng = random.Random(seed)
+
+    async def search(request):
+        await asyncio.sleep(latency)
+        if rng.random() < error_rate:
+            return web.Response(status=503)
+        query = request.query['q']
+        number = int(query.split()[1])
+        if number % 10 == 0:
+            return web.json_response([])
+        return web.json_response([{'lat': str(28.3 + number * 1e-3), 'lon': str(76.9 + number * 1e-3)}])
+
+    app = web.Application()
+    app.router.add_get('/search', search)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f'http://127.0.0.1:{port}'
+
+
+def sequential_seconds(base_url, queries):
+    """The old loop: one blocking request at a time (timed on a sample)."""
+    import requests
+
+    sample = queries[:20]
+    start = time.perf_counter()
+    for query in sample:
+        requests.get(f'{base_url}/search', params={'q': query, 'format': 'json'}, timeout=10)
+    return (time.perf_counter() - start) / len(sample) * len(queries)
+
+
+async def run(args):
+    runner, base_url = await start_stub(args.latency_ms / 1000, args.error_rate)
+    queries = [f'sector {n} gurgaon' for n in range(1, args.localities + 1)]
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = GeocodeCache(os.path.join(tmp, 'cache.sqlite'))
+            for label in ('cold', 'warm'):
+                geocoder = Geocoder(NominatimBackend(base_url), cache, concurrency=args.concurrency,
+                                    rate=args.rate, backoff=0.05)
+                await geocoder.geocode_many(queries)
+                print(f"{label}: {geocoder.stats.summary()}")
+            cache.close()
+        baseline = await asyncio.to_thread(sequential_seconds, base_url, queries)
+        print(f"sequential baseline (estimated, no retries): {baseline:.1f}s")
+    finally:
+        await runner.cleanup()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--localities', type=int, default=500)
+    parser.add_argument('--latency-ms', type=float, default=50)
+    parser.add_argument('--error-rate', type=float, default=0.05)
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--rate', type=float, default=0, help="per-host requests/s (0 = unlimited)")
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""Import-time budget for the Streamlit pages' cold start.
+
+    python -m benchmarks.bench_import_time
+    python -m benchmarks.bench_import_time --budget-ms 800 pages/Recommender.py
+
+Every page runs once (``streamlit.testing``) in a fresh interpreter started
+with ``-X importtime``.  Streamlit itself is imported first, as the server
+process already has it; the modules imported after that are what a page's
+first run pays for.  Reports their total import time, the heaviest
+top-level imports and the first run's wall time, and exits non-zero when a
+page's imports exceed its budget so it can gate a CI job.  The default
+budgets leave about 25% over the times measured on one core, most of which
+is pandas (every page) and plotly (the dashboard's charts).
+
+The price predictor needs its model in the local cache
+(``REAL_ESTATE_MODEL_CACHE``, ``python -m real_estate.model_registry``).
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Page -> import budget in ms
+BUDGETS_MS = {
+    'Home.py': 300,
+    'pages/Price_Predictor.py': 1000,
+    'pages/Recommender.py': 1000,
+    'pages/Analysis_App.py': 2000,
+}
+MARKER = 'import time: -- page --'
+
+RUNNER = """
+import sys, time
+import streamlit
+from streamlit.testing.v1 import AppTest
+sys.stderr.write({marker!r} + '\\n')
+start = time.perf_counter()
+at = AppTest.from_file({path!r}, default_timeout=600).run()
+print(time.perf_counter() - start, len(at.exception))
+"""
+
+
+def page_imports(page):
+    """``(seconds of imports, [(ms, module)] top-level, run seconds, exceptions)`` for one page."""
+    code = RUNNER.format(marker=MARKER, path=os.path.join(REPO_DIR, page))
+    env = {**os.environ, 'PYTHONPATH': REPO_DIR + os.pathsep + os.environ.get('PYTHONPATH', '')}
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], cwd=REPO_DIR, env=env,
+                            capture_output=True, text=True, check=True)
+    lines = result.stderr.splitlines()
+    total, top = 0, []
+    for line in lines[lines.index(MARKER) + 1:]:
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        total += int(self_us)
+        # Top-level imports are not indented under another import.
+        if not name.startswith('  '):
+            top.append((int(cumulative_us) / 1e3, name.strip()))
+    run_seconds, exceptions = result.stdout.split()[-2:]
+    return total / 1e6, sorted(top, reverse=True), float(run_seconds), int(exceptions)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--budget-ms', type=float, help="import time allowed per page (default BUDGETS_MS)")
+    parser.add_argument('--top', type=int, default=5, help="heaviest imports to list per page")
+    parser.add_argument('pages', nargs='*', default=list(BUDGETS_MS))
+    args = parser.parse_args()
+
+    ok = True
+    for page in args.pages:
+        seconds, top, run, exceptions = page_imports(page)
+        budget = args.budget_ms or BUDGETS_MS.get(page, max(BUDGETS_MS.values()))
+        within = seconds * 1e3 <= budget and not exceptions
+        ok &= within
+        print(f"{page:<26} imports {seconds * 1e3:7.0f} / {budget:.0f} ms  first run {run * 1e3:7.0f} ms  "
+              f"{'ok' if within else 'OVER BUDGET' if not exceptions else 'PAGE RAISED'}")
+        for ms, name in top[:args.top]:
+            print(f"    {ms:7.0f} ms  {name}")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
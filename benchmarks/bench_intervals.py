@@ -0,0 +1,55 @@
+"""Latency of the conformal price intervals.
+
+    REAL_ESTATE_PRICE_PIPELINE=pipeline.pkl python -m benchmarks.bench_intervals
+
+Intervals are calibrated on the out-of-bag residuals of the repository's
+pipeline; a single-row prediction is compared with the interval lookup that
+is added on top of it, and the lookup is timed on a large batch.
+Held-out coverage is checked by ``tests/test_intervals.py``.
+"""
+import argparse
+import time
+
+import numpy as np
+
+from real_estate.fastpath import compile_or_fallback
+from real_estate.intervals import DEFAULT_ALPHA, DEFAULT_BINS, fit_intervals, out_of_sample_predictions
+from real_estate.model_registry import load_model
+from real_estate.price_model import load_training_data, predict_batch
+
+
+def per_call(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--alpha', type=float, default=DEFAULT_ALPHA)
+    parser.add_argument('--bins', type=int, default=DEFAULT_BINS)
+    args = parser.parse_args()
+
+    pipeline = load_model()
+    X, y = load_training_data()
+    # The repository's pipeline was trained on exactly these rows.
+    start = time.perf_counter()
+    predictions, method = out_of_sample_predictions(pipeline, X, y, training_set=True)
+    model = fit_intervals(predictions, y, args.alpha, args.bins)
+    print(f"calibrated on {len(y):,} {method} residuals in {time.perf_counter() - start:.2f}s")
+
+    fast = compile_or_fallback(pipeline)
+    row = X.iloc[:1]
+    point = np.expm1(predictions)
+    predict_s = per_call(lambda: predict_batch(row, fast), 200)
+    one = np.array([point[0]])
+    bounds_s = per_call(lambda: model.bounds(one), 2000)
+    many = np.resize(point, 100_000)
+    batch_s = per_call(lambda: model.bounds(many), 5)
+    print(f"latency: predict 1 row {predict_s * 1e3:.3f} ms, + interval {bounds_s * 1e6:.1f} us "
+          f"({bounds_s / predict_s:.1%}); interval for 100k rows {batch_s * 1e3:.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
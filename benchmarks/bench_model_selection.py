@@ -0,0 +1,83 @@
+"""The notebook's serial ``cross_val_score`` loop vs ``real_estate.model_selection``.
+
+    python -m benchmarks.bench_model_selection --models linear_reg ridge "decision tree" "extra trees" --workers 2
+
+The notebook's ``scorer()`` refits ``Pipeline([preprocessor, model])`` in all
+ten folds of every model.  The harness is timed cold (empty fold cache and
+job log) and warm (a rerun, everything reused), over the same models and
+the notebook's one-hot preprocessor.
+
+Parity: each fold's r2 must equal ``cross_val_score`` on the same folds
+with the same preprocessor and model, which the deterministic models
+(everything seeded) reproduce exactly.
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from real_estate.model_selection import FoldCache, build_preprocessor, make_model, run
+from real_estate.price_model import load_training_data
+
+DEFAULT_MODELS = ['linear_reg', 'ridge', 'LASSO', 'decision tree', 'extra trees']
+
+
+def notebook_scores(X, y, models, preprocessor, folds, seed):
+    """``scorer()`` without the extra 80/20 split: r2 per fold for each model."""
+    from sklearn.model_selection import KFold, cross_val_score
+    from sklearn.pipeline import Pipeline
+
+    categories = FoldCache('', X, y, folds, seed).categories
+    kfold = KFold(n_splits=folds, shuffle=True, random_state=seed)
+    scores = {}
+    for name in models:
+        pipeline = Pipeline([('preprocessor', build_preprocessor(preprocessor, categories)),
+                             ('regressor', make_model(name, {}, seed))])
+        scores[name] = cross_val_score(pipeline, X, y, cv=kfold, scoring='r2')
+    return scores
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--models', nargs='+', default=DEFAULT_MODELS)
+    parser.add_argument('--preprocessor', default='onehot')
+    parser.add_argument('--folds', type=int, default=10)
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    X, y = load_training_data()
+    print(f"{len(X):,} rows, {len(args.models)} models x {args.folds} folds, {args.preprocessor} preprocessing")
+
+    start = time.perf_counter()
+    expected = notebook_scores(X, y, args.models, args.preprocessor, args.folds, args.seed)
+    serial = time.perf_counter() - start
+    print(f"{'notebook loop':<14} {serial:7.2f}s")
+
+    with tempfile.TemporaryDirectory() as root:
+        timings = {}
+        for label in ('cold', 'warm'):
+            start = time.perf_counter()
+            board, stats = run(args.models, [args.preprocessor], root, args.folds, args.workers, seed=args.seed,
+                               X=X, y=y, verbose=False)
+            timings[label] = time.perf_counter() - start
+            print(f"{'harness ' + label:<14} {timings[label]:7.2f}s  {stats['jobs_run']} jobs run, "
+                  f"{stats['jobs_reused']} reused")
+        assert stats['jobs_run'] == 0
+
+        with open(os.path.join(root, 'jobs.jsonl')) as f:
+            results = [json.loads(line) for line in f]
+    for name, scores in expected.items():
+        got = sorted((r['fold'], r['r2']) for r in results if r['model'] == name)
+        assert np.allclose([r2 for _, r2 in got], scores, rtol=0, atol=1e-9), f"{name} fold r2 differs"
+        print(f"{name:<18} r2 {scores.mean():.4f}  (leaderboard "
+              f"{board.loc[board['model'] == name, 'r2'].iloc[0]:.4f})")
+    print(f"ok: fold r2 matches cross_val_score; cold {serial / timings['cold']:.1f}x, "
+          f"warm {serial / timings['warm']:.0f}x the notebook loop")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""Figure JSON bytes and build time of the dashboard charts vs row count.
+
+    python -m benchmarks.bench_plot_payload --scales 1 10 100
+
+"raw" builds the scatter, histogram (with marginal box) and BHK box the
+way the page used to, from every filtered row; "reduced" uses the sector
+cube, server-side box statistics and density-preserving downsampling.
+Time covers building the figure and serialising it to JSON, which is what
+``st.plotly_chart`` ships to the browser.
+"""
+import argparse
+import time
+
+import plotly.express as px
+import plotly.graph_objects as go
+
+from benchmarks.bench_cube import synthetic
+from real_estate.artifacts import ArtifactStore
+from real_estate.cube import SectorCube
+from real_estate.plot_data import SCATTER_BUDGET, box_traces, downsample, payload_bytes
+
+
+def raw_figures(df, cube):
+    flats = df[df['property_type'] == 'flat']
+    yield px.scatter(flats, x='built_up_area', y='price', color='bedRoom', size='built_up_area', hover_name='sector')
+    yield px.histogram(df, x='price', color='property_type', marginal='box', nbins=50)
+    yield px.box(df[df['bedRoom'] <= 4], x='bedRoom', y='price', color='property_type')
+
+
+def reduced_figures(df, cube):
+    flats = df[df['property_type'] == 'flat']
+    points = downsample(flats, 'built_up_area', 'price', SCATTER_BUDGET)
+    yield px.scatter(points, x='built_up_area', y='price', color='bedRoom', size='built_up_area', hover_name='sector')
+    hist = cube.price_histogram(cube.select()).reset_index().melt(id_vars='price', value_name='count')
+    fig = px.bar(hist, x='price', y='count', color='property_type')
+    fig.add_traces(box_traces(df, 'price', color='property_type', orientation='h'))
+    yield fig
+    yield go.Figure(box_traces(df[df['bedRoom'] <= 4], 'price', by='bedRoom', color='property_type'))
+
+
+def measure(figures, df, cube):
+    start = time.perf_counter()
+    total = sum(payload_bytes(fig) for fig in figures(df, cube))
+    return total, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scales', type=int, nargs='+', default=[1, 10, 100])
+    args = parser.parse_args()
+
+    base = ArtifactStore().table('dashboard')
+    print(f"{'rows':>10} {'raw KB':>10} {'raw s':>7} {'reduced KB':>11} {'reduced s':>10}")
+    for scale in args.scales:
+        df = synthetic(base, scale)
+        cube = SectorCube.from_listings(df)
+        raw_bytes, raw_s = measure(raw_figures, df, cube)
+        small_bytes, small_s = measure(reduced_figures, df, cube)
+        print(f"{len(df):>10,} {raw_bytes / 1e3:>10,.0f} {raw_s:>7.2f} {small_bytes / 1e3:>11,.0f} {small_s:>10.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""Compare the old per-click blend+sort with the cached dense blend (``DenseRecommender``).
+
+    python -m benchmarks.bench_recommender --sizes 247 20000
+
+The real catalogue from ``pages/Recommender_System`` is benchmarked as well
+when its pickles are present.  Synthetic matrices are float32 and share one
+base matrix so that N=20k fits in a few GB of RAM.
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.dense_baseline import DenseRecommender
+
+RECOMMENDER_DIR = os.path.join(os.path.dirname(__file__), '..', 'pages', 'Recommender_System')
+WEIGHTS = (0.5, 0.8, 1.0)
+
+
+def old_recommend(sims, index, top_n=5):
+    cosine_sim_matrix = WEIGHTS[0] * sims[0] + WEIGHTS[1] * sims[1] + WEIGHTS[2] * sims[2]
+    sim_scores = list(enumerate(cosine_sim_matrix[index]))
+    sorted_scores = sorted(sim_scores, key=lambda x: x[1], reverse=True)[1:top_n + 1]
+    return [i[0] for i in sorted_scores]
+
+
+def synthetic_similarities(n, seed=0):
+    rng = np.random.default_rng(seed)
+    base = rng.random((n, n), dtype=np.float32)
+    np.fill_diagonal(base, 1.0)
+    return [base, base, base]
+
+
+def real_similarities():
+    paths = [os.path.join(RECOMMENDER_DIR, f'cosine_sim{i}.pkl') for i in (1, 2, 3)]
+    if not all(os.path.exists(path) for path in paths):
+        return None
+    return [pd.read_pickle(path) for path in paths]
+
+
+def time_calls(func, queries):
+    start = time.perf_counter()
+    for query in queries:
+        func(query)
+    return (time.perf_counter() - start) / len(queries)
+
+
+def run(label, sims, repeats):
+    n = sims[0].shape[0]
+    queries = np.random.default_rng(1).integers(0, n, size=repeats)
+    engine = DenseRecommender(sims)
+
+    old = time_calls(lambda q: old_recommend(sims, q), queries)
+    start = time.perf_counter()
+    engine.blended(WEIGHTS)
+    build = time.perf_counter() - start
+    new = time_calls(lambda q: engine.top_k(q, 5, WEIGHTS), queries)
+
+    agree = all(
+        set(old_recommend(sims, q)) == set(engine.top_k(q, 5, WEIGHTS)[0].tolist())
+        for q in queries[:5]
+    )
+    print(f"{label:<12} N={n:<6} old={old * 1e3:9.3f} ms  new={new * 1e3:8.4f} ms  "
+          f"speedup={old / new:8.1f}x  one-off blend={build * 1e3:8.1f} ms  top-5 agree={agree}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[247, 20000])
+    parser.add_argument('--repeats', type=int, default=20)
+    args = parser.parse_args()
+
+    sims = real_similarities()
+    if sims is not None:
+        run('real', sims, args.repeats)
+    for n in args.sizes:
+        # The old path allocates several N x N temporaries per call, keep it short.
+        repeats = args.repeats if n <= 5000 else 3
+        run('synthetic', synthetic_similarities(n), repeats)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+"""Latency and memory of FeatureIndex against the dense path.
+
+    python -m benchmarks.bench_recommender_index --sizes 2000 20000
+
+The real catalogue comes from the artifact store; synthetic catalogues are
+clustered so that nearest neighbours are meaningful.  The dense size is
+that of the three N x N float64 cosine matrices the notebook pickled.
+Recall@10 of both search modes is checked by ``tests/test_recommender_index.py``.
+"""
+import argparse
+import time
+
+import numpy as np
+
+from real_estate.cities import cities
+from real_estate.recommender_index import FeatureIndex
+
+
+def synthetic_features(n, dims=(300, 40, 200), n_clusters=50, seed=0):
+    """Clustered features so that nearest neighbours are meaningful."""
+    rng = np.random.default_rng(seed)
+    labels = rng.integers(0, n_clusters, size=n)
+    features = []
+    for dim in dims:
+        centres = rng.standard_normal((n_clusters, dim)).astype(np.float32)
+        features.append(centres[labels] + 0.5 * rng.standard_normal((n, dim)).astype(np.float32))
+    return features
+
+
+def latency(func, queries):
+    start = time.perf_counter()
+    for query in queries:
+        func(query)
+    return (time.perf_counter() - start) / len(queries)
+
+
+def run(label, index, n_queries):
+    queries = np.random.default_rng(1).choice(index.size, size=min(n_queries, index.size), replace=False)
+    start = time.perf_counter()
+    index.build_ivf()
+    build = time.perf_counter() - start
+    dense = len(index.blocks) * index.size ** 2 * 8
+    print(f"{label:<10} N={index.size:<7} index={index.nbytes / 1e6:8.1f} MB  dense={dense / 1e6:8.1f} MB  "
+          f"ivf build={build:.2f}s")
+    for mode in ('exact', 'ivf'):
+        per_query = latency(lambda q: index.search([q], 10, mode=mode), queries)
+        print(f"    {mode:<6} {per_query * 1e3:8.3f} ms/query")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[2000, 20000])
+    parser.add_argument('--queries', type=int, default=100)
+    args = parser.parse_args()
+
+    run('real', cities.get().recommender.index, args.queries)
+    for n in args.sizes:
+        run('synthetic', FeatureIndex.from_features(synthetic_features(n), names=range(n)), args.queries)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,151 @@
+"""``GeoGrid`` radius and k-nearest queries against a full haversine scan.
+
+    python -m benchmarks.bench_spatial --points 1000000 --queries 100
+
+Synthetic points cluster around the ``latlong.csv`` localities (2 km spread)
+with a tenth scattered uniformly over the city.  With ``--cities`` > 1 the
+points are split between that many copies of the city spread over India,
+as a multi-city catalogue would be.  Every grid answer must equal the
+brute-force scan: the same ids within each radius, and the same k nearest
+distances.  ``NearbyLists`` around ``--places`` of the points must return
+the same ids as the grid (up to float32 rounding at the radius).
+
+On the real catalogue every landmark's list must give the old properties x
+landmarks table's answers (``location_distance.pkl``): the same properties
+and distances at each 1-20 km radius, and the same recommendation distances.
+The script exits non-zero when any differs.
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from real_estate import recommender_build
+from real_estate.artifacts import REPO_DIR
+from real_estate.recommender_build import known_localities
+from real_estate.spatial import GeoGrid, NearbyLists, haversine
+
+RADII_KM = (1, 5, 20)
+APARTMENTS = os.path.join(REPO_DIR, 'Data Preprocessing', 'appartments.csv')
+LOCATION_TABLE = os.path.join(REPO_DIR, 'pages', 'Recommender_System', 'location_distance.pkl')
+
+
+def synthetic_points(n, cities=1, seed=0):
+    rng = np.random.default_rng(seed)
+    centres = np.array(list(known_localities().values()))
+    spread = 2000 / 111_195
+    lat = centres[rng.integers(0, len(centres), n), 0] + rng.normal(0, spread, n)
+    lon = centres[rng.integers(0, len(centres), n), 1] + rng.normal(0, spread, n)
+    scattered = rng.random(n) < 0.1
+    lat[scattered] = rng.uniform(centres[:, 0].min(), centres[:, 0].max(), scattered.sum())
+    lon[scattered] = rng.uniform(centres[:, 1].min(), centres[:, 1].max(), scattered.sum())
+    if cities > 1:
+        offsets = np.c_[rng.uniform(-18, 3, cities), rng.uniform(-6, 15, cities)]
+        city = rng.integers(0, cities, n)
+        lat, lon = lat + offsets[city, 0], lon + offsets[city, 1]
+    return lat, lon
+
+
+def timed(func, queries):
+    start = time.perf_counter()
+    results = [func(*query) for query in queries]
+    return results, (time.perf_counter() - start) / len(queries)
+
+
+def brute_radius(lat, lon, meters, points):
+    distances = haversine(lat, lon, *points)
+    ids = np.flatnonzero(distances < meters)
+    return ids[np.lexsort((ids, distances[ids]))]
+
+
+def brute_nearest(lat, lon, k, points):
+    distances = haversine(lat, lon, *points)
+    return np.sort(distances[np.argpartition(distances, k)[:k]])
+
+
+def check_real(path, table_path=LOCATION_TABLE):
+    """Landmark searches on the real catalogue against the old dense table; True when all agree."""
+    parts = recommender_build.parse_chunk(pd.read_csv(path))
+    locations = parts['locations'].assign(row=pd.Index(parts['prices'].index).get_indexer(parts['locations']['row']))
+    known = known_localities()
+    lat, lon = recommender_build.property_coordinates(parts['localities'], known)
+    grid = GeoGrid.build(lat, lon)
+    located = recommender_build.locate_landmarks(locations, lat, lon)
+    places = recommender_build.places_table(known, locations, located)
+    nearby = recommender_build.nearby_lists(places, locations, grid)
+    table = pd.read_pickle(table_path)
+    mismatched = set()
+    for name in table.columns:
+        place, old = places.index.get_loc(name), table[name].to_numpy()
+        # The lists store float32: distances compare after rounding, and ids must
+        # match exactly (no scraped distance rounds across a whole-km radius).
+        stored = old.astype(np.float32)
+        listed = old != recommender_build.MISSING_DISTANCE
+        if not np.array_equal(nearby.distance(place, np.flatnonzero(listed)), stored[listed]):
+            mismatched.add(name)
+        for km in range(1, 21):
+            ids, meters = nearby.within(place, km * 1000)
+            expected = np.flatnonzero(old < km * 1000)
+            if not (np.array_equal(np.sort(ids), expected) and np.array_equal(meters, stored[ids])):
+                mismatched.add(name)
+    print(f"real: {grid.size}/{len(lat)} properties placed for locality searches, {len(located)}/"
+          f"{table.shape[1]} landmarks located; {table.shape[1] - len(mismatched)}/{table.shape[1]} "
+          f"landmarks match the old table at every 1-20 km radius")
+    return not mismatched
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--points', type=int, default=1_000_000)
+    parser.add_argument('--queries', type=int, default=100)
+    parser.add_argument('--cities', type=int, default=1)
+    parser.add_argument('--cell-km', type=float, default=1.0)
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--places', type=int, default=20, help="places to presort nearby lists for")
+    args = parser.parse_args()
+
+    real_ok = check_real(APARTMENTS)
+
+    points = synthetic_points(args.points, args.cities)
+    start = time.perf_counter()
+    grid = GeoGrid.build(*points, cell_km=args.cell_km)
+    build = time.perf_counter() - start
+    print(f"{args.points:,} points in {args.cities} cities: grid built in {build:.2f}s, {grid.nbytes / 1e6:.1f} MB")
+
+    rng = np.random.default_rng(1)
+    picks = rng.choice(args.points, args.queries, replace=False)
+    queries = list(zip(points[0][picks], points[1][picks]))
+    print(f"{'query':<12} {'grid ms':>9} {'scan ms':>9} {'speedup':>8} {'mean hits':>10}")
+    for km in RADII_KM:
+        found, fast = timed(lambda lat, lon: grid.radius(lat, lon, km * 1000)[0], queries)
+        expected, slow = timed(lambda lat, lon: brute_radius(lat, lon, km * 1000, points), queries)
+        assert all(np.array_equal(a, b) for a, b in zip(found, expected)), f"radius {km} km differs"
+        print(f"{f'radius {km} km':<12} {fast * 1e3:>9.3f} {slow * 1e3:>9.3f} {slow / fast:>7.0f}x "
+              f"{np.mean([len(f) for f in found]):>10.0f}")
+    found, fast = timed(lambda lat, lon: grid.nearest(lat, lon, args.k)[1], queries)
+    expected, slow = timed(lambda lat, lon: brute_nearest(lat, lon, args.k, points), queries)
+    assert all(np.allclose(a, b) for a, b in zip(found, expected)), "k nearest differ"
+    print(f"{f'{args.k} nearest':<12} {fast * 1e3:>9.3f} {slow * 1e3:>9.3f} {slow / fast:>7.0f}x")
+
+    start = time.perf_counter()
+    nearby = NearbyLists.build(grid, *(coords[picks[:args.places]] for coords in points))
+    build = time.perf_counter() - start
+    print(f"nearby lists for {args.places} places built in {build:.2f}s, {nearby.nbytes / 1e6:.1f} MB")
+    print(f"{'query':<12} {'lists us':>9} {'grid us':>9} {'speedup':>8}")
+    places = list(enumerate(queries[:args.places]))
+    for km in RADII_KM:
+        meters = km * 1000
+        found, fast = timed(lambda p, point: nearby.within(p, meters)[0], places)
+        expected, slow = timed(lambda p, point: grid.radius(*point, meters), places)
+        for ids, (grid_ids, grid_meters) in zip(found, expected):
+            assert np.array_equal(ids, grid_ids[grid_meters.astype(np.float32) < meters]), f"lists {km} km differ"
+        print(f"{f'radius {km} km':<12} {fast * 1e6:>9.1f} {slow * 1e6:>9.1f} {slow / fast:>7.0f}x")
+    print("ok: grid results equal the full scan, nearby lists equal the grid")
+    sys.exit(0 if real_ok else 1)
+
+
+if __name__ == '__main__':
+    main()
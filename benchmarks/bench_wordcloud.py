@@ -0,0 +1,63 @@
+"""Word-cloud cost per rerun: old generate + matplotlib vs the render cache.
+
+    python -m benchmarks.bench_wordcloud
+"""
+import argparse
+import io
+import tempfile
+import time
+
+from real_estate.artifacts import ArtifactStore
+from real_estate.wordcloud_cache import PAGE_OPTIONS, WordCloudCache, page_image
+
+
+def old_path(feature_text):
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    from wordcloud import WordCloud
+
+    wordcloud = WordCloud(width=400, height=400, background_color='white', colormap='Blues',
+                          stopwords=set(['s'])).generate(feature_text)
+    plt.figure(figsize=(6, 6))
+    plt.imshow(wordcloud, interpolation='bilinear')
+    plt.axis("off")
+    # st.pyplot saves the figure as a PNG
+    plt.gcf().savefig(io.BytesIO(), format='png')
+    plt.close('all')
+
+
+def timed(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    store = ArtifactStore()
+    feature_text = store.text('feature_text')
+    with tempfile.TemporaryDirectory() as tmp:
+        def cold():
+            WordCloudCache(tempfile.mkdtemp(dir=tmp)).get_or_render(
+                'bench', store.table('feature_word_counts'), **PAGE_OPTIONS)
+
+        warm_cache = WordCloudCache(tmp)
+        page_image(store, warm_cache)
+        results = {
+            'generate + pyplot (old)': timed(lambda: old_path(feature_text), args.repeat),
+            'render from counts (miss)': timed(cold, args.repeat),
+            'disk cache hit': timed(lambda: page_image(store, warm_cache), args.repeat * 10),
+        }
+    for label, seconds in results.items():
+        print(f"{label:<28} {seconds * 1e3:9.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""The dense N x N similarity path, kept as the benchmarks' reference.
+
+Before ``FeatureIndex`` the Recommender page blended the notebook's
+``cosine_sim*.pkl`` matrices.  ``DenseRecommender`` does that blend once per
+weight set (kept in a small LRU) and answers top-k with ``np.argpartition``;
+the benchmarks compare the sparse and indexed paths against it.
+"""
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from real_estate.recommender import BLOCK_NAMES, DEFAULT_WEIGHTS, weight_vector
+
+
+class DenseRecommender:
+    """Top-k recommendations over a weighted sum of similarity matrices."""
+
+    def __init__(self, similarities, max_cached=4, block_names=BLOCK_NAMES):
+        self.similarities = [np.asarray(sim) for sim in similarities]
+        shapes = {sim.shape for sim in self.similarities}
+        if len(shapes) != 1:
+            raise ValueError(f"Similarity matrices have different shapes: {sorted(shapes)}")
+        self.size = self.similarities[0].shape[0]
+        # Names only matter for weights given by name.
+        self.block_names = tuple(block_names)[:len(self.similarities)]
+        self.max_cached = max_cached
+        self._blended = OrderedDict()
+        self._lock = threading.Lock()
+
+    def blended(self, weights=DEFAULT_WEIGHTS):
+        """Return the read-only weighted matrix, building it on first use."""
+        key = weight_vector(weights, self.block_names)
+
+        with self._lock:
+            matrix = self._blended.get(key)
+            if matrix is not None:
+                self._blended.move_to_end(key)
+                return matrix
+
+        # Build outside the lock so a slow blend does not block cache hits.
+        matrix = np.multiply(self.similarities[0], key[0])
+        for sim, weight in zip(self.similarities[1:], key[1:]):
+            matrix += weight * sim
+        matrix.flags.writeable = False
+
+        with self._lock:
+            self._blended[key] = matrix
+            self._blended.move_to_end(key)
+            while len(self._blended) > self.max_cached:
+                self._blended.popitem(last=False)
+        return matrix
+
+    def top_k(self, index, k=5, weights=DEFAULT_WEIGHTS):
+        """Return ``(indices, scores)`` of the ``k`` best matches for ``index``.
+
+        The query property itself is excluded and results are ordered by
+        descending score, ties keeping catalogue order.
+        """
+        row = self.blended(weights)[index]
+        scores = np.array(row, copy=True)
+        scores[index] = -np.inf
+        k = min(k, self.size - 1)
+        if k <= 0:
+            return np.empty(0, dtype=np.intp), np.empty(0, dtype=row.dtype)
+
+        top = np.argpartition(scores, -k)[-k:]
+        top = top[np.lexsort((top, -scores[top]))]
+        return top, row[top]
+
+    def cache_info(self):
+        with self._lock:
+            return {'cached_weights': list(self._blended), 'max_cached': self.max_cached}
@@ -0,0 +1,82 @@
+"""Closed-loop load test for ``real_estate.service``.
+
+    python -m real_estate.service --port 8080 &
+    python -m benchmarks.loadtest_service --url http://127.0.0.1:8080 --concurrency 32 --seconds 20
+
+Each client thread keeps one HTTP/1.1 connection open and posts listings
+sampled from ``df.pkl`` back to back.  Reports achieved QPS and client-side
+latency percentiles, followed by the server's own ``/metrics``.
+"""
+import argparse
+import http.client
+import json
+import threading
+import time
+from urllib.parse import urlparse
+
+import numpy as np
+
+from real_estate.artifacts import ArtifactStore
+from real_estate.price_model import FEATURE_COLUMNS
+
+
+def sample_payloads(n=1000, seed=0):
+    df = ArtifactStore().table('predictor_inputs')[FEATURE_COLUMNS]
+    rows = df.sample(n, replace=True, random_state=seed)
+    return [json.dumps(record).encode() for record in rows.to_dict(orient='records')]
+
+
+def client(url, payloads, stop_at, latencies, errors, offset):
+    conn = http.client.HTTPConnection(url.hostname, url.port, timeout=30)
+    i = offset
+    while time.perf_counter() < stop_at:
+        body = payloads[i % len(payloads)]
+        i += 1
+        start = time.perf_counter()
+        try:
+            conn.request('POST', '/predict', body, {'Content-Type': 'application/json'})
+            response = conn.getresponse()
+            response.read()
+            if response.status != 200:
+                errors.append(response.status)
+                continue
+        except (OSError, http.client.HTTPException) as e:
+            errors.append(repr(e))
+            conn.close()
+            conn = http.client.HTTPConnection(url.hostname, url.port, timeout=30)
+            continue
+        latencies.append(time.perf_counter() - start)
+    conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--url', default='http://127.0.0.1:8080')
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--seconds', type=float, default=20)
+    args = parser.parse_args()
+
+    url = urlparse(args.url)
+    payloads = sample_payloads()
+    latencies, errors = [], []
+    stop_at = time.perf_counter() + args.seconds
+    threads = [threading.Thread(target=client, args=(url, payloads, stop_at, latencies, errors, i * 31))
+               for i in range(args.concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    lat = np.array(latencies) * 1e3
+    print(f"requests={len(lat)}  errors={len(errors)}  qps={len(lat) / args.seconds:,.0f}")
+    if len(lat):
+        print(f"latency ms  p50={np.percentile(lat, 50):.1f}  p90={np.percentile(lat, 90):.1f}  "
+              f"p99={np.percentile(lat, 99):.1f}  max={lat.max():.1f}")
+
+    conn = http.client.HTTPConnection(url.hostname, url.port, timeout=10)
+    conn.request('GET', '/metrics')
+    print("server", json.loads(conn.getresponse().read()))
+
+
+if __name__ == '__main__':
+    main()
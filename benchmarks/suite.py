@@ -0,0 +1,224 @@
+"""End-to-end timings of the app's hot paths at 1x, 10x and 100x data.
+
+    python -m benchmarks.suite --scales 1 10 100
+    python -m benchmarks.suite --compare .benchmarks/<old commit>.json
+
+Each page's hot path runs on synthetic data scaled from the real artifact
+tables (``benchmarks.synthetic``), through the same code the pages call:
+
+- ``recommend_properties``: feature-index top-5 plus distances to the place
+- ``radius_search``: the Location Finder's 5 km presorted-list lookup
+- ``predict_single`` / ``predict_batch``: the compiled price pipeline on one
+  row and on the whole scaled ``df.pkl`` table
+- ``dashboard_filter``: price/sector filter, per-sector means, histogram,
+  BHK counts and key statistics from the sector cube, and the filtered rows
+  thinned for the scatter plot
+- ``wordcloud_hit`` / ``wordcloud_render``: the cached PNG and a fresh render
+
+Results (median and p95 per call, with the commit and machine) are written
+as JSON to ``--out``, by default ``.benchmarks/<commit>.json``.  With
+``--compare`` the fresh run, or a second JSON file, is compared against an
+earlier one and the script exits non-zero when a path got more than
+``--max-regression`` times slower.  The predictor paths are skipped when the
+model is neither cached nor given by ``REAL_ESTATE_PRICE_PIPELINE``.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks import synthetic
+from real_estate.artifacts import REPO_DIR, ArtifactStore
+
+RESULTS_DIR = os.path.join(REPO_DIR, '.benchmarks')
+RADIUS_M = 5000
+
+
+def measure(func, inputs, budget_s):
+    """Per-call seconds of ``func`` over ``inputs``, stopping once ``budget_s`` is spent."""
+    func(inputs[0])     # warm caches and lazy imports
+    times, spent = [], 0.0
+    for value in inputs:
+        start = time.perf_counter()
+        func(value)
+        times.append(time.perf_counter() - start)
+        spent += times[-1]
+        if spent > budget_s:
+            break
+    return np.array(times)
+
+
+def recommender_paths(store, scale, rng, repeat):
+    from real_estate.recommender import DEFAULT_WEIGHTS
+    from real_estate.recommender_index import FeatureIndex
+    from real_estate.spatial import GeoGrid, NearbyLists
+
+    real = FeatureIndex.load(store)
+    blocks, names = synthetic.recommender_features(real, scale)
+    index = FeatureIndex.from_features(blocks, names)
+    geo = GeoGrid.build(*synthetic.coordinates(GeoGrid.load(store, 'recommender/geo'), scale))
+    # Landmarks without coordinates only have their scraped lists
+    places = store.table('places').dropna(subset=['lat', 'lon'])
+    nearby = NearbyLists.build(geo, places['lat'], places['lon'])
+    queries = rng.integers(0, index.size, repeat)
+    picked = rng.integers(0, len(places), repeat)
+
+    def recommend(query):
+        # As the page's recommend_properties, distances to the selected place
+        indices, scores = index.top_k(query, 5, weights=DEFAULT_WEIGHTS)
+        point = places.iloc[query % len(places)]
+        return indices, scores, geo.distance(point['lat'], point['lon'], indices) / 1000
+
+    return index.size, {
+        'recommend_properties': (recommend, list(queries)),
+        'radius_search': (lambda place: nearby.within(place, RADIUS_M), list(picked)),
+    }
+
+
+def predictor_paths(store, scale, rng, repeat):
+    from real_estate.fastpath import load_compiled
+    from real_estate.model_registry import PRICE_PIPELINE, registry
+    from real_estate.price_model import FEATURE_COLUMNS, predict_batch
+
+    if registry.cached_sha(PRICE_PIPELINE) is None and not os.environ.get('REAL_ESTATE_PRICE_PIPELINE'):
+        return 0, {}
+    pipeline = load_compiled(PRICE_PIPELINE, registry)
+    rows = synthetic.predictor_rows(store, scale)[FEATURE_COLUMNS]
+    singles = [rows.iloc[[i]] for i in rng.integers(0, len(rows), repeat)]
+    return len(rows), {
+        'predict_single': (lambda row: predict_batch(row, pipeline), singles),
+        'predict_batch': (lambda frame: predict_batch(frame, pipeline), [rows] * repeat),
+    }
+
+
+def dashboard_paths(store, scale, rng, repeat):
+    from real_estate.cube import SectorCube
+    from real_estate.plot_data import SCATTER_BUDGET, downsample
+
+    listings = synthetic.listings(store, scale)
+    cube = SectorCube.from_listings(listings)
+    all_sectors = np.array(cube.sectors)
+    low, high = cube.price_bounds()
+    selections = []
+    for _ in range(repeat):
+        lo = int(rng.uniform(low, high / 2))
+        sectors = list(rng.choice(all_sectors, rng.integers(0, 20), replace=False))
+        selections.append(((lo, int(rng.uniform(lo + 1, high + 1))), sectors))
+
+    def interact(selection):
+        price_range, sectors = selection
+        cells = cube.select(price_range, sectors)
+        cube.sector_means(cells), cube.price_histogram(cells), cube.bedroom_counts(cells), cube.key_stats(cells)
+        filtered = listings[listings['price'].between(*price_range) &
+                            listings['sector'].isin(sectors if sectors else listings['sector'].unique())]
+        return downsample(filtered[filtered['property_type'] == 'flat'], 'built_up_area', 'price', SCATTER_BUDGET)
+
+    return len(listings), {'dashboard_filter': (interact, selections)}
+
+
+def wordcloud_paths(store, scale, tmp, repeat):
+    from real_estate.wordcloud_cache import PAGE_OPTIONS, WordCloudCache
+
+    counts = synthetic.word_counts(store, scale)
+    key = f'suite-{scale}'
+    warm = WordCloudCache(os.path.join(tmp, 'warm'))
+    warm.get_or_render(key, counts, **PAGE_OPTIONS)
+    return int(counts['count'].sum()), {
+        'wordcloud_hit': (lambda _: warm.get_or_render(key, counts, **PAGE_OPTIONS), [None] * repeat * 10),
+        'wordcloud_render': (lambda _: WordCloudCache(tempfile.mkdtemp(dir=tmp)).get_or_render(
+            key, counts, **PAGE_OPTIONS), [None] * repeat),
+    }
+
+
+def git_commit():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_DIR, capture_output=True,
+                                text=True, check=True).stdout.strip()
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=REPO_DIR,
+                               capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+    return commit + ('-dirty' if dirty else '')
+
+
+def run(scales, repeat, budget_s, paths=None):
+    store = ArtifactStore()
+    rng = np.random.default_rng(0)
+    results = []
+    print(f"{'path':<22} {'scale':>6} {'rows':>9} {'calls':>6} {'median ms':>10} {'p95 ms':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for scale in scales:
+            groups = [recommender_paths(store, scale, rng, repeat), predictor_paths(store, scale, rng, repeat),
+                      dashboard_paths(store, scale, rng, repeat), wordcloud_paths(store, scale, tmp, repeat)]
+            for rows, group in groups:
+                for name, (func, inputs) in group.items():
+                    if paths and name not in paths:
+                        continue
+                    times = measure(func, inputs, budget_s) * 1e3
+                    result = {'path': name, 'scale': scale, 'rows': rows, 'calls': len(times),
+                              'median_ms': float(np.median(times)), 'p95_ms': float(np.percentile(times, 95))}
+                    results.append(result)
+                    print(f"{name:<22} {scale:>5}x {rows:>9,} {len(times):>6} {result['median_ms']:>10.3f} "
+                          f"{result['p95_ms']:>9.3f}")
+    return {
+        'commit': git_commit(),
+        'created': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'python': platform.python_version(),
+        'machine': f"{platform.machine()} {os.cpu_count()} cpu",
+        'results': results,
+    }
+
+
+def compare(base, new, max_regression):
+    """Print median ratios new/base; returns False when any path regressed past ``max_regression``."""
+    old = {(r['path'], r['scale']): r for r in base['results']}
+    ok = True
+    print(f"\n{base['commit']} -> {new['commit']}")
+    print(f"{'path':<22} {'scale':>6} {'base ms':>10} {'new ms':>10} {'ratio':>7}")
+    for result in new['results']:
+        before = old.get((result['path'], result['scale']))
+        if before is None:
+            continue
+        ratio = result['median_ms'] / before['median_ms']
+        regressed = ratio > max_regression
+        ok &= not regressed
+        print(f"{result['path']:<22} {result['scale']:>5}x {before['median_ms']:>10.3f} {result['median_ms']:>10.3f} "
+              f"{ratio:>6.2f}x{'  REGRESSION' if regressed else ''}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scales', type=int, nargs='+', default=[1, 10, 100])
+    parser.add_argument('--repeat', type=int, default=50, help="calls per path and scale")
+    parser.add_argument('--budget', type=float, default=5.0, help="seconds at most per path and scale")
+    parser.add_argument('--paths', nargs='+', help="only these hot paths")
+    parser.add_argument('--out', help="results JSON (default .benchmarks/<commit>.json)")
+    parser.add_argument('--compare', nargs='+', metavar='JSON',
+                        help="baseline results, optionally followed by results to compare instead of running")
+    parser.add_argument('--max-regression', type=float, default=1.25)
+    args = parser.parse_args()
+
+    if args.compare and len(args.compare) > 1:
+        with open(args.compare[0]) as f, open(args.compare[1]) as g:
+            sys.exit(0 if compare(json.load(f), json.load(g), args.max_regression) else 1)
+
+    results = run(args.scales, args.repeat, args.budget, args.paths)
+    out = args.out or os.path.join(RESULTS_DIR, f"{results['commit']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, 'w') as f:
+        json.dump(results, f, indent=1)
+    print(f"results written to {out}")
+    if args.compare:
+        with open(args.compare[0]) as f:
+            sys.exit(0 if compare(json.load(f), results, args.max_regression) else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+"""Synthetic page data scaled from the real artifact tables.
+
+Every generator returns ``scale`` times the real rows of one artifact: real
+rows resampled with their numbers jittered, so that categories, sparsity and
+value ranges keep the real schemas (``df.pkl`` for the predictor,
+``data_viz1.csv`` for the dashboard, the recommender's feature blocks and
+property coordinates, the facilities word counts).
+"""
+import numpy as np
+
+from real_estate.spatial import METERS_PER_DEGREE
+
+
+def _resample(n, scale, rng):
+    """Each real row once per copy, so that 1x is the real data itself."""
+    rows = np.tile(np.arange(n), scale)
+    jitter = rng.uniform(0.9, 1.1, len(rows)) if scale > 1 else np.ones(len(rows))
+    return rows, jitter
+
+
+def listings(store, scale, seed=0):
+    """Dashboard rows (``data_viz1.csv``) with jittered prices and areas."""
+    base = store.table('dashboard')
+    rows, jitter = _resample(len(base), scale, np.random.default_rng(seed))
+    out = base.iloc[rows].reset_index(drop=True)
+    out['price'] = (out['price'].to_numpy() * jitter).round(2)
+    out['built_up_area'] = out['built_up_area'].to_numpy() * jitter
+    return out
+
+
+def predictor_rows(store, scale, seed=0):
+    """Price model inputs (``df.pkl``) with jittered built-up areas."""
+    base = store.table('predictor_inputs')
+    rows, jitter = _resample(len(base), scale, np.random.default_rng(seed))
+    out = base.iloc[rows].reset_index(drop=True)
+    out['built_up_area'] = (out['built_up_area'].to_numpy() * jitter).round()
+    return out
+
+
+def recommender_features(index, scale, noise=0.05, seed=0):
+    """``(blocks, names)``: the index's blocks with rows repeated and dense values perturbed."""
+    rng = np.random.default_rng(seed)
+    rows = np.tile(np.arange(index.size), scale)
+    blocks = []
+    for block in index.blocks:
+        picked = block[rows]
+        if hasattr(picked, 'toarray'):
+            # Sparse TF-IDF keeps its vocabulary; only the weights move.
+            picked.data = picked.data * rng.uniform(1 - noise, 1 + noise, len(picked.data)).astype(picked.data.dtype)
+        elif scale > 1:
+            picked = picked + rng.normal(0, noise, picked.shape).astype(picked.dtype)
+        blocks.append(picked)
+    return blocks, [f'Property {i}' for i in range(len(rows))]
+
+
+def coordinates(geo, scale, spread_m=500, seed=0):
+    """Coordinates of ``scale`` copies of every property, jittered around the real ones.
+
+    Properties the real catalogue could not place stay NaN.
+    """
+    rng = np.random.default_rng(seed)
+    position = np.asarray(geo.position)
+    lat = np.where(position >= 0, np.asarray(geo.lat)[position], np.nan)
+    lon = np.where(position >= 0, np.asarray(geo.lon)[position], np.nan)
+    lat, lon = np.tile(lat, scale), np.tile(lon, scale)
+    if scale > 1:
+        spread = spread_m / METERS_PER_DEGREE
+        lat = lat + rng.normal(0, spread, len(lat))
+        lon = lon + rng.normal(0, spread / np.cos(np.radians(lat)), len(lon))
+    return lat, lon
+
+
+def word_counts(store, scale):
+    """Facilities word counts of a text ``scale`` times as long."""
+    counts = store.table('feature_word_counts').copy()
+    counts['count'] = counts['count'] * scale
+    return counts.reset_index(drop=True)
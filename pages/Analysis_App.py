@@ -1,10 +1,4 @@
 import streamlit as st
-import pandas as pd
-import plotly.express as px
-import pickle
-from wordcloud import WordCloud
-import matplotlib.pyplot as plt
-import seaborn as sns
 
 # Configuration
 st.set_page_config(
@@ -57,43 +51,81 @@ st.markdown("""
 st.title('🏠 Real Estate Analytics Dashboard')
 st.markdown("Explore property trends and market insights through interactive visualizations.")
 
-import os
+from real_estate.artifacts import DEFAULT_CITY
+from real_estate.cities import cities
+from real_estate.plot_data import SCATTER_BUDGET, box_traces, downsample
+from real_estate.wordcloud_cache import page_image
 
-# For files in the root 'data' folder
 
+# Memory-mapped from artifacts/<city> on first use and shared by every session
+# (python -m real_estate.artifacts --city ...)
+city_names = cities.available()
+city = DEFAULT_CITY
+if len(city_names) > 1:
+    city = st.sidebar.selectbox('🌆 City', city_names, key='city',
+                                index=city_names.index(DEFAULT_CITY) if DEFAULT_CITY in city_names else 0)
+dashboard = cities.get(city).dashboard
+# Pre-aggregated sector x type x BHK x price-bucket cells for the filters
+cube = dashboard.cube
 
 
-@st.cache_data()
-def load_data():
-    base_dir = os.path.dirname(__file__)  # Directory of the current script
-    csv_path = os.path.join(base_dir, 'Analysis_datasets', 'data_viz1.csv')
-    pkl_path = os.path.join(base_dir, 'Analysis_datasets', 'feature_text.pkl')
-    new_df = pd.read_csv(csv_path)
-    with open(pkl_path, 'rb') as f:
-        feature_text = pickle.load(f)
-    return new_df, feature_text
+@st.cache_resource()
+def load_wordcloud(city):
+    # PNG from the on-disk render cache; rendered from word counts on a miss
+    return page_image(cities.get(city).store)
 
-new_df, feature_text = load_data()
+min_price, max_price = cube.price_bounds()
 
 # Sidebar filters
 with st.sidebar:
     st.header("🔍 Filters")
     price_range = st.slider(
         "Select Price Range (Cr)",
-        min_value=int(new_df['price'].min()),
-        max_value=int(new_df['price'].max()),
-        value=(int(new_df['price'].min()), int(new_df['price'].max()))
+        min_value=int(min_price),
+        max_value=int(max_price),
+        value=(int(min_price), int(max_price))
     )
     sectors = st.multiselect(
         "Select Sectors",
-        options=new_df['sector'].unique(), 
+        options=cube.sectors,
     )
 
-# Apply filters
-filtered_df = new_df[
-    (new_df['price'].between(price_range[0], price_range[1])) &
-    (new_df['sector'].isin(sectors if sectors else new_df['sector'].unique()))
-]
+PROPERTY_TYPES = ['flat', 'house']
+
+
+@st.cache_data(max_entries=64)
+def selection_plots(city, price_range, sectors):
+    # Raw rows are filtered once per distinct selection, then reduced to what the
+    # scatter and box charts draw; other widgets rerun from this cached result
+    new_df = cities.get(city).dashboard.listings
+    filtered_df = new_df[
+        (new_df['price'].between(price_range[0], price_range[1])) &
+        (new_df['sector'].isin(sectors if sectors else new_df['sector'].unique()))
+    ]
+    scatter = {}
+    for property_type in PROPERTY_TYPES:
+        type_df = filtered_df[filtered_df['property_type'] == property_type]
+        # Density-preserving thinning keeps the figure small for large selections
+        scatter[property_type] = (downsample(type_df, 'built_up_area', 'price', SCATTER_BUDGET), len(type_df))
+    return {
+        'scatter': scatter,
+        'box_types': sorted(filtered_df['property_type'].unique()),
+        'price_boxes': box_traces(filtered_df, 'price', color='property_type', orientation='h'),
+        'bhk_boxes': box_traces(filtered_df[filtered_df['bedRoom'] <= 4], 'price', by='bedRoom',
+                                color='property_type'),
+    }
+
+
+# Apply filters: aggregates come from the cube, raw rows only feed the cached chart data
+cells = cube.select(price_range, sectors)
+
+# Plotly takes longer to import than the rest of the page; it is only needed
+# from here on, once the title and the filters have been sent to the browser.
+import plotly.express as px
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+
+plots = selection_plots(city, price_range, sectors)
 
 # Main columns layout
 col1, col2 = st.columns([3, 1])
@@ -101,7 +133,7 @@ col1, col2 = st.columns([3, 1])
 with col1:
     # Interactive Map
     with st.expander("🌍 Sector Price Distribution Map", expanded=True):
-        group_df = filtered_df.groupby('sector').mean(numeric_only=True)[['price','price_per_sqft','built_up_area','latitude','longitude']]
+        group_df = cube.sector_means(cells)
         fig_map = px.scatter_mapbox(
             group_df, 
             lat="latitude", 
@@ -124,9 +156,10 @@ with col1:
     tab1, tab2, tab3 = st.tabs(["Area vs Price", "Price Distribution", "BHK Analysis"])
     
     with tab1:
-        property_type = st.radio("Select Property Type", ['flat', 'house'], horizontal=True)
+        property_type = st.radio("Select Property Type", PROPERTY_TYPES, horizontal=True)
+        points, type_count = plots['scatter'][property_type]
         fig_scatter = px.scatter(
-            filtered_df[filtered_df['property_type'] == property_type],
+            points,
             x="built_up_area",
             y="price",
             color="bedRoom",
@@ -137,59 +170,63 @@ with col1:
         )
         fig_scatter.update_traces(marker=dict(opacity=0.7, line=dict(width=1, color='DarkSlateGrey')))
         st.plotly_chart(fig_scatter, use_container_width=True)
+        if len(points) < type_count:
+            st.caption(f"Showing {len(points):,} of {type_count:,} properties, sampled by density")
 
     with tab2:
-        fig_dist = px.histogram(
-            filtered_df,
+        hist_df = cube.price_histogram(cells).reset_index().melt(
+            id_vars='price', var_name='property_type', value_name='count')
+        fig_bars = px.bar(
+            hist_df,
             x="price",
+            y="count",
             color="property_type",
-            marginal="box",
-            nbins=50,
-            title="<b>Price Distribution Comparison</b>"
         )
+        fig_bars.update_traces(offset=0, width=cube.step)
+        # Marginal box plot from quartiles computed here, not from raw rows
+        fig_dist = make_subplots(rows=2, cols=1, shared_xaxes=True, row_heights=[0.25, 0.75],
+                                 vertical_spacing=0.03)
+        box_types = plots['box_types']
+        for trace in plots['price_boxes']:
+            fig_dist.add_trace(trace.update(showlegend=False), row=1, col=1)
+        for trace in fig_bars.data:
+            fig_dist.add_trace(trace, row=2, col=1)
+        fig_dist.update_yaxes(tickvals=list(range(len(box_types))), ticktext=box_types, row=1, col=1)
+        fig_dist.update_layout(bargap=0, barmode='relative', legend_title_text='property_type',
+                               title="<b>Price Distribution Comparison</b>")
+        fig_dist.update_xaxes(title_text='price', row=2, col=1)
+        fig_dist.update_yaxes(title_text='count', row=2, col=1)
         st.plotly_chart(fig_dist, use_container_width=True)
 
     with tab3:
         col_a, col_b = st.columns(2)
         with col_a:
+            bhk_counts = cube.bedroom_counts(cells)
             fig_pie = px.pie(
-                filtered_df,
-                names='bedRoom',
+                names=bhk_counts.index,
+                values=bhk_counts.values,
                 hole=0.4,
                 title="<b>BHK Distribution</b>"
             )
             st.plotly_chart(fig_pie, use_container_width=True)
         with col_b:
-            fig_box = px.box(
-                filtered_df[filtered_df['bedRoom'] <= 4],
-                x='bedRoom',
-                y='price',
-                color='property_type',
-                title="<b>BHK Price Comparison</b>"
-            )
+            fig_box = go.Figure(plots['bhk_boxes'])
+            fig_box.update_layout(title="<b>BHK Price Comparison</b>", legend_title_text='property_type',
+                                  xaxis_title='bedRoom', yaxis_title='price', xaxis_dtick=1)
             st.plotly_chart(fig_box, use_container_width=True)
 
 with col2:
     # Word Cloud
     with st.expander("📈 Feature Word Cloud", expanded=True):
-        wordcloud = WordCloud(
-            width=400,
-            height=400,
-            background_color='white',
-            colormap='Blues',
-            stopwords=set(['s'])
-        ).generate(feature_text)
-        plt.figure(figsize=(6, 6))
-        plt.imshow(wordcloud, interpolation='bilinear')
-        plt.axis("off")
-        st.pyplot(plt.gcf())
+        st.image(load_wordcloud(city), use_container_width=True)
 
     # Quick Stats
     with st.expander("📌 Key Statistics", expanded=True):
-        st.metric("Total Properties", len(filtered_df))
-        st.metric("Average Price", f"₹{filtered_df['price'].mean():,.0f}CR")
-        st.metric("Avg Price/Sqft", f"₹{filtered_df['price_per_sqft'].mean():,.0f}")
-        st.metric("Most Common BHK", filtered_df['bedRoom'].mode()[0])
+        stats = cube.key_stats(cells)
+        st.metric("Total Properties", stats['count'])
+        st.metric("Average Price", f"₹{stats['mean_price']:,.0f}CR")
+        st.metric("Avg Price/Sqft", f"₹{stats['mean_price_per_sqft']:,.0f}")
+        st.metric("Most Common BHK", stats['mode_bedroom'])
 
 # Footer
 st.markdown("---")
@@ -1,7 +1,4 @@
 import streamlit as st
-import pickle
-import pandas as pd
-import numpy as np
 
 # Page configuration
 st.set_page_config(
@@ -105,35 +102,28 @@ background: linear-gradient(90deg, #D8B5FF 0%, #1EAE98 100%);
 #     st.error("Could not load df.pkl or pipeline.pkl. Please make sure they exist.")
 #     st.stop()
 
-import os
-import requests
+from real_estate.artifacts import DEFAULT_CITY
+from real_estate.cities import cities
 
-base_dir = os.path.dirname(os.path.abspath(__file__))
-df_path = os.path.join(base_dir, 'df.pkl')
-with open(df_path, 'rb') as file:
-    df = pickle.load(file)
-
-import gdown
-
-
-
-
-@st.cache_data
-def download_from_gdrive(file_id, destination):
-    url = f"https://drive.google.com/uc?id={file_id}"
-    gdown.download(url, destination, quiet=False)
-    return destination
-
-file_id = "1alSmJrC2k5kbGg1-tfeqF_eLQ8yQ0_C7"
-pipeline_path = download_from_gdrive(file_id, "pipeline.pkl")
-
-with open(pipeline_path, "rb") as file:
-    pipeline = pickle.load(file)
-
-    
+city_names = cities.available()
+city = DEFAULT_CITY
+if len(city_names) > 1:
+    city = st.sidebar.selectbox('🌆 City', city_names, key='city',
+                                index=city_names.index(DEFAULT_CITY) if DEFAULT_CITY in city_names else 0)
+city_models = cities.get(city)
 
+def input_options(column):
+    # Sorted distinct training values, precomputed at artifact build time
+    return city_models.options('predictor_inputs', column)
 
+from real_estate.prediction_cache import cached_predict
 
+# The city's pipeline is resolved from the local model cache (downloaded only
+# on a cold cache) and compiled to numpy arrays so a single prediction skips
+# sklearn overhead; its conformal bands are calibrated once per model sha256.
+# Loaded once per process and kept while the city is among the recently used.
+predictor = city_models.predictor
+pipeline, intervals = predictor.pipeline, predictor.intervals
 
 
 # Visual header (emoji)
@@ -153,6 +143,13 @@ with st.sidebar:
             ---
             Built with 💡 by a Data Science Enthusiast.
         """)
+    model_metrics = predictor.metrics
+    if model_metrics:
+        st.caption(f"Model {model_metrics.sha256[:8]} loaded from {model_metrics.source} "
+                   f"in {model_metrics.fetch_seconds + model_metrics.load_seconds:.2f}s")
+    cache_stats = predictor.cache.stats()
+    st.caption(f"Prediction cache: {cache_stats['size']} entries, "
+               f"{cache_stats['hit_rate']:.0%} hit rate")
 
 # Main content card
 st.markdown('<div class="card">', unsafe_allow_html=True)
@@ -163,18 +160,18 @@ with st.form("prediction_form"):
     col1, col2 = st.columns(2)
     with col1:
         property_type = st.selectbox('🏠 Property Type', ['flat', 'house'])
-        bedrooms = float(st.selectbox('🛏️ Number of Bedrooms', sorted(df['bedRoom'].unique())))
-        balcony = st.selectbox('🌿 Number of Balconies', sorted(df['balcony'].unique()))
+        bedrooms = float(st.selectbox('🛏️ Number of Bedrooms', input_options('bedRoom')))
+        balcony = st.selectbox('🌿 Number of Balconies', input_options('balcony'))
         servant_room = float(st.selectbox('🧹 Servant Room', [0.0, 1.0]))
-        furnishing_type = st.selectbox('🛋️ Furnishing Type', sorted(df['furnishing_type'].unique()))
+        furnishing_type = st.selectbox('🛋️ Furnishing Type', input_options('furnishing_type'))
         built_up_area = st.slider('📐 Built Up Area (sqft)', 100.0, 5000.0, 1000.0, step=50.0)
     with col2:
-        sector = st.selectbox('📍 Sector', sorted(df['sector'].unique()))
-        bathroom = float(st.selectbox('🚿 Number of Bathrooms', sorted(df['bathroom'].unique())))
-        property_age = st.selectbox('📆 Property Age', sorted(df['agePossession'].unique()))
+        sector = st.selectbox('📍 Sector', input_options('sector'))
+        bathroom = float(st.selectbox('🚿 Number of Bathrooms', input_options('bathroom')))
+        property_age = st.selectbox('📆 Property Age', input_options('agePossession'))
         store_room = float(st.selectbox('📦 Store Room', [0.0, 1.0]))
-        luxury_category = st.selectbox('💎 Luxury Category', sorted(df['luxury_category'].unique()))
-        floor_category = st.selectbox('🏢 Floor Category', sorted(df['floor_category'].unique()))
+        luxury_category = st.selectbox('💎 Luxury Category', input_options('luxury_category'))
+        floor_category = st.selectbox('🏢 Floor Category', input_options('floor_category'))
     colA, colB = st.columns(2)
     with colA:
         predict = st.form_submit_button("🔮 Predict")
@@ -205,22 +202,18 @@ if show_summary:
 
 if predict:
     with st.spinner("Calculating Price..."):
-        # Create DataFrame for prediction
+        # Form values in FEATURE_COLUMNS order
         data = [[property_type, sector, bedrooms, bathroom, balcony, property_age,
                 built_up_area, servant_room, store_room,
                 furnishing_type, luxury_category, floor_category]]
-        columns = ['property_type', 'sector', 'bedRoom', 'bathroom', 'balcony',
-                'agePossession', 'built_up_area', 'servant room', 'store room',
-                'furnishing_type', 'luxury_category', 'floor_category']
-        one_df = pd.DataFrame(data, columns=columns)
-        # Predict
-        base_price = np.expm1(pipeline.predict(one_df))[0]
-        low = base_price - 0.22
-        high = base_price + 0.22
+        # Predict (repeated presses with the same inputs are served from the cache)
+        base_price = cached_predict(data, pipeline, predictor.sha256, predictor.cache)[0]
+        low, high = (float(b[0]) for b in intervals.bounds([base_price]))
         # Display result in a floating, card-like container
         st.markdown(f"""
         <div class="card floating">
             <h3 style="color: #10B981; margin-top: 0;">🏷️ Estimated Price</h3>
             <p style="font-size: 2rem; font-weight: bold; margin-bottom: 0;">₹{round(low, 2)} Cr – ₹{round(high, 2)} Cr</p>
+            <p style="margin-top: 0.25rem;">{1 - intervals.alpha:.0%} prediction interval</p>
         </div>
         """, unsafe_allow_html=True)
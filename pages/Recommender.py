@@ -1,8 +1,9 @@
 import streamlit as st
-import pickle
 import pandas as pd
-import numpy as np
-import os
+
+from real_estate.artifacts import DEFAULT_CITY
+from real_estate.cities import cities
+from real_estate.recommender import DEFAULT_WEIGHTS
 
 # Configure page settings first
 st.set_page_config(
@@ -12,17 +13,16 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-@st.cache_data()
-def load_data():
-    base_dir = os.path.dirname(__file__)
-    recommender_dir = os.path.join(base_dir, 'Recommender_System')
-    location_df = pd.read_pickle(os.path.join(recommender_dir, 'location_distance.pkl'))
-    cosine_sim1 = pd.read_pickle(os.path.join(recommender_dir, 'cosine_sim1.pkl'))
-    cosine_sim2 = pd.read_pickle(os.path.join(recommender_dir, 'cosine_sim2.pkl'))
-    cosine_sim3 = pd.read_pickle(os.path.join(recommender_dir, 'cosine_sim3.pkl'))
-    return location_df, cosine_sim1, cosine_sim2, cosine_sim3
-
-location_df, cosine_sim1, cosine_sim2, cosine_sim3 = load_data()
+# The city's arrays are memory-mapped from artifacts/<city> on first use and
+# shared by every session (python -m real_estate.artifacts --city ...)
+city_names = cities.available()
+city = DEFAULT_CITY
+if len(city_names) > 1:
+    city = st.sidebar.selectbox('🌆 City', city_names, key='city',
+                                index=city_names.index(DEFAULT_CITY) if DEFAULT_CITY in city_names else 0)
+recommender = cities.get(city).recommender
+places, geo, nearby, index, property_names = (recommender.places, recommender.geo, recommender.nearby,
+                                              recommender.index, recommender.property_names)
 
 # Custom CSS for better styling
 st.markdown("""
@@ -69,16 +69,22 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+WEIGHT_LABELS = {'location': 'Location Proximity', 'price': 'Price Similarity', 'facilities': 'Amenities Match'}
+
 def recommend_properties(property_name, top_n=5):
     try:
-        cosine_sim_matrix = 0.5 * cosine_sim1 + 0.8 * cosine_sim2 + 1 * cosine_sim3
-        sim_scores = list(enumerate(cosine_sim_matrix[location_df.index.get_loc(property_name)]))
-        sorted_scores = sorted(sim_scores, key=lambda x: x[1], reverse=True)[1:top_n + 1]
+        indices, scores = index.top_k(property_names.get_loc(property_name), top_n, weights=DEFAULT_WEIGHTS)
+        place = places.index.get_loc(selected_location)
+        if places['kind'].iat[place] == 'landmark':
+            # Distances as each listing gave them; blank where it does not mention the landmark
+            distances = nearby.distance(place, indices)
+        else:
+            distances = geo.distance(places['lat'].iat[place], places['lon'].iat[place], indices)
         
         recommendations = pd.DataFrame({
-            'PropertyName': location_df.index[[i[0] for i in sorted_scores]],
-            'Match Score': [f"{i[1]:.0%}" for i in sorted_scores],
-            'Distance (km)': [location_df.iloc[i[0]][selected_location]/1000 if selected_location in location_df.columns else np.nan for i in sorted_scores]
+            'PropertyName': property_names[indices],
+            'Match Score': [f"{score:.0%}" for score in scores],
+            'Distance (km)': distances / 1000
         })
         
         return recommendations
@@ -99,7 +105,7 @@ with col1:
     with st.container():
         selected_location = st.selectbox(
             'Select Neighborhood',
-            sorted(location_df.columns.to_list()),
+            sorted(places.index.to_list()),
             help="Choose your preferred area"
         )
         
@@ -113,15 +119,15 @@ with col1:
         )
         
         if st.button('🔍 Search Properties', use_container_width=True):
-            results = location_df[location_df[selected_location] < radius*1000][selected_location].sort_values()
-            st.session_state.search_results = results.reset_index(name='Distance') \
-                .rename(columns={'index': 'Property', 'Distance': 'Distance (meters)'})
+            ids, meters = nearby.within(places.index.get_loc(selected_location), radius*1000)
+            st.session_state.search_results = pd.DataFrame({'PropertyName': property_names[ids],
+                                                            'Distance (meters)': meters})
 
 with col2:
     st.subheader("🤖 Smart Recommendations")
     selected_property = st.selectbox(
         'Select a Property',
-        sorted(location_df.index.to_list()),
+        sorted(property_names.to_list()),
         help="Choose a property to find similar options"
     )
     
@@ -147,6 +153,12 @@ if 'search_results' in st.session_state:
         },
         hide_index=True
     )
+    if places.loc[selected_location, 'kind'] == 'landmark':
+        st.caption("Distances as listed by each property for this landmark")
+    elif geo.size < len(property_names):
+        # Localities are searched on coordinates, which some listings lack
+        st.caption(f"{len(property_names) - geo.size} of {len(property_names)} properties have no known "
+                   "location and are not shown around localities")
 
 if 'recommendations' in st.session_state:
     st.subheader("🎯 Recommended Matches")
@@ -170,18 +182,19 @@ if 'recommendations' in st.session_state:
 # Sidebar with additional info
 with st.sidebar:
     st.header("ℹ️ How It Works")
-    st.markdown("""
-    Our AI-powered recommender considers:
-    - **Location Proximity** (50% weight)
-    - **Price Similarity** (80% weight)
-    - **Amenities Match** (100% weight)
-    
-    Recommendations are sorted by overall match score.
-    """)
+    # The weights top_k actually blends with
+    weight_lines = "\n".join(f"- **{label}** ({DEFAULT_WEIGHTS[block]:.0%} weight)"
+                             for block, label in WEIGHT_LABELS.items())
+    st.markdown(f"""
+Our AI-powered recommender considers:
+{weight_lines}
+
+Recommendations are sorted by overall match score.
+""")
     
     st.markdown("---")
     st.subheader("📊 Quick Stats")
-    st.metric("Total Properties", len(location_df))
+    st.metric("Total Properties", len(property_names))
     st.metric("Average Recommendations", "5-10 options")
     
     st.markdown("---")
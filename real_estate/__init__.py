@@ -0,0 +1 @@
+"""Shared serving code for the Real Estate AI Suite pages."""
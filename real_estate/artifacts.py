@@ -0,0 +1,311 @@
+"""Versioned, memory-mapped artifact store shared by the Streamlit pages.
+
+Every page used to unpickle or ``read_csv`` its own private copy of the data
+in each worker process.  The store keeps numeric matrices as ``.npy`` and
+tables as uncompressed Arrow IPC files, both opened with ``mmap``, so every
+worker shares the same OS page cache and cold starts only map files.
+
+``manifest.json`` records the schema version, the sha256 of every file and a
+combined ``content_hash`` that changes whenever any artifact changes.
+
+Each city is its own store, ``artifacts/<city>/``.  Gurgaon is built from
+the files in this repository; any other city from a directory holding the
+same inputs under the names in ``SOURCE_FILES``.
+
+    python -m real_estate.artifacts                                # convert the page inputs
+    python -m real_estate.artifacts --city pune --sources data/pune
+    python -m real_estate.artifacts --verify                       # re-hash files against the manifest
+"""
+import argparse
+import hashlib
+import json
+import os
+import pickle
+import time
+
+import numpy as np
+import pandas as pd
+
+from real_estate.csr import CSRRows
+
+SCHEMA_VERSION = 1
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ARTIFACTS_DIR = os.environ.get('REAL_ESTATE_ARTIFACTS', os.path.join(REPO_DIR, 'artifacts'))
+DEFAULT_CITY = os.environ.get('REAL_ESTATE_CITY', 'gurgaon')
+MANIFEST = 'manifest.json'
+
+# Inputs of one city's store, by role, and their file names in a sources directory
+SOURCE_FILES = {
+    'apartments': 'appartments.csv',
+    'predictor_inputs': 'df.pkl',
+    'dashboard': 'data_viz1.csv',
+    'feature_text': 'feature_text.pkl',
+    'latlong': 'latlong.csv',
+}
+REPO_SOURCES = {
+    'apartments': os.path.join(REPO_DIR, 'Data Preprocessing', 'appartments.csv'),
+    'predictor_inputs': os.path.join(REPO_DIR, 'pages', 'df.pkl'),
+    'dashboard': os.path.join(REPO_DIR, 'pages', 'Analysis_datasets', 'data_viz1.csv'),
+    'feature_text': os.path.join(REPO_DIR, 'pages', 'Analysis_datasets', 'feature_text.pkl'),
+    'latlong': os.path.join(REPO_DIR, 'pages', 'Analysis_datasets', 'latlong.csv'),
+}
+REPO_CITY = 'gurgaon'
+
+
+def city_root(city, artifacts_dir=ARTIFACTS_DIR):
+    """Directory of one city's artifact store."""
+    return os.path.join(artifacts_dir, city)
+
+
+def available_cities(artifacts_dir=ARTIFACTS_DIR):
+    """Cities with a built store, sorted."""
+    if not os.path.isdir(artifacts_dir):
+        return []
+    return sorted(name for name in os.listdir(artifacts_dir)
+                  if os.path.exists(os.path.join(artifacts_dir, name, MANIFEST)))
+
+
+def city_sources(city, sources_dir=None):
+    """Paths of the inputs a city's store is built from."""
+    if sources_dir is None:
+        if city != REPO_CITY:
+            raise ValueError(f"No sources for {city!r}; pass the directory holding its "
+                             f"{', '.join(SOURCE_FILES.values())}")
+        return dict(REPO_SOURCES)
+    return {role: os.path.join(sources_dir, name) for role, name in SOURCE_FILES.items()}
+
+
+DEFAULT_ROOT = city_root(DEFAULT_CITY)
+
+
+def _sha256(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _create_temp(directory, suffix='.tmp'):
+    """``(file, path)`` of a new file in ``directory`` to be renamed into place.
+
+    Unlike ``mkstemp``'s 0600, the file gets the umask's default mode, so a
+    store or cache written by one user stays readable by the service user.
+    """
+    path = os.path.join(directory, f'{os.urandom(8).hex()}{suffix}')
+    return open(path, 'xb'), path
+
+
+def _atomic_write(path, write):
+    """Write through a temp file so readers never map a half-written file."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    f, tmp = _create_temp(os.path.dirname(path))
+    try:
+        with f:
+            write(f)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+class ArtifactStore:
+    """Directory of named artifacts described by ``manifest.json``."""
+
+    def __init__(self, root=DEFAULT_ROOT):
+        self.root = root
+        self.manifest = {'schema_version': SCHEMA_VERSION, 'entries': {}}
+        path = os.path.join(root, MANIFEST)
+        if os.path.exists(path):
+            with open(path) as f:
+                self.manifest = json.load(f)
+            version = self.manifest.get('schema_version')
+            if version != SCHEMA_VERSION:
+                raise ValueError(
+                    f"Artifact store {root} has schema version {version}, expected {SCHEMA_VERSION}; "
+                    "rebuild it with `python -m real_estate.artifacts`")
+
+    @property
+    def entries(self):
+        return self.manifest['entries']
+
+    @property
+    def content_hash(self):
+        return self.manifest.get('content_hash')
+
+    def __contains__(self, name):
+        return name in self.entries
+
+    def path(self, name):
+        return os.path.join(self.root, self._entry(name)['file'])
+
+    def _entry(self, name):
+        try:
+            return self.entries[name]
+        except KeyError:
+            raise KeyError(f"No artifact named {name!r} in {self.root}") from None
+
+    def _record(self, name, file, kind, **meta):
+        path = os.path.join(self.root, file)
+        self.entries[name] = {
+            'file': file,
+            'kind': kind,
+            'sha256': _sha256(path),
+            'bytes': os.path.getsize(path),
+            **meta,
+        }
+
+    # Writers
+
+    def put_array(self, name, array):
+        array = np.ascontiguousarray(array)
+        file = f'{name}.npy'
+        _atomic_write(os.path.join(self.root, file), lambda f: np.save(f, array))
+        self._record(name, file, 'array', dtype=str(array.dtype), shape=list(array.shape))
+
+    def put_matrix(self, name, frame):
+        """Numeric DataFrame stored as one ``.npy`` plus its row/column labels."""
+        self.put_array(name, frame.to_numpy())
+        labels = {
+            'index': frame.index.tolist(),
+            'index_name': frame.index.name,
+            'columns': frame.columns.tolist(),
+        }
+        file = f'{name}.labels.json'
+        _atomic_write(os.path.join(self.root, file), lambda f: f.write(json.dumps(labels).encode()))
+        self.entries[name].update(kind='matrix', labels=file)
+
+    def put_sparse(self, name, matrix):
+        """Sparse matrix stored as its CSR ``data``/``indices``/``indptr`` arrays."""
+        matrix = CSRRows.from_matrix(matrix, matrix.data.dtype)
+        self.put_array(f'{name}.indices', matrix.indices)
+        self.put_array(f'{name}.indptr', matrix.indptr)
+        self.put_array(name, matrix.data)
+        self.entries[name].update(kind='sparse', shape=list(matrix.shape))
+
+    def put_table(self, name, frame):
+        """Mixed-dtype DataFrame stored as an uncompressed Arrow IPC file."""
+        import pyarrow as pa
+
+        table = pa.Table.from_pandas(frame, preserve_index=True)
+        file = f'{name}.arrow'
+
+        def write(f):
+            with pa.ipc.new_file(f, table.schema) as writer:
+                writer.write_table(table)
+
+        _atomic_write(os.path.join(self.root, file), write)
+        self._record(name, file, 'table', rows=len(frame), columns=[str(c) for c in frame.columns])
+
+    def put_text(self, name, text):
+        file = f'{name}.txt'
+        _atomic_write(os.path.join(self.root, file), lambda f: f.write(text.encode('utf-8')))
+        self._record(name, file, 'text')
+
+    def commit(self):
+        """Write the manifest; call once after the ``put_*`` calls."""
+        digest = hashlib.sha256()
+        for name in sorted(self.entries):
+            digest.update(f"{name}:{self.entries[name]['sha256']}\n".encode())
+        self.manifest.update(
+            schema_version=SCHEMA_VERSION,
+            content_hash=digest.hexdigest(),
+            created=time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        )
+        data = json.dumps(self.manifest, indent=1, sort_keys=True).encode()
+        _atomic_write(os.path.join(self.root, MANIFEST), lambda f: f.write(data))
+
+    # Readers
+
+    def array(self, name, mmap_mode='r'):
+        return np.load(self.path(name), mmap_mode=mmap_mode)
+
+    def matrix(self, name):
+        entry = self._entry(name)
+        with open(os.path.join(self.root, entry['labels'])) as f:
+            labels = json.load(f)
+        index = pd.Index(labels['index'], name=labels['index_name'])
+        return pd.DataFrame(self.array(name), index=index, columns=labels['columns'], copy=False)
+
+    def sparse(self, name):
+        """``CSRRows`` over the memory-mapped arrays."""
+        return CSRRows(self.array(name), self.array(f'{name}.indices'), self.array(f'{name}.indptr'),
+                       self._entry(name)['shape'][1])
+
+    def table(self, name):
+        import pyarrow as pa
+
+        source = pa.memory_map(self.path(name), 'r')
+        # split_blocks lets numeric columns stay views onto the mapped file.
+        return pa.ipc.open_file(source).read_all().to_pandas(split_blocks=True)
+
+    def text(self, name):
+        with open(self.path(name), encoding='utf-8') as f:
+            return f.read()
+
+    def verify(self):
+        """Return the names whose file no longer matches its recorded hash."""
+        return [name for name, entry in self.entries.items()
+                if _sha256(os.path.join(self.root, entry['file'])) != entry['sha256']]
+
+
+def build(root=DEFAULT_ROOT, prerender=False, city=REPO_CITY, sources=None):
+    """Convert the pickles and CSVs the pages load into ``root``.
+
+    ``sources`` maps the roles in ``SOURCE_FILES`` to paths (default: the
+    repository's Gurgaon files).
+    """
+    from real_estate import recommender_build
+    from real_estate.cube import build_cube
+    from real_estate.datasets import OPTIONS_ARTIFACT, optimize_dtypes, widget_options
+    from real_estate.wordcloud_cache import page_image, word_frequencies
+
+    sources = sources or city_sources(city)
+    recommender_build.build(sources['apartments'], root, verbose=False, latlong=sources['latlong'], city=city)
+
+    store = ArtifactStore(root)
+
+    tables = {'predictor_inputs': optimize_dtypes(pd.read_pickle(sources['predictor_inputs']))}
+
+    dashboard = pd.read_csv(sources['dashboard'])
+    tables['dashboard'] = optimize_dtypes(dashboard)
+    store.put_table('dashboard_cube', build_cube(dashboard))
+    for name, table in tables.items():
+        store.put_table(name, table)
+    store.put_text(OPTIONS_ARTIFACT, json.dumps(widget_options(tables)))
+    with open(sources['feature_text'], 'rb') as f:
+        feature_text = pickle.load(f)
+    store.put_text('feature_text', feature_text)
+    store.put_table('feature_word_counts', word_frequencies(feature_text))
+
+    store.commit()
+    if prerender:
+        page_image(store)
+    return store
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or verify the shared artifact store")
+    parser.add_argument('--city', default=DEFAULT_CITY)
+    parser.add_argument('--sources', help=f"directory with the city's {', '.join(SOURCE_FILES.values())} "
+                                          f"(default: this repository's files, {REPO_CITY} only)")
+    parser.add_argument('--root', help="store to write (default artifacts/<city>)")
+    parser.add_argument('--verify', action='store_true', help="check file hashes against the manifest")
+    parser.add_argument('--prerender', action='store_true', help="also render the dashboard word cloud")
+    args = parser.parse_args()
+
+    root = args.root or city_root(args.city)
+    if args.verify:
+        store = ArtifactStore(root)
+        stale = store.verify()
+        print("ok" if not stale else f"hash mismatch: {', '.join(stale)}")
+        raise SystemExit(1 if stale else 0)
+
+    store = build(root, args.prerender, args.city, city_sources(args.city, args.sources))
+    for name, entry in sorted(store.entries.items()):
+        print(f"{name:<28} {entry['kind']:<7} {entry['bytes'] / 1e6:8.2f} MB")
+    print(f"content hash {store.content_hash}")
+
+
+if __name__ == '__main__':
+    main()
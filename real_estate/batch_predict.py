@@ -0,0 +1,144 @@
+"""Bulk valuation of CSV or Parquet files with the price pipeline.
+
+    python -m real_estate.batch_predict listings.parquet valued.parquet --workers 4
+
+The input is streamed in chunks of ``--chunksize`` rows, each chunk is
+scored with ``predict_batch`` (optionally in a process pool, where every
+worker loads the model once) and appended to the output as soon as it is
+ready, so memory stays bounded by ``workers x chunksize`` rows.  The output
+holds the input columns plus ``predicted_price`` (Cr), and with
+``--intervals`` the conformal bounds ``predicted_low``/``predicted_high``.
+Throughput is printed at the end so regressions show up in nightly logs.
+"""
+import argparse
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from real_estate.price_model import CATEGORICAL_COLUMNS, category_string, predict_batch
+
+PREDICTION_COLUMN = 'predicted_price'
+INTERVAL_COLUMNS = ('predicted_low', 'predicted_high')
+
+
+def _is_parquet(path):
+    return os.path.splitext(path)[1].lower() in ('.parquet', '.pq')
+
+
+def read_chunks(path, chunksize):
+    """Yield DataFrames of at most ``chunksize`` rows."""
+    if _is_parquet(path):
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize=chunksize)
+
+
+def _arrow_table(chunk):
+    """Arrow table of ``chunk`` with its ``CATEGORICAL_COLUMNS`` as strings.
+
+    ``read_csv`` infers dtypes per chunk (``balcony`` is int64 until a '3+'
+    shows up), so the Parquet schema cannot follow the first chunk's dtypes.
+    """
+    import pyarrow as pa
+
+    categorical = [c for c in CATEGORICAL_COLUMNS if c in chunk.columns]
+    chunk = chunk.assign(**{c: chunk[c].map(category_string).astype(object) for c in categorical})
+    table = pa.Table.from_pandas(chunk, preserve_index=False)
+    for column in categorical:
+        table = table.set_column(table.schema.get_field_index(column), column, table[column].cast(pa.string()))
+    return table
+
+
+class ChunkWriter:
+    """Appends scored chunks to a CSV or Parquet file."""
+
+    def __init__(self, path):
+        self.path = path
+        self._parquet = None
+        self._first = True
+
+    def write(self, chunk):
+        if _is_parquet(self.path):
+            import pyarrow.parquet as pq
+
+            table = _arrow_table(chunk)
+            if self._parquet is None:
+                self._parquet = pq.ParquetWriter(self.path, table.schema)
+            self._parquet.write_table(table.cast(self._parquet.schema))
+        else:
+            chunk.to_csv(self.path, mode='w' if self._first else 'a', header=self._first, index=False)
+        self._first = False
+
+    def close(self):
+        if self._parquet is not None:
+            self._parquet.close()
+
+
+def score_chunk(chunk, intervals=False):
+    prices = predict_batch(chunk)
+    columns = {PREDICTION_COLUMN: prices}
+    if intervals:
+        from real_estate.intervals import load_intervals
+
+        columns.update(zip(INTERVAL_COLUMNS, load_intervals().bounds(prices)))
+    return chunk.assign(**columns)
+
+
+def run(input_path, output_path, chunksize=100_000, workers=1, verbose=False, intervals=False):
+    """Score ``input_path`` into ``output_path``; returns ``(rows, seconds)``."""
+    writer = ChunkWriter(output_path)
+    rows = 0
+    start = time.perf_counter()
+
+    def emit(scored):
+        nonlocal rows
+        writer.write(scored)
+        rows += len(scored)
+        if verbose:
+            elapsed = time.perf_counter() - start
+            print(f"{rows:>12,} rows  {rows / elapsed:>12,.0f} rows/s", file=sys.stderr)
+
+    try:
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                # Keep at most two chunks per worker in flight so a huge input
+                # is never read into memory ahead of the scorers.
+                pending = deque()
+                for chunk in read_chunks(input_path, chunksize):
+                    pending.append(pool.submit(score_chunk, chunk, intervals))
+                    if len(pending) >= 2 * workers:
+                        emit(pending.popleft().result())
+                while pending:
+                    emit(pending.popleft().result())
+        else:
+            for chunk in read_chunks(input_path, chunksize):
+                emit(score_chunk(chunk, intervals))
+    finally:
+        writer.close()
+    return rows, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Value every listing of a CSV/Parquet file")
+    parser.add_argument('input')
+    parser.add_argument('output', help=".csv or .parquet, written incrementally")
+    parser.add_argument('--chunksize', type=int, default=100_000)
+    parser.add_argument('--workers', type=int, default=1, help="scoring processes")
+    parser.add_argument('--intervals', action='store_true', help="add conformal low/high columns")
+    parser.add_argument('-v', '--verbose', action='store_true', help="report progress per chunk")
+    args = parser.parse_args()
+
+    rows, seconds = run(args.input, args.output, args.chunksize, args.workers, args.verbose,
+                         args.intervals)
+    print(f"scored {rows:,} rows in {seconds:.2f}s ({rows / max(seconds, 1e-9):,.0f} rows/s)")
+
+
+if __name__ == '__main__':
+    main()
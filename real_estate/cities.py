@@ -0,0 +1,178 @@
+"""Lazily loaded, per-city serving state with an LRU over cities.
+
+The artifact store is sharded by city (``artifacts/<city>/``) and every city
+has its own price pipeline.  ``CityModels.get`` returns a ``City`` whose
+parts (the predictor, the recommender arrays, the dashboard tables) are only
+mapped or unpickled when a page first asks for them, so a session that only
+opens the dashboard never loads a model.  At most ``REAL_ESTATE_MAX_CITIES``
+cities stay loaded per process; the least recently used one is dropped, its
+model evicted from the registry and its memory maps released once no
+session still holds them.
+
+    from real_estate.cities import cities
+    recommender = cities.get('gurgaon').recommender
+"""
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import pandas as pd
+
+from real_estate.artifacts import (ARTIFACTS_DIR, DEFAULT_CITY, MANIFEST, REPO_CITY, ArtifactStore, available_cities,
+                                   city_root)
+from real_estate.datasets import OPTIONS_ARTIFACT
+
+MAX_CITIES = int(os.environ.get('REAL_ESTATE_MAX_CITIES', 4))
+
+
+@dataclass
+class Predictor:
+    pipeline: object
+    intervals: object
+    sha256: str
+    cache: object           # this city's PredictionCache
+    metrics: object         # LoadMetrics of the model
+
+
+@dataclass
+class Recommender:
+    places: pd.DataFrame
+    geo: object
+    nearby: object
+    index: object
+    property_names: pd.Index
+
+
+@dataclass
+class Dashboard:
+    listings: pd.DataFrame
+    cube: object
+
+
+class City:
+    """One city's store; each part is loaded on first access."""
+
+    def __init__(self, name, root):
+        self.name = name
+        self.root = root
+        self.store = ArtifactStore(root)
+        self.model_name = None
+        self._parts = {}
+        self._lock = threading.Lock()
+
+    def _part(self, key, load):
+        part = self._parts.get(key)
+        if part is None:
+            with self._lock:
+                part = self._parts.get(key)
+                if part is None:
+                    part = self._parts[key] = load()
+        return part
+
+    @property
+    def loaded(self):
+        """Names of the parts loaded so far."""
+        return sorted(self._parts)
+
+    def options(self, table, column):
+        """Precomputed sorted distinct values of ``table.column``."""
+        return self._part('options', lambda: json.loads(self.store.text(OPTIONS_ARTIFACT)))[table][column]
+
+    @property
+    def predictor(self):
+        return self._part('predictor', self._load_predictor)
+
+    @property
+    def recommender(self):
+        return self._part('recommender', self._load_recommender)
+
+    @property
+    def dashboard(self):
+        return self._part('dashboard', self._load_dashboard)
+
+    def _load_predictor(self):
+        from real_estate.fastpath import load_compiled
+        from real_estate.intervals import load_intervals
+        from real_estate.model_registry import LoadMetrics, register_city, registry
+        from real_estate.prediction_cache import PredictionCache, prediction_cache
+        from real_estate.price_model import TRAINING_CSV
+
+        self.model_name = register_city(self.name)
+        path, sha, source, fetch_seconds = registry.resolve(self.model_name)
+        start = time.perf_counter()
+        # Compiled arrays cached per model sha256: no sklearn import once compiled.
+        pipeline = load_compiled(self.model_name, registry)
+        metrics = LoadMetrics(sha, os.path.getsize(path), source, fetch_seconds, time.perf_counter() - start)
+        # Only the repository's city can calibrate on first use; others ship a calibration.
+        intervals = load_intervals(self.model_name, training_csv=TRAINING_CSV if self.name == REPO_CITY else None)
+        # Per city, so that switching cities does not clear a shared cache keyed on one model.
+        cache = PredictionCache(prediction_cache.maxsize, prediction_cache.ttl)
+        return Predictor(pipeline, intervals, sha, cache, metrics)
+
+    def _load_recommender(self):
+        from real_estate.recommender_index import FeatureIndex
+        from real_estate.spatial import GeoGrid, NearbyLists
+
+        index = FeatureIndex.load(self.store)
+        return Recommender(self.store.table('places'), GeoGrid.load(self.store, 'recommender/geo'),
+                           NearbyLists.load(self.store, 'recommender/nearby'), index, pd.Index(index.names))
+
+    def _load_dashboard(self):
+        from real_estate.cube import SectorCube
+
+        return Dashboard(self.store.table('dashboard'), SectorCube(self.store.table('dashboard_cube')))
+
+    def close(self):
+        """Drop every loaded part and evict the city's model from the registry."""
+        with self._lock:
+            self._parts.clear()
+        if self.model_name is not None:
+            from real_estate.model_registry import registry
+
+            registry.evict(self.model_name)
+
+
+class CityModels:
+    """LRU of loaded cities, shared by every session of the process."""
+
+    def __init__(self, artifacts_dir=ARTIFACTS_DIR, max_cities=MAX_CITIES):
+        self.artifacts_dir = artifacts_dir
+        self.max_cities = max_cities
+        self._cities = OrderedDict()
+        self._lock = threading.Lock()
+        self.loads = self.evictions = 0
+
+    def available(self):
+        """Cities with a built store."""
+        return available_cities(self.artifacts_dir)
+
+    def loaded(self):
+        """Loaded cities, least recently used first."""
+        with self._lock:
+            return list(self._cities)
+
+    def get(self, name=DEFAULT_CITY):
+        with self._lock:
+            city = self._cities.get(name)
+            if city is not None:
+                self._cities.move_to_end(name)
+                return city
+            root = city_root(name, self.artifacts_dir)
+            if not os.path.exists(os.path.join(root, MANIFEST)):
+                raise KeyError(f"No artifacts for city {name!r} in {self.artifacts_dir}")
+            city = self._cities[name] = City(name, root)
+            self.loads += 1
+            evicted = []
+            while len(self._cities) > self.max_cities:
+                evicted.append(self._cities.popitem(last=False)[1])
+                self.evictions += 1
+        for old in evicted:
+            old.close()
+        return city
+
+
+# Process-wide LRU shared by every Streamlit session.
+cities = CityModels()
@@ -0,0 +1,24 @@
+"""Resumable, concurrent 99acres listing crawler.
+
+Replaces the page loop in ``Data Collection/Web_scraping.ipynb``, which
+fetched one page at a time, asked for the restart page with ``input()``
+after an IP block and concatenated CSVs into an ever-growing DataFrame::
+
+    python -m real_estate.crawler --city gurgaon --pages 1-50
+    python -m real_estate.crawler --city gurgaon            # resume, then merge
+    python -m real_estate.crawler --city gurgaon --merge-only --csv flats.csv
+
+- ``frontier``: SQLite store of every search and detail URL with its state,
+  plus the checkpoint of committed shards; a run picks up whatever is still
+  pending, so restarting the command is all a resume takes
+- ``fetch``: one pooled aiohttp session with a per-host connection cap and
+  request rate, retries with backoff on 429/5xx and timeouts
+- ``parse``: BeautifulSoup extraction with the notebook's selectors, run in
+  a process pool so parsing never stalls the event loop
+- ``shards``: append-only Parquet shards, each committed together with the
+  detail URLs it holds, and one streaming pass that merges them
+
+Everything takes a ``base_url``, so the whole crawl runs against a local
+fixture server (``benchmarks/bench_crawler.py``).  A pages/min summary is
+printed at the end of each run.
+"""
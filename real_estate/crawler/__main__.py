@@ -0,0 +1,3 @@
+from real_estate.crawler.crawl import main
+
+main()
@@ -0,0 +1,196 @@
+"""Crawl loop and command line (``python -m real_estate.crawler``)."""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+from real_estate.artifacts import REPO_DIR
+from real_estate.crawler.fetch import Fetcher
+from real_estate.crawler.frontier import DETAIL, SEARCH, Frontier
+from real_estate.crawler.parse import parse_page
+from real_estate.crawler.shards import ShardWriter, merge_shards
+
+BASE_URL = 'https://www.99acres.com'
+SEARCH_PATH = '/flats-in-{city}-ffid-page-{page}'
+DEFAULT_ROOT = os.path.join(REPO_DIR, 'Data Collection', 'crawl')
+
+
+def search_urls(base_url, city, pages, path=SEARCH_PATH):
+    return [(base_url.rstrip('/') + path.format(city=city, page=page), {}) for page in pages]
+
+
+@dataclass
+class CrawlStats:
+    pages: int = 0
+    search_pages: int = 0
+    rows: int = 0
+    listings_found: int = 0
+    failed: int = 0
+    blocked: int = 0
+    requests: int = 0
+    retries: int = 0
+    seconds: float = 0.0
+
+    @property
+    def pages_per_minute(self):
+        return self.pages / self.seconds * 60 if self.seconds else 0.0
+
+    def summary(self):
+        return (f"{self.pages} pages in {self.seconds:.1f}s ({self.pages_per_minute:.0f} pages/min): "
+                f"{self.search_pages} search pages found {self.listings_found} new listings, {self.rows} rows "
+                f"written; {self.requests} requests, {self.retries} retries, {self.failed} failed, "
+                f"{self.blocked} blocked")
+
+
+class Crawler:
+    """Drains the frontier with ``concurrency`` pages in flight.
+
+    ``max_pages`` caps the pages fetched in one run; after ``max_blocked``
+    blocked pages in a row the run stops claiming work, so the next run
+    (once the block has lifted) carries on from the frontier.
+    """
+
+    def __init__(self, frontier, fetcher, shards, pool=None, concurrency=8, max_pages=None, max_blocked=5):
+        self.frontier = frontier
+        self.fetcher = fetcher
+        self.shards = shards
+        self.pool = pool
+        self.concurrency = concurrency
+        self.max_pages = max_pages
+        self.max_blocked = max_blocked
+        self.stats = CrawlStats()
+        self._blocked_run = 0
+
+    async def _parse(self, kind, html, url, meta):
+        if self.pool is None:
+            return parse_page(kind, html, url, meta)
+        return await asyncio.get_running_loop().run_in_executor(self.pool, parse_page, kind, html, url, meta)
+
+    async def _visit(self, url, kind, meta):
+        try:
+            html = await self.fetcher.get(url)
+            result = await self._parse(kind, html, url, meta)
+        except Exception as e:
+            self.stats.failed += 1
+            self.frontier.fail(url, f"{type(e).__name__}: {e}")
+            print(f"failed {url}: {e}", file=sys.stderr)
+            return
+        self.stats.pages += 1
+        if result is None:
+            self.stats.blocked += 1
+            self._blocked_run += 1
+            self.frontier.fail(url, 'blocked')
+            return
+        self._blocked_run = 0
+        if kind == SEARCH:
+            self.stats.search_pages += 1
+            self.stats.listings_found += self.frontier.add(result, DETAIL)
+            self.frontier.complete([url])
+        else:
+            self.stats.rows += 1
+            self.shards.add(url, result)
+
+    def _budget(self, started):
+        if self._blocked_run >= self.max_blocked:
+            return 0
+        free = self.concurrency
+        if self.max_pages is not None:
+            free = min(free, self.max_pages - started)
+        return max(free, 0)
+
+    async def run(self):
+        start = time.perf_counter()
+        started = 0
+        in_flight = {}
+        try:
+            while True:
+                free = self._budget(started) - len(in_flight)
+                if free > 0:
+                    for url, kind, meta in self.frontier.claim(free):
+                        in_flight[asyncio.create_task(self._visit(url, kind, meta))] = url
+                        started += 1
+                if not in_flight:
+                    break
+                done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    del in_flight[task]
+        finally:
+            # On cancellation, stop the pages still in flight and hand them back.
+            for task in in_flight:
+                task.cancel()
+            await asyncio.gather(*in_flight, return_exceptions=True)
+            self.frontier.release(in_flight.values())
+            self.shards.flush()
+            self.stats.requests = self.fetcher.requests
+            self.stats.retries = self.fetcher.retried
+            self.stats.seconds = time.perf_counter() - start
+        if self._blocked_run >= self.max_blocked:
+            print(f"stopped after {self._blocked_run} blocked pages in a row; run again later to resume",
+                  file=sys.stderr)
+        return self.stats
+
+
+async def crawl(frontier, shards, fetcher_options, pool=None, concurrency=8, max_pages=None, max_blocked=5):
+    async with Fetcher(concurrency=concurrency, **fetcher_options) as fetcher:
+        crawler = Crawler(frontier, fetcher, shards, pool, concurrency, max_pages, max_blocked)
+        return await crawler.run()
+
+
+def _page_range(text):
+    lo, _, hi = text.partition('-')
+    return range(int(lo), int(hi or lo) + 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Resumable concurrent 99acres listing crawler")
+    parser.add_argument('--city', default='gurgaon')
+    parser.add_argument('--pages', type=_page_range, help="search pages to queue, e.g. 1-50 (already queued "
+                                                          "pages are skipped; omit to just resume)")
+    parser.add_argument('--base-url', default=BASE_URL, help="site root, e.g. a local fixture server")
+    parser.add_argument('--search-path', default=SEARCH_PATH)
+    parser.add_argument('--root', default=DEFAULT_ROOT, help="crawl state lives in <root>/<city>")
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--per-host', type=int, default=4, help="open connections per host")
+    parser.add_argument('--rate', type=float, default=0.5, help="requests per second per host (0 = unlimited)")
+    parser.add_argument('--retries', type=int, default=4)
+    parser.add_argument('--timeout', type=float, default=30.0)
+    parser.add_argument('--parse-workers', type=int, default=os.cpu_count(), help="0 parses in the event loop")
+    parser.add_argument('--shard-rows', type=int, default=500)
+    parser.add_argument('--max-pages', type=int, help="stop after fetching this many pages")
+    parser.add_argument('--max-attempts', type=int, default=3, help="runs a failing URL is retried in")
+    parser.add_argument('--merge-only', action='store_true', help="skip crawling, just merge the shards")
+    parser.add_argument('--out', help="merged Parquet file (default <root>/<city>/flats.parquet)")
+    parser.add_argument('--csv', help="also write the merged rows as CSV")
+    args = parser.parse_args()
+
+    state_dir = os.path.join(args.root, args.city)
+    os.makedirs(state_dir, exist_ok=True)
+    frontier = Frontier(os.path.join(state_dir, 'frontier.sqlite'), args.max_attempts)
+    shards = ShardWriter(os.path.join(state_dir, 'shards'), frontier, args.shard_rows)
+    try:
+        if not args.merge_only:
+            if args.pages:
+                frontier.add(search_urls(args.base_url, args.city, args.pages, args.search_path), SEARCH)
+            fetcher_options = dict(per_host=args.per_host, rate=args.rate, retries=args.retries,
+                                   timeout=args.timeout)
+            pool = ProcessPoolExecutor(args.parse_workers) if args.parse_workers else None
+            try:
+                stats = asyncio.run(crawl(frontier, shards, fetcher_options, pool, args.concurrency,
+                                          args.max_pages))
+            finally:
+                if pool:
+                    pool.shutdown()
+            print(stats.summary())
+        out = args.out or os.path.join(state_dir, 'flats.parquet')
+        rows = merge_shards(shards.paths(), out, args.csv)
+        left = {key: n for key, n in frontier.counts().items() if key[1] != 'done'}
+        print(f"merged {rows} rows into {out}" + (f"; remaining {left}" if left else ""))
+    finally:
+        frontier.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""Connection-pooled async HTTP client with per-host politeness.
+
+One ``aiohttp`` session is shared by the whole crawl.  Politeness is per
+host: at most ``per_host`` connections are open to it and requests start no
+faster than ``rate`` per second (the notebook slept 10 s every 4 requests
+instead).  Timeouts, connection errors, 429 and 5xx responses are retried
+with exponential backoff and jitter, honouring ``Retry-After``.
+"""
+import asyncio
+import random
+from urllib.parse import urlsplit
+
+from real_estate.geocode import RETRY_STATUS, HostRateLimiter, RetryableError
+
+HEADERS = {
+    'accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    'accept-language': 'en-US,en;q=0.9',
+    'cache-control': 'no-cache',
+    'user-agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 '
+                  '(KHTML, like Gecko) Chrome/107.0.0.0 Safari/537.36',
+}
+
+
+class Fetcher:
+    """``async with Fetcher(...) as fetcher: html = await fetcher.get(url)``."""
+
+    def __init__(self, concurrency=8, per_host=4, rate=0.5, retries=4, backoff=1.0, timeout=30.0,
+                 headers=HEADERS):
+        self.concurrency = concurrency
+        self.per_host = per_host
+        self.rate = rate
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.headers = headers
+        self.requests = 0
+        self.retried = 0
+        self._session = None
+        self._limiter = None
+
+    async def __aenter__(self):
+        import aiohttp
+
+        connector = aiohttp.TCPConnector(limit=self.concurrency, limit_per_host=self.per_host)
+        self._session = aiohttp.ClientSession(connector=connector, headers=self.headers,
+                                              timeout=aiohttp.ClientTimeout(total=self.timeout))
+        self._limiter = HostRateLimiter(self.rate)
+        return self
+
+    async def __aexit__(self, *exc):
+        await self._session.close()
+
+    async def get(self, url):
+        import aiohttp
+
+        host = urlsplit(url).netloc
+        for attempt in range(self.retries + 1):
+            await self._limiter.wait(host)
+            self.requests += 1
+            try:
+                async with self._session.get(url) as response:
+                    if response.status in RETRY_STATUS:
+                        retry_after = response.headers.get('Retry-After')
+                        raise RetryableError(f"HTTP {response.status}",
+                                             float(retry_after) if retry_after and retry_after.isdigit() else None)
+                    response.raise_for_status()
+                    return await response.text()
+            except (RetryableError, aiohttp.ClientConnectionError, aiohttp.ServerTimeoutError,
+                    asyncio.TimeoutError) as e:
+                if attempt == self.retries:
+                    raise
+                self.retried += 1
+                delay = getattr(e, 'retry_after', None) or self.backoff * 2 ** attempt
+                await asyncio.sleep(delay * random.uniform(1.0, 1.5))
@@ -0,0 +1,94 @@
+"""Persistent crawl frontier and shard checkpoint (one SQLite file).
+
+Every URL is stored once with its kind (``search`` or ``detail``), state and
+the fields the search page already gave us.  States move
+``pending -> claimed -> done`` (or ``failed``); ``claimed`` rows left behind
+by a crashed run go back to ``pending`` when the frontier is reopened, and
+failed rows are retried by the next run until ``max_attempts``.
+
+Detail URLs only become ``done`` in the same transaction that records the
+shard holding their rows, so a row is never lost or written twice.
+"""
+import json
+import sqlite3
+import time
+
+SEARCH = 'search'
+DETAIL = 'detail'
+
+
+class Frontier:
+    def __init__(self, path, max_attempts=3):
+        self.path = path
+        self.max_attempts = max_attempts
+        self._db = sqlite3.connect(path)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS frontier ("
+                         "url TEXT PRIMARY KEY, kind TEXT, state TEXT, attempts INTEGER DEFAULT 0, "
+                         "meta TEXT, error TEXT, updated REAL)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS frontier_state ON frontier (state, kind)")
+        self._db.execute("CREATE TABLE IF NOT EXISTS shards ("
+                         "seq INTEGER PRIMARY KEY, file TEXT, rows INTEGER, written REAL)")
+        with self._db:
+            self._db.execute("UPDATE frontier SET state = 'pending' WHERE state = 'claimed'")
+            self._db.execute("UPDATE frontier SET state = 'pending' WHERE state = 'failed' AND attempts < ?",
+                             (max_attempts,))
+
+    def add(self, entries, kind):
+        """Queue ``(url, meta)`` pairs; URLs already known are ignored.  Returns the number added."""
+        now = time.time()
+        with self._db:
+            before = self._db.total_changes
+            self._db.executemany("INSERT OR IGNORE INTO frontier (url, kind, state, meta, updated) "
+                                 "VALUES (?, ?, 'pending', ?, ?)",
+                                 [(url, kind, json.dumps(meta or {}), now) for url, meta in entries])
+            return self._db.total_changes - before
+
+    def claim(self, n):
+        """Up to ``n`` pending ``(url, kind, meta)``, detail pages first."""
+        rows = self._db.execute("SELECT url, kind, meta FROM frontier WHERE state = 'pending' "
+                                "ORDER BY kind = 'search', rowid LIMIT ?", (n,)).fetchall()
+        with self._db:
+            self._db.executemany("UPDATE frontier SET state = 'claimed' WHERE url = ?", [(r[0],) for r in rows])
+        return [(url, kind, json.loads(meta)) for url, kind, meta in rows]
+
+    def complete(self, urls):
+        with self._db:
+            self._db.executemany("UPDATE frontier SET state = 'done', error = NULL, updated = ? WHERE url = ?",
+                                 [(time.time(), url) for url in urls])
+
+    def fail(self, url, error):
+        with self._db:
+            self._db.execute("UPDATE frontier SET state = 'failed', attempts = attempts + 1, error = ?, "
+                             "updated = ? WHERE url = ?", (error, time.time(), url))
+
+    def release(self, urls):
+        """Put claimed URLs back to ``pending`` (e.g. when a run stops early)."""
+        with self._db:
+            self._db.executemany("UPDATE frontier SET state = 'pending' WHERE url = ? AND state = 'claimed'",
+                                 [(url,) for url in urls])
+
+    # Checkpoint
+
+    def next_shard(self):
+        (seq,) = self._db.execute("SELECT COALESCE(MAX(seq) + 1, 0) FROM shards").fetchone()
+        return seq
+
+    def commit_shard(self, seq, file, urls):
+        """Record a written shard and mark the detail URLs it holds as done, atomically."""
+        now = time.time()
+        with self._db:
+            self._db.execute("INSERT INTO shards VALUES (?, ?, ?, ?)", (seq, file, len(urls), now))
+            self._db.executemany("UPDATE frontier SET state = 'done', error = NULL, updated = ? WHERE url = ?",
+                                 [(now, url) for url in urls])
+
+    def shards(self):
+        return [file for (file,) in self._db.execute("SELECT file FROM shards ORDER BY seq")]
+
+    def counts(self):
+        """``{(kind, state): n}``."""
+        return {(kind, state): n for kind, state, n in
+                self._db.execute("SELECT kind, state, COUNT(*) FROM frontier GROUP BY kind, state")}
+
+    def close(self):
+        self._db.close()
@@ -0,0 +1,91 @@
+"""Search and detail page extraction with the notebook's selectors.
+
+``parse_page`` is the entry point run in the worker pool; it only takes and
+returns plain Python values so it pickles cheaply.  A page that lacks the
+markup every real page has (the search results container, or all of the
+detail fields) is reported as ``None``: that is what 99acres serves to a
+blocked IP, and the crawler retries it later instead of storing blanks.
+"""
+from urllib.parse import urljoin
+
+from real_estate.crawler.frontier import SEARCH
+
+# Output columns, in the order of the notebook's ``property_data``
+COLUMNS = ['property_name', 'link', 'society', 'price', 'area', 'areaWithType', 'bedRoom', 'bathroom',
+           'balcony', 'additionalRoom', 'address', 'floorNum', 'facing', 'agePossession', 'nearbyLocations',
+           'description', 'furnishDetails', 'features', 'rating', 'property_id']
+LIST_COLUMNS = ['nearbyLocations', 'furnishDetails', 'features', 'rating']
+
+DETAIL_TEXT = {
+    'price': '#pdPrice2',
+    'areaWithType': '#factArea',
+    'bedRoom': '#bedRoomNum',
+    'bathroom': '#bathroomNum',
+    'balcony': '#balconyNum',
+    'additionalRoom': '#additionalRooms',
+    'address': '#address',
+    'floorNum': '#floorNumLabel',
+    'facing': '#facingLabel',
+    'agePossession': '#agePossessionLbl',
+    'description': '#description',
+    'property_id': '#Prop_Id',
+}
+
+
+def _soup(html):
+    from bs4 import BeautifulSoup
+
+    return BeautifulSoup(html, 'html.parser')
+
+
+def _text(node, selector):
+    found = node.select_one(selector)
+    return found.text.strip() if found else ''
+
+
+def _items(container, selector):
+    return [item.text.strip() for item in container.select(selector)] if container else None
+
+
+def parse_search_page(html, url):
+    """``[(detail_url, {'property_name', 'society', 'area'})]``, or None if blocked."""
+    results = _soup(html).select_one('div[data-label="SEARCH"]')
+    if results is None:
+        return None
+    listings = []
+    for tuple_ in results.select('section[data-hydration-on-demand="true"]'):
+        name = tuple_.select_one('a.srpTuple__propertyName')
+        society = tuple_.select_one('#srp_tuple_society_heading')
+        if name is None or society is None or not name.get('href'):
+            continue
+        listings.append((urljoin(url, name['href']), {
+            'property_name': name.text.strip(),
+            'society': society.text.strip(),
+            'area': _text(tuple_, '#srp_tuple_price_per_unit_area'),
+        }))
+    return listings
+
+
+def parse_detail_page(html, url, meta):
+    """One listing row (``COLUMNS``), or None if blocked."""
+    soup = _soup(html)
+    row = {column: _text(soup, selector) for column, selector in DETAIL_TEXT.items()}
+    if not any(row.values()):
+        return None
+    row['nearbyLocations'] = _items(soup.select_one('div.NearByLocation__tagWrap'), 'span.NearByLocation__infoText')
+    row['furnishDetails'] = _items(soup.select_one('#FurnishDetails'), 'li')
+    # With furnishing details present the amenities are the second #features block.
+    features = soup.select('#features')
+    index = 1 if row['furnishDetails'] else 0
+    row['features'] = _items(features[index], 'li') if len(features) > index else None
+    rating = soup.select_one('div.review__rightSide>div>ul>li>div')
+    row['rating'] = [item.text for item in rating.select('div.ratingByFeature__circleWrap')] if rating else None
+    row.update(link=url, property_name=meta.get('property_name', ''), society=meta.get('society', ''),
+               area=meta.get('area', ''))
+    return {column: row[column] for column in COLUMNS}
+
+
+def parse_page(kind, html, url, meta):
+    if kind == SEARCH:
+        return parse_search_page(html, url)
+    return parse_detail_page(html, url, meta)
@@ -0,0 +1,94 @@
+"""Append-only Parquet shards and their streaming merge.
+
+Rows are buffered and written ``rows_per_shard`` at a time as
+``part-000000.parquet``, ``part-000001.parquet``, ...  A shard file is
+written under a temporary name, renamed into place and only then committed
+to the frontier; files the frontier does not know about (a crash between
+the rename and the commit) are deleted on startup and their URLs, still
+``claimed``, are crawled again.
+
+``merge_shards`` replaces ``combine_csv_files``: it streams every shard's
+record batches into one ``ParquetWriter`` (and optionally a CSV), so memory
+stays at one batch however large the crawl gets.
+"""
+import glob
+import os
+
+from real_estate.crawler.parse import COLUMNS, LIST_COLUMNS
+
+
+def schema():
+    import pyarrow as pa
+
+    return pa.schema([(column, pa.list_(pa.string()) if column in LIST_COLUMNS else pa.string())
+                      for column in COLUMNS])
+
+
+class ShardWriter:
+    def __init__(self, directory, frontier, rows_per_shard=500):
+        self.directory = directory
+        self.frontier = frontier
+        self.rows_per_shard = rows_per_shard
+        self._urls, self._rows = [], []
+        os.makedirs(directory, exist_ok=True)
+        committed = set(frontier.shards())
+        for path in glob.glob(os.path.join(directory, 'part-*')):
+            if os.path.basename(path) not in committed:
+                os.remove(path)
+
+    @property
+    def buffered(self):
+        return len(self._rows)
+
+    def add(self, url, row):
+        self._urls.append(url)
+        self._rows.append(row)
+        if len(self._rows) >= self.rows_per_shard:
+            self.flush()
+
+    def flush(self):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        if not self._rows:
+            return None
+        seq = self.frontier.next_shard()
+        file = f'part-{seq:06d}.parquet'
+        path = os.path.join(self.directory, file)
+        pq.write_table(pa.Table.from_pylist(self._rows, schema=schema()), path + '.tmp')
+        os.replace(path + '.tmp', path)
+        self.frontier.commit_shard(seq, file, self._urls)
+        self._urls, self._rows = [], []
+        return path
+
+    def paths(self):
+        return [os.path.join(self.directory, file) for file in self.frontier.shards()]
+
+
+def _csv_frame(batch):
+    frame = batch.to_pandas()
+    for column in LIST_COLUMNS:
+        # The notebook's CSVs hold the Python repr of each list.
+        frame[column] = [str(list(v)) if v is not None else None for v in frame[column]]
+    return frame
+
+
+def merge_shards(paths, out, csv=None):
+    """Concatenate shard files into ``out`` (and ``csv``) in one streaming pass.  Returns the row count."""
+    import pyarrow.parquet as pq
+
+    rows = 0
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with pq.ParquetWriter(out + '.tmp', schema()) as writer:
+        for path in paths:
+            for batch in pq.ParquetFile(path).iter_batches():
+                writer.write_batch(batch)
+                if csv:
+                    _csv_frame(batch).to_csv(csv + '.tmp', mode='a' if rows else 'w', header=not rows, index=False)
+                rows += batch.num_rows
+    os.replace(out + '.tmp', out)
+    if csv:
+        if not rows:
+            _csv_frame(schema().empty_table()).to_csv(csv + '.tmp', index=False)
+        os.replace(csv + '.tmp', csv)
+    return rows
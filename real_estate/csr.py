@@ -0,0 +1,82 @@
+"""Compressed sparse rows in plain numpy.
+
+Serving the sparse TF-IDF needs only row selection and sparse x dense
+products, and ``scipy.sparse`` takes longer to import than the rest of the
+Recommender page's cold start.  ``CSRRows`` holds the usual
+``data``/``indices``/``indptr`` arrays (memory-mapped from the artifact
+store) and does those products with ``np.add.reduceat``; scipy is imported
+only to convert from or to its matrices.
+"""
+import numpy as np
+
+
+class CSRRows:
+    """Read-only CSR matrix with sorted, duplicate-free column indices."""
+
+    def __init__(self, data, indices, indptr, n_cols):
+        self.data = data
+        self.indices = indices
+        self.indptr = indptr
+        self.shape = (len(indptr) - 1, int(n_cols))
+
+    @classmethod
+    def from_matrix(cls, matrix, dtype=np.float32):
+        """From a scipy sparse matrix (canonicalised) or another ``CSRRows``."""
+        if isinstance(matrix, cls):
+            return cls(matrix.data.astype(dtype, copy=False), matrix.indices, matrix.indptr, matrix.shape[1])
+        matrix = matrix.tocsr(copy=True).astype(dtype)
+        matrix.sum_duplicates()
+        return cls(matrix.data, matrix.indices.astype(np.int32), matrix.indptr.astype(np.int64), matrix.shape[1])
+
+    @classmethod
+    def vstack(cls, blocks):
+        offsets = np.cumsum([0] + [block.indptr[-1] for block in blocks[:-1]])
+        indptr = [blocks[0].indptr[:1]] + [block.indptr[1:] + offset for block, offset in zip(blocks, offsets)]
+        return cls(np.concatenate([block.data for block in blocks]),
+                   np.concatenate([block.indices for block in blocks]),
+                   np.concatenate(indptr), blocks[0].shape[1])
+
+    @property
+    def nbytes(self):
+        return self.data.nbytes + self.indices.nbytes + self.indptr.nbytes
+
+    def tocsr(self):
+        from scipy import sparse
+
+        return sparse.csr_matrix((self.data, self.indices, self.indptr), shape=self.shape)
+
+    def __getitem__(self, rows):
+        """Rows by slice, index array or single index, as another ``CSRRows``."""
+        if isinstance(rows, slice):
+            start, stop, step = rows.indices(self.shape[0])
+            if step == 1:
+                a, b = self.indptr[start], self.indptr[max(start, stop)]
+                return CSRRows(self.data[a:b], self.indices[a:b], self.indptr[start:max(start, stop) + 1] - a,
+                               self.shape[1])
+            rows = np.arange(start, stop, step)
+        rows = np.atleast_1d(np.asarray(rows))
+        starts, counts = self.indptr[rows], self.indptr[rows + 1] - self.indptr[rows]
+        indptr = np.concatenate([[0], np.cumsum(counts)])
+        # Position of every stored value of the selected rows, row after row.
+        take = np.repeat(starts - indptr[:-1], counts) + np.arange(indptr[-1])
+        return CSRRows(self.data[take], self.indices[take], indptr, self.shape[1])
+
+    def toarray(self):
+        out = np.zeros(self.shape, dtype=self.data.dtype)
+        rows = np.repeat(np.arange(self.shape[0]), np.diff(self.indptr))
+        out[rows, self.indices] = self.data
+        return out
+
+    def dot(self, dense):
+        """``self @ dense`` for a dense vector or ``(n_cols, k)`` matrix."""
+        dense = np.asarray(dense)
+        products = self.data.reshape(-1, *[1] * (dense.ndim - 1)) * dense[self.indices]
+        out = np.zeros((self.shape[0],) + dense.shape[1:], dtype=products.dtype)
+        starts = self.indptr[:-1]
+        filled = starts < self.indptr[1:]
+        if filled.any():
+            # Empty rows are skipped, so each segment runs to the next filled row.
+            out[filled] = np.add.reduceat(products, starts[filled], axis=0)
+        return out
+
+    __matmul__ = dot
@@ -0,0 +1,113 @@
+"""Pre-aggregated sector cube behind the Analysis_App dashboard.
+
+Every widget change on the dashboard used to filter the full listing table
+with ``between``/``isin`` and then ``groupby('sector')`` the survivors.  The
+cube aggregates the listings once by
+
+    sector x property_type x bedRoom x price bucket
+
+and stores ``count`` plus ``sum``/``count``/``min``/``max`` of the measures
+the page shows.  Means divide by the measure's own non-NaN count, so they
+skip missing values as ``groupby().mean()`` does.  A dashboard interaction filters and folds these cells, whose number
+is bounded by the dimensions' cardinalities rather than by the number of
+listings.
+
+Price buckets are ``PRICE_STEP`` Cr wide and split so that the slider's
+inclusive integer bounds select whole buckets: code ``2k`` holds prices
+equal to ``k * PRICE_STEP`` and ``2k + 1`` those strictly between
+``k * PRICE_STEP`` and ``(k + 1) * PRICE_STEP``.
+"""
+import numpy as np
+import pandas as pd
+
+DIMENSIONS = ['sector', 'property_type', 'bedRoom', 'price_code']
+MEASURES = ['price', 'price_per_sqft', 'built_up_area', 'latitude', 'longitude']
+PRICE_STEP = 0.25
+
+
+def price_codes(price, step=PRICE_STEP):
+    scaled = np.asarray(price, dtype=float) / step
+    lower = np.floor(scaled)
+    return (2 * lower + (scaled > lower)).astype(np.int64)
+
+
+def build_cube(df, step=PRICE_STEP):
+    """Long table with one row per non-empty cell of the cube."""
+    keyed = df[DIMENSIONS[:-1] + MEASURES].assign(price_code=price_codes(df['price'], step))
+    grouped = keyed.groupby(DIMENSIONS, sort=True, observed=True)[MEASURES]
+    cube = grouped.agg(['sum', 'count', 'min', 'max'])
+    cube.columns = [f'{measure}_{stat}' for measure, stat in cube.columns]
+    cube.insert(0, 'count', grouped.size())
+    return cube.reset_index()
+
+
+class SectorCube:
+    """Slices and roll-ups of a cube table built by ``build_cube``."""
+
+    def __init__(self, cube, step=PRICE_STEP):
+        self.cube = cube
+        self.step = step
+        self.sectors = list(pd.unique(cube['sector']))
+
+    @classmethod
+    def from_listings(cls, df, step=PRICE_STEP):
+        return cls(build_cube(df, step), step)
+
+    def price_bounds(self):
+        return float(self.cube['price_min'].min()), float(self.cube['price_max'].max())
+
+    def select(self, price_range=None, sectors=None, property_type=None):
+        """Cube cells matching an inclusive price range and sector list."""
+        mask = np.ones(len(self.cube), dtype=bool)
+        if price_range is not None:
+            lo, hi = price_range
+            lo_code = 2 * int(np.ceil(lo / self.step - 1e-9)) - 1
+            hi_code = 2 * int(np.floor(hi / self.step + 1e-9))
+            codes = self.cube['price_code'].to_numpy()
+            # Bounds are rounded inward to bucket edges; the slider's integer
+            # values are always aligned, so its filter is exact.
+            mask &= (codes > lo_code) & (codes <= hi_code)
+        if sectors:
+            mask &= self.cube['sector'].isin(sectors).to_numpy()
+        if property_type is not None:
+            mask &= (self.cube['property_type'] == property_type).to_numpy()
+        return self.cube[mask]
+
+    @staticmethod
+    def sector_means(cells):
+        """Per-sector means of the measures (the map's ``groupby().mean()``)."""
+        columns = ['count'] + [f'{m}_{stat}' for m in MEASURES for stat in ('sum', 'count')]
+        sums = cells.groupby('sector', sort=True)[columns].sum()
+        means = pd.DataFrame({m: sums[f'{m}_sum'] / sums[f'{m}_count'] for m in MEASURES}, index=sums.index)
+        means['count'] = sums['count']
+        return means
+
+    @staticmethod
+    def key_stats(cells):
+        """Count, mean price, mean price/sqft and most common BHK."""
+        count = int(cells['count'].sum())
+        if count == 0:
+            return {'count': 0, 'mean_price': np.nan, 'mean_price_per_sqft': np.nan, 'mode_bedroom': None}
+        bedrooms = SectorCube.bedroom_counts(cells)
+        return {
+            'count': count,
+            'mean_price': cells['price_sum'].sum() / cells['price_count'].sum(),
+            'mean_price_per_sqft': cells['price_per_sqft_sum'].sum() / cells['price_per_sqft_count'].sum(),
+            # Ties resolve to the smallest value, as ``Series.mode()[0]`` does.
+            'mode_bedroom': bedrooms.index[np.argmax(bedrooms.to_numpy())],
+        }
+
+    @staticmethod
+    def bedroom_counts(cells):
+        return cells.groupby('bedRoom', sort=True)['count'].sum()
+
+    def price_histogram(self, cells, by='property_type'):
+        """Listing counts per price bucket, one column per ``by`` value.
+
+        The index is the left edge of each ``step``-wide bucket (Cr).
+        """
+        bucket = cells['price_code'] // 2
+        counts = cells.groupby([bucket, by])['count'].sum().unstack(by, fill_value=0)
+        counts.index = counts.index * self.step
+        counts.index.name = 'price'
+        return counts
@@ -0,0 +1,265 @@
+"""Incremental build of the training tables from scraped listings.
+
+The notebooks each rewrote a full CSV, so a few hundred new listings meant
+rerunning every one of them.  Here the steps in ``real_estate.preprocessing``
+are stages with explicit inputs, cached like a small build system::
+
+    python -m real_estate.data_pipeline                      # flats_cleaned2.csv -> df.pkl
+    python -m real_estate.data_pipeline --start clean --source "Data Collection/crawl/gurgaon/flats.parquet"
+    python -m real_estate.data_pipeline --target selection --refit
+
+For every stage the cache keeps the output of each input row under the
+row's fingerprint (a 64-bit hash of its values), the fitted statistics and
+the hashes of its input and code:
+
+- input, code and dependency files unchanged: the stage is skipped
+- statistics unchanged: only rows with new fingerprints are transformed,
+  the rest are reused; listings that disappeared are dropped from the cache
+- statistics changed (e.g. the price-per-sqft quartiles moved): every row
+  is transformed again, which is cheap because the fit already read them all
+- stage code (the ``preprocessing`` and ``features`` modules) or a
+  dependency file changed: the stage is rebuilt from scratch
+
+Stages marked ``frozen`` (the furnishing clusters) keep their fitted state
+across runs until ``--refit``, so labels stay stable as listings arrive.
+Each stage's status, row counts and timing are printed and appended to
+``<cache>/runs.jsonl``.
+"""
+import argparse
+import hashlib
+import inspect
+import json
+import os
+import pickle
+import time
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+from real_estate import features, preprocessing
+from real_estate.artifacts import REPO_DIR, _atomic_write, _sha256
+
+DEFAULT_DIR = os.environ.get('REAL_ESTATE_PIPELINE_DIR', os.path.join(REPO_DIR, '.pipeline'))
+DEFAULT_SOURCE = os.path.join(REPO_DIR, 'Data Preprocessing', 'flats_cleaned2.csv')
+
+
+@dataclass
+class Stage:
+    name: str
+    apply: object
+    input: str = None
+    output: str = None
+    fit: object = None
+    files: list = field(default_factory=list)
+    dedupe: bool = False
+    frozen: bool = False
+
+    def code_key(self):
+        """Changes whenever the transform modules or a dependency file does."""
+        digest = hashlib.sha256(inspect.getsource(inspect.getmodule(self.apply)).encode())
+        digest.update(inspect.getsource(features).encode())
+        for path in self.files:
+            digest.update(_sha256(path).encode())
+        return digest.hexdigest()
+
+
+STAGES = [
+    Stage('clean', preprocessing.clean, output='flats_cleaned2.csv'),
+    Stage('features', preprocessing.engineer_features, input='clean', output='flats_cleaned3.csv',
+          fit=preprocessing.fit_features, files=[preprocessing.APARTMENTS_CSV], frozen=True),
+    Stage('outliers', preprocessing.treat_outliers, input='features', output='flats_outlier_cleaned.csv',
+          fit=preprocessing.fit_outliers, dedupe=True),
+    Stage('missing', preprocessing.impute_missing, input='outliers',
+          output='flats_cleaned_missing_value_treatment.csv', fit=preprocessing.fit_missing),
+    Stage('selection', preprocessing.select_features, input='missing', output='flats_post_selection2.csv'),
+    Stage('predictor_inputs', preprocessing.predictor_inputs, input='selection', output='df.pkl'),
+]
+STAGE_NAMES = [stage.name for stage in STAGES]
+
+
+def chain(start, target, stages=STAGES):
+    """Stages from ``start`` to ``target``, following the ``input`` links."""
+    by_name = {stage.name: stage for stage in stages}
+    path = [by_name[target]]
+    while path[-1].name != start:
+        if path[-1].input is None:
+            raise ValueError(f"{target!r} does not depend on {start!r}")
+        path.append(by_name[path[-1].input])
+    return path[::-1]
+
+
+def fingerprints(df):
+    """One 64-bit hash of the values of each row."""
+    return pd.util.hash_pandas_object(df, index=False).to_numpy()
+
+
+def table_hash(df, fps):
+    digest = hashlib.sha256(json.dumps([str(c) for c in df.columns]).encode())
+    digest.update(np.ascontiguousarray(fps).tobytes())
+    return digest.hexdigest()
+
+
+def _state_hash(state):
+    return hashlib.sha256(json.dumps(state, sort_keys=True).encode()).hexdigest()
+
+
+def _concat(old, new):
+    """Row union that keeps a column's dtype when one side is entirely missing."""
+    if old is None or old.empty:
+        return new
+    if new.empty:
+        return old
+    for column in new.columns:
+        if new[column].isna().all() and old[column].dtype != new[column].dtype:
+            new[column] = new[column].astype(old[column].dtype)
+        elif old[column].isna().all() and old[column].dtype != new[column].dtype:
+            old[column] = old[column].astype(new[column].dtype)
+    return pd.concat([old, new])
+
+
+class StageCache:
+    """``<root>/<stage>.json`` (hashes, state) and ``<root>/<stage>.pkl`` (rows by fingerprint)."""
+
+    def __init__(self, root):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def meta(self, name):
+        path = os.path.join(self.root, f'{name}.json')
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            return json.load(f)
+
+    def rows(self, name):
+        """``(rows indexed by input fingerprint, fingerprints seen)``."""
+        with open(os.path.join(self.root, f'{name}.pkl'), 'rb') as f:
+            return pickle.load(f)
+
+    def save(self, name, meta, rows, seen):
+        _atomic_write(os.path.join(self.root, f'{name}.pkl'),
+                      lambda f: pickle.dump((rows, seen), f, protocol=pickle.HIGHEST_PROTOCOL))
+        _atomic_write(os.path.join(self.root, f'{name}.json'), lambda f: f.write(json.dumps(meta).encode()))
+
+    def log(self, record):
+        with open(os.path.join(self.root, 'runs.jsonl'), 'a') as f:
+            f.write(json.dumps(record) + '\n')
+
+
+def run_stage(stage, df, cache, refit=False):
+    """``(output frame, log record)`` for ``stage`` over ``df``."""
+    start = time.perf_counter()
+    fps = fingerprints(df)
+    if stage.dedupe:
+        _, first = np.unique(fps, return_index=True)
+        keep = np.sort(first)
+        df, fps = df.iloc[keep], fps[keep]
+    input_hash = table_hash(df, fps)
+    code = stage.code_key()
+    meta = cache.meta(stage.name)
+    same_code = meta is not None and meta['code'] == code and not refit
+
+    if same_code and meta['input_hash'] == input_hash:
+        rows, _ = cache.rows(stage.name)
+        status, state, processed, reused = 'cached', meta['state'], 0, len(df)
+    else:
+        if stage.frozen and same_code:
+            state = meta['state']
+        else:
+            state = stage.fit(df) if stage.fit else {}
+        state_hash = _state_hash(state)
+        if same_code and meta['state_hash'] == state_hash:
+            rows, seen = cache.rows(stage.name)
+            status = 'incremental'
+        else:
+            rows, seen = None, np.empty(0, dtype=np.uint64)
+            status = 'full'
+        # Forget listings that are no longer in the input.
+        seen = seen[np.isin(seen, fps)]
+        if rows is not None:
+            rows = rows[rows.index.isin(fps)]
+        new = ~np.isin(fps, seen)
+        _, first = np.unique(fps[new], return_index=True)
+        batch_fps = fps[new][np.sort(first)]
+        batch = df[new].iloc[np.sort(first)].reset_index(drop=True)
+        out = stage.apply(batch, state)
+        out.index = pd.Index(batch_fps[out.index.to_numpy()], dtype=np.uint64)
+        rows = _concat(rows, out)
+        seen = np.concatenate([seen, batch_fps])
+        processed, reused = len(batch), int((~new).sum())
+        cache.save(stage.name, {'code': code, 'input_hash': input_hash, 'state': state,
+                                'state_hash': state_hash}, rows, seen)
+
+    output = rows.loc[fps[np.isin(fps, rows.index)]].reset_index(drop=True)
+    record = {'stage': stage.name, 'status': status, 'rows_in': len(df), 'processed': processed,
+              'reused': reused, 'rows_out': len(output),
+              'seconds': round(time.perf_counter() - start, 4)}
+    return output, record
+
+
+def load_source(paths):
+    """Concatenated CSV / Parquet inputs; crawler lists become their CSV repr."""
+    frames = []
+    for path in paths:
+        if path.endswith('.parquet'):
+            frame = pd.read_parquet(path)
+            for column in frame.columns:
+                if frame[column].map(lambda v: isinstance(v, np.ndarray)).any():
+                    frame[column] = [str(list(v)) if v is not None else None for v in frame[column]]
+            frame = frame.replace('', np.nan)
+        else:
+            frame = pd.read_csv(path)
+        frames.append(frame)
+    return pd.concat(frames, ignore_index=True)
+
+
+def _write(df, path):
+    if path.endswith('.pkl'):
+        _atomic_write(path, lambda f: df.to_pickle(f))
+    else:
+        _atomic_write(path, lambda f: f.write(df.to_csv(index=False).encode()))
+
+
+def run(sources, start='features', target='predictor_inputs', root=DEFAULT_DIR, out_dir=None, refit=False,
+        verbose=True):
+    """Run the stages from ``start`` to ``target``; returns ``(target output, log records)``."""
+    cache = StageCache(os.path.join(root, 'cache'))
+    out_dir = out_dir or os.path.join(root, 'out')
+    os.makedirs(out_dir, exist_ok=True)
+    run_id = time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
+    df = load_source(sources)
+    records = []
+    for stage in chain(start, target):
+        df, record = run_stage(stage, df, cache, refit)
+        path = os.path.join(out_dir, stage.output)
+        if record['status'] != 'cached' or not os.path.exists(path):
+            _write(df, path)
+        record['run'] = run_id
+        cache.log(record)
+        records.append(record)
+        if verbose:
+            print(f"{record['stage']:<17} {record['status']:<12} in {record['rows_in']:>7,}  "
+                  f"processed {record['processed']:>7,}  reused {record['reused']:>7,}  "
+                  f"out {record['rows_out']:>7,}  {record['seconds']:7.3f}s")
+    return df, records
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Incrementally rebuild the cleaned listing tables")
+    parser.add_argument('--source', action='append', help="input CSV/Parquet for the start stage "
+                                                          "(repeatable; default flats_cleaned2.csv)")
+    parser.add_argument('--start', choices=STAGE_NAMES, default='features')
+    parser.add_argument('--target', choices=STAGE_NAMES, default='predictor_inputs')
+    parser.add_argument('--root', default=DEFAULT_DIR, help="cache and default output directory")
+    parser.add_argument('--out-dir', help="where stage outputs are written (default <root>/out)")
+    parser.add_argument('--refit', action='store_true', help="refit every stage, frozen ones included")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    run(args.source or [DEFAULT_SOURCE], args.start, args.target, args.root, args.out_dir, args.refit)
+    print(f"done in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
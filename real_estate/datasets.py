@@ -0,0 +1,67 @@
+"""Shared, dtype-optimised loading of the page tables and widget options.
+
+``data_viz1.csv`` and ``df.pkl`` come out of pandas with every label as an
+object/string column and every number as float64, and the pages rebuilt
+their selectbox options with ``sorted(df[col].unique())`` on every rerun.
+At artifact build time ``optimize_dtypes`` turns repetitive label columns
+into categoricals (stored as Arrow dictionaries, i.e. Feather v2) and
+downcasts numbers whenever the values survive the round trip unchanged,
+and ``widget_options`` stores the sorted distinct values of the widget
+columns as JSON.  Pages read both through their city's ``City`` in
+``real_estate.cities`` (``store.table`` and ``options``), which is cached
+for the life of the process.
+"""
+import numpy as np
+import pandas as pd
+
+# Columns whose distinct values populate widgets, per artifact table
+WIDGET_COLUMNS = {
+    'predictor_inputs': ['property_type', 'sector', 'bedRoom', 'bathroom', 'balcony', 'agePossession',
+                         'furnishing_type', 'luxury_category', 'floor_category'],
+    'dashboard': ['sector', 'property_type', 'bedRoom'],
+}
+OPTIONS_ARTIFACT = 'widget_options'
+
+
+def _downcast(series):
+    values = series.to_numpy()
+    if np.isnan(values).any():
+        candidates = [np.float32]
+    elif np.array_equal(values, np.round(values)):
+        candidates = [np.int8, np.int16, np.int32, np.float32]
+    else:
+        candidates = [np.float32]
+    for dtype in candidates:
+        converted = values.astype(dtype)
+        if np.array_equal(converted.astype(values.dtype), values):
+            return pd.Series(converted, index=series.index, name=series.name)
+    return series
+
+
+def optimize_dtypes(df, max_category_ratio=0.5):
+    """Copy of ``df`` with categorical labels and lossless numeric downcasts."""
+    out = {}
+    for column in df.columns:
+        series = df[column]
+        if pd.api.types.is_float_dtype(series) or pd.api.types.is_integer_dtype(series):
+            out[column] = _downcast(series.astype(np.float64) if series.dtype.kind == 'i' else series)
+        elif series.nunique(dropna=True) <= max_category_ratio * len(series):
+            out[column] = series.astype('category')
+        else:
+            out[column] = series
+    return pd.DataFrame(out, index=df.index)
+
+
+def _python(value):
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def distinct_values(df, columns):
+    """Sorted distinct non-null values per column, as plain Python lists."""
+    return {column: sorted(_python(v) for v in pd.unique(df[column].dropna())) for column in columns}
+
+
+def widget_options(tables):
+    """Options for every table in ``WIDGET_COLUMNS`` from ``{name: frame}``."""
+    return {name: distinct_values(tables[name], columns) for name, columns in WIDGET_COLUMNS.items()}
+
@@ -0,0 +1,95 @@
+"""Facilities similarity served from the sparse TF-IDF matrix.
+
+``recommender-system.ipynb`` pickled ``cosine_sim1``, the dense N x N cosine
+matrix of the ``TopFacilities`` TF-IDF (words and bigrams), although each
+property mentions only a handful of the terms.  ``FacilitySimilarity`` keeps
+the L2-normalised TF-IDF as CSR (``CSRRows``) instead: a property's
+similarity row is one sparse mat-vec, computed on demand.
+
+The page serves the facilities block from the same matrix through
+``FeatureIndex``; this class builds it (``recommender_build``) and keeps the
+vocabulary and idf weights, so unseen facility strings can be scored with
+``similarity`` without refitting.
+"""
+import json
+
+import numpy as np
+
+from real_estate.csr import CSRRows
+from real_estate.recommender_index import _top_k_rows, normalize_rows
+
+TFIDF_PARAMS = {'stop_words': 'english', 'ngram_range': (1, 2)}
+
+
+class FacilitySimilarity:
+    """Cosine similarity of facility TF-IDF rows, one sparse mat-vec per query."""
+
+    def __init__(self, matrix, names, vocabulary, idf):
+        self.matrix = CSRRows.from_matrix(matrix)
+        self.names = list(names)
+        if self.matrix.shape[0] != len(self.names):
+            raise ValueError("The TF-IDF matrix needs one row per property")
+        self.vocabulary = dict(vocabulary)
+        self.idf = np.asarray(idf)
+        self._vectorizer = None
+
+    @classmethod
+    def fit(cls, texts, names):
+        """Fit the notebook's ``TfidfVectorizer`` on the facility strings."""
+        from sklearn.feature_extraction.text import TfidfVectorizer
+
+        vectorizer = TfidfVectorizer(**TFIDF_PARAMS)
+        matrix = vectorizer.fit_transform(texts)
+        vocabulary = {term: int(column) for term, column in vectorizer.vocabulary_.items()}
+        return cls(normalize_rows(matrix), names, vocabulary, vectorizer.idf_)
+
+    @property
+    def size(self):
+        return self.matrix.shape[0]
+
+    @property
+    def nbytes(self):
+        return self.matrix.nbytes
+
+    def transform(self, texts):
+        """Normalised TF-IDF rows for ``texts`` with the stored vocabulary and idf."""
+        if self._vectorizer is None:
+            from sklearn.feature_extraction.text import TfidfVectorizer
+
+            vectorizer = TfidfVectorizer(vocabulary=self.vocabulary, **TFIDF_PARAMS)
+            vectorizer.idf_ = self.idf
+            self._vectorizer = vectorizer
+        return normalize_rows(self._vectorizer.transform(texts))
+
+    def row(self, index):
+        """Similarities of property ``index`` to every property."""
+        return self.matrix.dot(self.matrix[index].toarray()[0])
+
+    def similarity(self, texts):
+        """Similarities of unseen facility strings to every property, ``(len(texts), N)``."""
+        return self.matrix.dot(self.transform(texts).toarray().T).T
+
+    def top_k(self, index, k=5):
+        """``(indices, scores)`` of the ``k`` most similar properties, excluding ``index``."""
+        scores = self.row(index)
+        scores[index] = -np.inf
+        top, _ = _top_k_rows(scores[None], min(k, self.size - 1))
+        return top[0], scores[top[0]]
+
+    def save(self, store, prefix='recommender'):
+        """Write the matrix, names and vectorizer state into an ``ArtifactStore``."""
+        store.put_sparse(f'{prefix}/facilities', self.matrix)
+        store.put_text(f'{prefix}/names', json.dumps(self.names))
+        self.save_vectorizer(store, prefix)
+
+    def save_vectorizer(self, store, prefix='recommender'):
+        """Only the vocabulary and idf, next to a ``FeatureIndex`` that holds the matrix."""
+        store.put_text(f'{prefix}/facilities_vocabulary', json.dumps(self.vocabulary))
+        store.put_array(f'{prefix}/facilities_idf', self.idf)
+
+    @classmethod
+    def load(cls, store, prefix='recommender'):
+        """Load from an ``ArtifactStore``; the CSR arrays are memory-mapped."""
+        return cls(store.sparse(f'{prefix}/facilities'), json.loads(store.text(f'{prefix}/names')),
+                   json.loads(store.text(f'{prefix}/facilities_vocabulary')),
+                   store.array(f'{prefix}/facilities_idf'))
@@ -0,0 +1,412 @@
+"""Compile the fitted price pipeline into a pure-numpy predictor.
+
+For single rows ``pipeline.predict`` spends most of its time in sklearn
+overhead: input validation, DataFrame column lookups and encoders scanning
+their categories.  ``compile_pipeline`` lowers the fitted
+``ColumnTransformer`` + regressor into lookup tables and dense arrays:
+
+- ``StandardScaler``: mean/scale vectors
+- ``OrdinalEncoder``/``OneHotEncoder``: category -> code/column maps
+- linear models: coefficient vector and intercept
+- tree ensembles (decision tree, random forest, extra trees, gradient
+  boosting): every tree flattened into shared feature/threshold/child/value
+  arrays, traversed for all rows and trees at once
+
+``FastPredictor.predict`` returns the same values as ``pipeline.predict``
+(``log1p`` prices) up to floating point rounding, missing values included:
+trees send NaN where sklearn does, and regressors sklearn refuses NaN for
+raise ``ValueError``.
+
+``load_compiled`` keeps the compiled arrays beside the model blob, keyed by
+its sha256 and ``COMPILED_FORMAT``, so a cold start with a cached model neither unpickles the
+pipeline nor imports sklearn.
+
+    python -m real_estate.fastpath --check "Model Selection/flats_post_selection2.csv"
+"""
+import argparse
+import json
+import math
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+_UNKNOWN = -1
+# Bumped whenever the saved arrays change, so older compiled files are not reused.
+COMPILED_FORMAT = 3
+
+
+def _category_table(categories):
+    """Category -> position, with NaN looked up separately (NaN != NaN)."""
+    table, nan_code = {}, None
+    for code, category in enumerate(categories):
+        if isinstance(category, float) and math.isnan(category):
+            nan_code = code
+        else:
+            table[category.item() if hasattr(category, 'item') else category] = code
+    return table, nan_code
+
+
+def _lookup(table, nan_code, values):
+    codes = np.empty(len(values), dtype=np.int64)
+    for i, value in enumerate(values):
+        if isinstance(value, float) and value != value:
+            code = nan_code
+        else:
+            code = table.get(value.item() if hasattr(value, 'item') else value)
+        codes[i] = _UNKNOWN if code is None else code
+    return codes
+
+
+class _Step:
+    """One lowered ColumnTransformer branch writing ``width`` output columns."""
+
+    def __init__(self, kind, columns, width, **params):
+        self.kind = kind
+        self.columns = list(columns)
+        self.width = width
+        self.params = params
+
+
+def _lower_transformer(name, transformer, columns):
+    from sklearn.preprocessing import OneHotEncoder, OrdinalEncoder, StandardScaler
+
+    columns = list(columns)
+    if transformer == 'passthrough':
+        return _Step('passthrough', columns, len(columns))
+    if isinstance(transformer, StandardScaler):
+        mean = transformer.mean_ if transformer.with_mean else np.zeros(len(columns))
+        scale = transformer.scale_ if transformer.with_std else np.ones(len(columns))
+        return _Step('scale', columns, len(columns), mean=np.asarray(mean, float), scale=np.asarray(scale, float))
+    if isinstance(transformer, OrdinalEncoder):
+        unknown = None
+        if transformer.handle_unknown == 'use_encoded_value':
+            unknown = float(transformer.unknown_value)
+        tables = [_category_table(c) for c in transformer.categories_]
+        return _Step('ordinal', columns, len(columns), tables=tables, unknown=unknown)
+    if isinstance(transformer, OneHotEncoder):
+        if getattr(transformer, '_infrequent_enabled', False):
+            raise NotImplementedError(f"{name}: infrequent categories are not supported")
+        drop_idx = transformer.drop_idx_
+        tables, offsets, width = [], [], 0
+        for i, categories in enumerate(transformer.categories_):
+            dropped = None if drop_idx is None or drop_idx[i] is None else int(drop_idx[i])
+            # Output column of each category, -1 for the dropped one.
+            positions = np.full(len(categories), -1, dtype=np.int64)
+            kept = [j for j in range(len(categories)) if j != dropped]
+            positions[kept] = np.arange(width, width + len(kept))
+            tables.append(_category_table(categories))
+            offsets.append(positions)
+            width += len(kept)
+        return _Step('onehot', columns, width, tables=tables, positions=offsets,
+                     ignore_unknown=transformer.handle_unknown != 'error')
+    raise NotImplementedError(f"{name}: {type(transformer).__name__} cannot be compiled")
+
+
+def _flatten_trees(trees):
+    """Concatenate sklearn ``tree_`` objects into one set of node arrays."""
+    features, thresholds, lefts, rights, missing_left, values, roots = [], [], [], [], [], [], []
+    offset, depth = 0, 0
+    for tree in trees:
+        n = tree.node_count
+        left = tree.children_left.astype(np.int64)
+        right = tree.children_right.astype(np.int64)
+        leaf = left == -1
+        own = np.arange(n)
+        # Leaves point at themselves so extra traversal steps are no-ops.
+        lefts.append(np.where(leaf, own, left) + offset)
+        rights.append(np.where(leaf, own, right) + offset)
+        features.append(np.where(leaf, 0, tree.feature).astype(np.int64))
+        thresholds.append(np.where(leaf, np.inf, tree.threshold))
+        # Where sklearn sends NaN at each split (a learned side since 1.3, else right).
+        missing = getattr(tree, 'missing_go_to_left', None)
+        missing_left.append(np.zeros(n, dtype=bool) if missing is None else np.asarray(missing, dtype=bool))
+        values.append(tree.value[:, 0, 0].astype(np.float64))
+        roots.append(offset)
+        offset += n
+        depth = max(depth, tree.max_depth)
+    return {
+        'feature': np.concatenate(features),
+        'threshold': np.concatenate(thresholds),
+        'children': np.stack([np.concatenate(lefts), np.concatenate(rights)], axis=1),
+        'missing_left': np.concatenate(missing_left),
+        'value': np.concatenate(values),
+        'roots': np.asarray(roots, dtype=np.int64),
+        'depth': depth,
+    }
+
+
+def _lower_regressor(regressor):
+    from sklearn.dummy import DummyRegressor
+    from sklearn.ensemble import ExtraTreesRegressor, GradientBoostingRegressor, RandomForestRegressor
+    from sklearn.tree import DecisionTreeRegressor
+
+    if isinstance(regressor, DecisionTreeRegressor):
+        return {'kind': 'trees', 'scale': 1.0, 'bias': 0.0, **_flatten_trees([regressor.tree_])}
+    if isinstance(regressor, (RandomForestRegressor, ExtraTreesRegressor)):
+        trees = [est.tree_ for est in regressor.estimators_]
+        return {'kind': 'trees', 'scale': 1.0 / len(trees), 'bias': 0.0, **_flatten_trees(trees)}
+    if isinstance(regressor, GradientBoostingRegressor):
+        init = regressor.init_
+        if init == 'zero':
+            bias = 0.0
+        elif isinstance(init, DummyRegressor):
+            bias = float(np.ravel(init.constant_)[0])
+        else:
+            raise NotImplementedError(f"GradientBoosting init {type(init).__name__} cannot be compiled")
+        trees = [est.tree_ for est in regressor.estimators_[:, 0]]
+        return {'kind': 'trees', 'scale': regressor.learning_rate, 'bias': bias, **_flatten_trees(trees)}
+    if hasattr(regressor, 'coef_') and hasattr(regressor, 'intercept_'):
+        return {'kind': 'linear', 'coef': np.ravel(regressor.coef_).astype(float),
+                'intercept': float(np.ravel(regressor.intercept_)[0])}
+    raise NotImplementedError(f"{type(regressor).__name__} cannot be compiled")
+
+
+def _allows_nan(regressor):
+    """Whether sklearn lets the regressor predict on NaN inputs (else it raises)."""
+    try:
+        return bool(regressor.__sklearn_tags__().input_tags.allow_nan)
+    except AttributeError:
+        return bool(regressor._get_tags().get('allow_nan', False))
+
+
+class FastPredictor:
+    """Numpy-only stand-in for the fitted pipeline's ``predict``."""
+
+    def __init__(self, input_columns, steps, model, chunk_rows=1024, fallback=None, fallback_rows=128):
+        self.input_columns = list(input_columns)
+        self.steps = steps
+        self.model = model
+        self.width = sum(step.width for step in steps)
+        self.chunk_rows = chunk_rows
+        # Past ~100 rows sklearn's compiled tree code wins over numpy gathers.
+        self.fallback = fallback
+        self.fallback_rows = fallback_rows
+        self._positions = {c: i for i, c in enumerate(self.input_columns)}
+
+    def transform(self, X):
+        """Dense design matrix, equal to the ColumnTransformer output.
+
+        ``X`` is a DataFrame or a sequence of rows ordered like ``input_columns``.
+        """
+        if isinstance(X, pd.DataFrame):
+            column = lambda c: X[c].to_numpy()
+            n = len(X)
+        else:
+            X = list(X)
+            column = lambda c: [row[self._positions[c]] for row in X]
+            n = len(X)
+
+        out = np.empty((n, self.width), dtype=np.float64)
+        start = 0
+        for step in self.steps:
+            block = out[:, start:start + step.width]
+            if step.kind == 'passthrough':
+                for j, c in enumerate(step.columns):
+                    block[:, j] = np.asarray(column(c), dtype=float)
+            elif step.kind == 'scale':
+                for j, c in enumerate(step.columns):
+                    block[:, j] = np.asarray(column(c), dtype=float)
+                block -= step.params['mean']
+                block /= step.params['scale']
+            elif step.kind == 'ordinal':
+                for j, (c, (table, nan_code)) in enumerate(zip(step.columns, step.params['tables'])):
+                    codes = _lookup(table, nan_code, column(c))
+                    unknown = codes == _UNKNOWN
+                    if unknown.any():
+                        if step.params['unknown'] is None:
+                            raise ValueError(f"Found unknown categories in column {c!r}")
+                        block[:, j] = np.where(unknown, step.params['unknown'], codes)
+                    else:
+                        block[:, j] = codes
+            elif step.kind == 'onehot':
+                block[:] = 0.0
+                rows = np.arange(n)
+                for c, (table, nan_code), positions in zip(step.columns, step.params['tables'],
+                                                         step.params['positions']):
+                    codes = _lookup(table, nan_code, column(c))
+                    unknown = codes == _UNKNOWN
+                    if unknown.any() and not step.params['ignore_unknown']:
+                        raise ValueError(f"Found unknown categories in column {c!r}")
+                    target = np.where(unknown, -1, positions[np.where(unknown, 0, codes)])
+                    hit = target >= 0
+                    block[rows[hit], target[hit]] = 1.0
+            start += step.width
+        return out
+
+    def predict(self, X):
+        if self.fallback is not None and len(X) > self.fallback_rows and isinstance(X, pd.DataFrame):
+            return self.fallback.predict(X)
+        features = self.transform(X)
+        model = self.model
+        if not model['allow_nan'] and np.isnan(features).any():
+            raise ValueError("Input X contains NaN; the compiled regressor does not accept missing values")
+        if model['kind'] == 'linear':
+            return features @ model['coef'] + model['intercept']
+
+        # sklearn trees compare float32 inputs against float64 thresholds.
+        features = features.astype(np.float32).astype(np.float64)
+        feature, threshold, children = model['feature'], model['threshold'], model['children']
+        missing_left = model['missing_left']
+        out = np.empty(len(features))
+        for start in range(0, len(features), self.chunk_rows):
+            chunk = features[start:start + self.chunk_rows]
+            rows = np.arange(len(chunk))[:, None]
+            node = np.broadcast_to(model['roots'], (len(chunk), len(model['roots'])))
+            for step in range(model['depth']):
+                x = chunk[rows, feature[node]]
+                go_right = np.where(np.isnan(x), ~missing_left[node], x > threshold[node])
+                node = children[node, go_right.view(np.int8)]
+                # Most paths end well before the deepest leaf of the forest.
+                if step % 4 == 3 and (children[node, 0] == node).all():
+                    break
+            out[start:start + len(chunk)] = model['value'][node].sum(axis=1)
+        return model['bias'] + model['scale'] * out
+
+    def save(self, path):
+        """Write arrays and lookup tables to one ``.npz`` file."""
+        arrays = {f'model_{k}': np.asarray(v) for k, v in self.model.items() if k != 'kind'}
+        steps = []
+        for i, step in enumerate(self.steps):
+            meta = {'kind': step.kind, 'columns': step.columns, 'width': step.width}
+            for key, value in step.params.items():
+                if key == 'tables':
+                    meta['categories'] = [
+                        sorted(table, key=table.get) + ([None] if nan_code is not None else [])
+                        for table, nan_code in value
+                    ]
+                    meta['nan_codes'] = [nan_code for _, nan_code in value]
+                elif key == 'positions':
+                    for j, positions in enumerate(value):
+                        arrays[f'step{i}_positions{j}'] = positions
+                elif isinstance(value, np.ndarray):
+                    arrays[f'step{i}_{key}'] = value
+                else:
+                    meta[key] = value
+            steps.append(meta)
+        meta = {'input_columns': self.input_columns, 'steps': steps, 'model_kind': self.model['kind']}
+        np.savez(path, meta=np.frombuffer(json.dumps(meta).encode(), dtype=np.uint8), **arrays)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            meta = json.loads(data['meta'].tobytes())
+            model = {'kind': meta['model_kind']}
+            for key in data.files:
+                if key.startswith('model_'):
+                    value = data[key]
+                    model[key[len('model_'):]] = value.item() if value.ndim == 0 else value
+            steps = []
+            for i, step in enumerate(meta['steps']):
+                params = {}
+                if 'categories' in step:
+                    tables = []
+                    for categories, nan_code in zip(step['categories'], step['nan_codes']):
+                        known = categories[:-1] if nan_code is not None else categories
+                        table = {c: j for j, c in enumerate(known)}
+                        tables.append((table, nan_code))
+                    params['tables'] = tables
+                if step['kind'] == 'onehot':
+                    params['positions'] = [data[f'step{i}_positions{j}'] for j in range(len(step['columns']))]
+                    params['ignore_unknown'] = step['ignore_unknown']
+                for key in ('mean', 'scale'):
+                    if f'step{i}_{key}' in data.files:
+                        params[key] = data[f'step{i}_{key}']
+                if step['kind'] == 'ordinal':
+                    params['unknown'] = step['unknown']
+                steps.append(_Step(step['kind'], step['columns'], step['width'], **params))
+        return cls(meta['input_columns'], steps, model)
+
+
+def compile_pipeline(pipeline):
+    """Lower a fitted ``Pipeline([('preprocessor', ColumnTransformer), ('regressor', ...)])``."""
+    preprocessor, regressor = pipeline.steps[0][1], pipeline.steps[-1][1]
+    if len(pipeline.steps) != 2:
+        raise NotImplementedError("Only preprocessor + regressor pipelines can be compiled")
+    steps = []
+    for name, transformer, columns in preprocessor.transformers_:
+        if transformer == 'drop' or len(columns) == 0:
+            continue
+        if isinstance(columns[0], (int, np.integer)):
+            columns = [preprocessor.feature_names_in_[c] for c in columns]
+        steps.append(_lower_transformer(name, transformer, columns))
+    model = {**_lower_regressor(regressor), 'allow_nan': _allows_nan(regressor)}
+    return FastPredictor(preprocessor.feature_names_in_, steps, model)
+
+
+def compile_or_fallback(pipeline):
+    """The compiled predictor (handing large batches back to ``pipeline``), or
+    the pipeline itself when it cannot be lowered."""
+    try:
+        fast = compile_pipeline(pipeline)
+    except NotImplementedError:
+        return pipeline
+    fast.fallback = pipeline
+    return fast
+
+
+class RegistryModel:
+    """A registry model unpickled on its first ``predict``, as a lazy fallback."""
+
+    def __init__(self, name, registry):
+        self.name = name
+        self.registry = registry
+
+    def predict(self, X):
+        return self.registry.load(self.name).predict(X)
+
+
+def load_compiled(name, registry):
+    """Compiled predictor of the registry model ``name``, cached as ``compiled/<sha256>.v<format>.npz``.
+
+    The pipeline is unpickled only to compile a new model, and afterwards when
+    a large batch falls back to it.  Models that cannot be compiled are
+    returned as loaded.
+    """
+    sha = registry.resolve(name)[1]
+    path = os.path.join(registry.cache_dir, 'compiled', f'{sha}.v{COMPILED_FORMAT}.npz')
+    if os.path.exists(path):
+        fast = FastPredictor.load(path)
+        fast.fallback = RegistryModel(name, registry)
+        return fast
+    fast = compile_or_fallback(registry.load(name))
+    if isinstance(fast, FastPredictor):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f'{path[:-len(".npz")]}.{os.getpid()}.tmp.npz'
+        fast.save(tmp)
+        os.replace(tmp, path)
+    return fast
+
+
+def check_parity(pipeline, fast, X, atol=1e-9):
+    """Max absolute difference between both predictors on ``X``."""
+    expected = pipeline.predict(X)
+    actual = fast.predict(X)
+    diff = float(np.max(np.abs(expected - actual))) if len(X) else 0.0
+    return diff, diff <= atol
+
+
+def main():
+    from real_estate.model_registry import load_model
+    from real_estate.price_model import load_training_data
+
+    parser = argparse.ArgumentParser(description="Compile the price pipeline and check parity")
+    parser.add_argument('--check', metavar='CSV', help="training CSV to compare predictions on")
+    parser.add_argument('--out', help="write the compiled predictor to this .npz")
+    args = parser.parse_args()
+
+    pipeline = load_model()
+    start = time.perf_counter()
+    fast = compile_pipeline(pipeline)
+    print(f"compiled in {time.perf_counter() - start:.2f}s ({fast.width} features, {fast.model['kind']})")
+    if args.out:
+        fast.save(args.out)
+    if args.check:
+        diff, ok = check_parity(pipeline, fast, load_training_data(args.check)[0])
+        print(f"max |pipeline - fast| = {diff:.3g} ({'ok' if ok else 'MISMATCH'})")
+        raise SystemExit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
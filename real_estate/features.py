@@ -0,0 +1,389 @@
+"""Vectorised feature transforms shared by training and serving.
+
+The notebooks parsed listings one row at a time with ``apply`` and Python
+``re``/``ast``; these take and return whole Series (pandas ``.str`` regexes
+and numpy) and are what ``real_estate.preprocessing``, the recommender
+build and the price predictors all call, so the feature logic lives in one
+place::
+
+    from real_estate import features
+    features.luxury_category(features.luxury_score(df['features']))
+
+The heavier parsers (areas, furnishings, amenities) work on the distinct
+values of a column and broadcast back, since scraped text repeats a lot
+(one society, one amenity list).  ``python -m benchmarks.bench_features``
+checks parity with the notebook outputs and times both versions.
+"""
+import functools
+import re
+
+import numpy as np
+import pandas as pd
+
+SQM_TO_SQFT = 10.7639
+ROOM_COLUMNS = ['study room', 'servant room', 'store room', 'pooja room', 'others']
+FURNISHING_LABELS = {0: 'unfurnished', 1: 'semifurnished', 2: 'furnished'}
+
+# Weights for each amenity, by perceived luxury contribution (feature-engineering.ipynb)
+LUXURY_WEIGHTS = {
+    '24/7 Power Backup': 8,
+    '24/7 Water Supply': 4,
+    '24x7 Security': 7,
+    'ATM': 4,
+    'Aerobics Centre': 6,
+    'Airy Rooms': 8,
+    'Amphitheatre': 7,
+    'Badminton Court': 7,
+    'Banquet Hall': 8,
+    'Bar/Chill-Out Lounge': 9,
+    'Barbecue': 7,
+    'Basketball Court': 7,
+    'Billiards': 7,
+    'Bowling Alley': 8,
+    'Business Lounge': 9,
+    'CCTV Camera Security': 8,
+    'Cafeteria': 6,
+    'Car Parking': 6,
+    'Card Room': 6,
+    'Centrally Air Conditioned': 9,
+    'Changing Area': 6,
+    "Children's Play Area": 7,
+    'Cigar Lounge': 9,
+    'Clinic': 5,
+    'Club House': 9,
+    'Concierge Service': 9,
+    'Conference room': 8,
+    'Creche/Day care': 7,
+    'Cricket Pitch': 7,
+    'Doctor on Call': 6,
+    'Earthquake Resistant': 5,
+    'Entrance Lobby': 7,
+    'False Ceiling Lighting': 6,
+    'Feng Shui / Vaastu Compliant': 5,
+    'Fire Fighting Systems': 8,
+    'Fitness Centre / GYM': 8,
+    'Flower Garden': 7,
+    'Food Court': 6,
+    'Foosball': 5,
+    'Football': 7,
+    'Fountain': 7,
+    'Gated Community': 7,
+    'Golf Course': 10,
+    'Grocery Shop': 6,
+    'Gymnasium': 8,
+    'High Ceiling Height': 8,
+    'High Speed Elevators': 8,
+    'Infinity Pool': 9,
+    'Intercom Facility': 7,
+    'Internal Street Lights': 6,
+    'Internet/wi-fi connectivity': 7,
+    'Jacuzzi': 9,
+    'Jogging Track': 7,
+    'Landscape Garden': 8,
+    'Laundry': 6,
+    'Lawn Tennis Court': 8,
+    'Library': 8,
+    'Lounge': 8,
+    'Low Density Society': 7,
+    'Maintenance Staff': 6,
+    'Manicured Garden': 7,
+    'Medical Centre': 5,
+    'Milk Booth': 4,
+    'Mini Theatre': 9,
+    'Multipurpose Court': 7,
+    'Multipurpose Hall': 7,
+    'Natural Light': 8,
+    'Natural Pond': 7,
+    'Park': 8,
+    'Party Lawn': 8,
+    'Piped Gas': 7,
+    'Pool Table': 7,
+    'Power Back up Lift': 8,
+    'Private Garden / Terrace': 9,
+    'Property Staff': 7,
+    'RO System': 7,
+    'Rain Water Harvesting': 7,
+    'Reading Lounge': 8,
+    'Restaurant': 8,
+    'Salon': 8,
+    'Sauna': 9,
+    'Security / Fire Alarm': 9,
+    'Security Personnel': 9,
+    'Separate entry for servant room': 8,
+    'Sewage Treatment Plant': 6,
+    'Shopping Centre': 7,
+    'Skating Rink': 7,
+    'Solar Lighting': 6,
+    'Solar Water Heating': 7,
+    'Spa': 9,
+    'Spacious Interiors': 9,
+    'Squash Court': 8,
+    'Steam Room': 9,
+    'Sun Deck': 8,
+    'Swimming Pool': 8,
+    'Temple': 5,
+    'Theatre': 9,
+    'Toddler Pool': 7,
+    'Valet Parking': 9,
+    'Video Door Security': 9,
+    'Visitor Parking': 7,
+    'Water Softener Plant': 7,
+    'Water Storage': 7,
+    'Water purifier': 7,
+    'Yoga/Meditation Area': 7
+}
+
+_QUOTED = r"""'[^']*'|"[^"]*\""""
+_NUMBER = r'(\d+\.?\d*)'
+
+
+def _series(values):
+    return values if isinstance(values, pd.Series) else pd.Series(values)
+
+
+def _text(values):
+    """``values`` as a ``str`` Series; non-strings become NaN."""
+    values = _series(values)
+    if values.dtype == object:
+        values = values.where(values.map(lambda v: isinstance(v, str)), np.nan)
+    elif values.dtype != 'str':
+        values = pd.Series(np.nan, index=values.index, name=values.name)
+    return values.astype('str')
+
+
+def _by_unique(values, fn):
+    """``fn`` applied to the distinct values of ``values`` and broadcast back."""
+    values = _series(values)
+    codes, uniques = pd.factorize(values, use_na_sentinel=False)
+    out = fn(pd.Series(uniques, dtype=object)).take(codes).set_axis(values.index)
+    if isinstance(out, pd.Series):
+        out.name = values.name
+    return out
+
+
+def _per_value(fn):
+    """Run ``fn(str Series, ...)`` once per distinct value of its first argument."""
+    @functools.wraps(fn)
+    def wrapper(values, *args, **kwargs):
+        return _by_unique(values, lambda unique: fn(_text(unique), *args, **kwargs))
+    return wrapper
+
+
+# cleaning.ipynb
+
+def society_name(names):
+    """'DLF The Crest4.5 ★' -> 'dlf the crest'."""
+    def strip(unique):
+        text = unique.map(str).astype('str')
+        return text.str.replace(r'\d+(\.\d+)?\s?★', '', regex=True).str.strip().str.lower()
+
+    return _by_unique(names, strip)
+
+
+@_per_value
+def price_crore(prices):
+    """'82 Lac' -> 0.82, '1.25 Cr' -> 1.25; 'Price on Request' and the like -> NaN."""
+    parts = prices.str.extract(r'^([^ ]*) ([^ ]*)')
+    value = pd.to_numeric(parts[0], errors='coerce').astype(float)
+    unit = parts[1]
+    price = value.where(unit != 'Lac', value / 100).where(unit.notna())
+    return price.round(2).astype(float)
+
+
+@_per_value
+def price_per_sqft(areas):
+    """'₹ 7,585/sq.ft.' -> 7585."""
+    number = areas.str.extract(r'^([^/]*)', expand=False).str.replace('₹', '', regex=False)
+    return pd.to_numeric(number.str.replace(',', '', regex=False).str.strip(), errors='coerce').astype(float)
+
+
+def _first_token(text, sep=None):
+    pattern = r'^\s*(\S+)' if sep is None else r'(?s)^(.*?)(?:' + re.escape(sep) + r'|\Z)'
+    token = text.str.extract(pattern, expand=False).str.strip()
+    return token.where(token != '').astype(object)
+
+
+first_token = _per_value(_first_token)
+first_token.__doc__ = """First word of each value ('3 Bedrooms' -> '3'), NaN for blanks."""
+
+
+@_per_value
+def room_count(values):
+    """Bedrooms/bathrooms as numbers: '3 Bathrooms' -> 3.0."""
+    return pd.to_numeric(_first_token(values), errors='coerce').astype(float)
+
+
+@_per_value
+def floor_number(values):
+    """'3 (Out of 14 Floors)' -> 3.0, 'Ground ...' -> 0.0.
+
+    As in the notebook the sign is lost, so basements count as floor 1.
+    """
+    token = _first_token(values, ' ').replace({'Ground': '0', 'Basement': '-1', 'Lower': '0'})
+    return pd.to_numeric(_text(token).str.extract(r'(\d+)', expand=False), errors='coerce').astype(float)
+
+
+@_per_value
+def sector(property_names):
+    """'3 BHK Flat in Sector 36 Gurgaon' -> 'sector 36'."""
+    place = property_names.str.extract(r'(?s)^.*? in (.*?)(?: in |\Z)', expand=False)
+    place = place.str.replace('gurgaon', '', case=False, regex=True).str.strip().str.lower()
+    return place.astype(object)
+
+
+# feature-engineering.ipynb
+
+@_per_value
+def _area_values(text):
+    text = text.fillna('')
+    numbers = {
+        'super_built_up_area': r'Super Built up area ' + _NUMBER,
+        'built_up_area': r'Built Up area\s*:\s*' + _NUMBER,
+        'carpet_area': r'Carpet area\s*:\s*' + _NUMBER,
+        'plot_area': r'Plot area ' + _NUMBER,
+    }
+    out = pd.DataFrame({column: pd.to_numeric(text.str.extract(pattern, expand=False), errors='coerce')
+                        for column, pattern in numbers.items()}, dtype=float)
+    # An area quoted in sq.m. reads '<value> (<sq.m.> sq.m.)' where the notebook
+    # formatted <value> as a float, so only tokens like '1081.0' convert.
+    quoted = text[text.str.contains(r'\d\.\d* \(\d+\.?\d* sq.m.\)')]
+    if len(quoted):
+        pairs = quoted.str.findall(_NUMBER + r' \(' + _NUMBER + r' sq.m.\)').explode().dropna()
+        pairs = pd.DataFrame(pairs.tolist(), index=pairs.index, columns=['token', 'sqm'])
+        for column in ['super_built_up_area', 'built_up_area', 'carpet_area']:
+            token = out[column].map(lambda v: repr(v) if v == v else None).reindex(pairs.index)
+            sqm = pairs.loc[pairs['token'] == token, 'sqm'].groupby(level=0).first().astype(float)
+            out.loc[sqm.index, column] = sqm * SQM_TO_SQFT
+    return out
+
+
+def area_columns(area_with_type, area=None):
+    """``super_built_up_area``, ``built_up_area`` and ``carpet_area`` in sqft.
+
+    Listings with none of the three usually quote a plot area, which becomes
+    the built-up area; given the total ``area``, plot areas quoted in sq.yard
+    or sq.m. are rescaled by their ratio to it.
+    """
+    values = _area_values(area_with_type)
+    plot = values.pop('plot_area')
+    none = values.isna().all(axis=1)
+    if area is not None:
+        ratio = np.round(np.asarray(area, dtype=float) / plot.to_numpy())
+        plot = plot * np.select([ratio == 9, ratio == 11], [9, 10.7], 1)
+    values['built_up_area'] = values['built_up_area'].where(~none, plot)
+    return values
+
+
+def built_up_area(area_with_type, area=None):
+    return area_columns(area_with_type, area)['built_up_area']
+
+
+@_per_value
+def room_flags(additional_rooms, rooms=ROOM_COLUMNS):
+    """0/1 columns for each additional room ('study room,servant room')."""
+    return pd.DataFrame({room: additional_rooms.str.contains(room).astype(int) for room in rooms})
+
+
+@_per_value
+def age_possession_category(values):
+    """'0 to 1 Year Old' -> 'New Property', 'Dec 2024' -> 'Under Construction', ..."""
+    def has(*parts):
+        return np.logical_or.reduce([values.str.contains(p, regex=False).to_numpy(bool) for p in parts])
+
+    # Entries like 'May 2024': the text after the last space is an integer.
+    dated = values.str.contains(r'(?:^| )[\t\n\r\f\v]*[+-]?\d+(?:_\d+)*[\t\n\r\f\v]*$').to_numpy(bool)
+    return pd.Series(np.select([values.isna().to_numpy(), has('0 to 1 Year Old', 'Within 6 months', 'Within 3 months'),
+                                has('1 to 5 Year Old'), has('5 to 10 Year Old'), has('10+ Year Old'),
+                                has('Under Construction', 'By') | dated],
+                               ['Undefined', 'New Property', 'Relatively New', 'Moderately Old', 'Old Property',
+                                'Under Construction'], 'Undefined'), dtype='str')
+
+
+def furnishing_vocabulary(details):
+    """Sorted furnishing names ('Fan', 'Light', ...) in ``furnishDetails``."""
+    items = _text(details).dropna().drop_duplicates().str.replace(r"[\[\]']", '', regex=True).str.split(', ').explode()
+    items = items.str.replace(r'No |\d+', '', regex=True).str.strip()
+    return sorted(set(items.dropna()) - {''})
+
+
+@_per_value
+def _furnishing_counts(text, vocabulary):
+    text = text.fillna('')
+    columns = []
+    for item in vocabulary:
+        count = text.str.contains(item, regex=False).astype(float)
+        numbered = text.str.contains(r'\d+ ' + re.escape(item))
+        if numbered.any():
+            number = text[numbered].str.extract(r'(\d+) ' + re.escape(item), expand=False)
+            count[numbered] = pd.to_numeric(number).astype(float)
+        count[text.str.contains('No ' + item, regex=False)] = 0.0
+        columns.append(count.to_numpy())
+    return pd.DataFrame(np.column_stack(columns) if columns else np.empty((len(text), 0)))
+
+
+def furnishing_counts(details, vocabulary):
+    """``(rows, len(vocabulary))`` float matrix of furnishing counts ('3 Fan' -> 3, 'No AC' -> 0)."""
+    return _furnishing_counts(details, vocabulary).to_numpy(dtype=float)
+
+
+def furnishing_labels(codes):
+    """0/1/2 cluster codes -> 'unfurnished'/'semifurnished'/'furnished'; labels pass through."""
+    return _series(codes).replace({float(k): v for k, v in FURNISHING_LABELS.items()})
+
+
+@_per_value
+def extract_list(values):
+    """The single-quoted items of each list string: "['Park', 'Lift(s)']" -> ['Park', 'Lift(s)']."""
+    return values.fillna('').str.findall(r"'(.*?)'").astype(object)
+
+
+def feature_items(values):
+    """The items of each list literal in ``values``, one per row, indexed by position.
+
+    Items may use either quote style, as ``repr`` of a Python list does;
+    values that are not list strings contribute nothing.
+    """
+    text = _text(values).reset_index(drop=True)
+    items = text[text.str.startswith('[').to_numpy(bool)].str.findall(_QUOTED).explode().dropna()
+    return items.str[1:-1]
+
+
+@_per_value
+def luxury_score(values, weights=LUXURY_WEIGHTS):
+    """Sum of the weights of the distinct amenities in each list string."""
+    items = feature_items(values).rename('item').reset_index().drop_duplicates()
+    points = items['item'].map(weights).fillna(0)
+    return points.groupby(items['index']).sum().reindex(range(len(values)), fill_value=0).astype(int)
+
+
+# feature-selection.ipynb
+
+def luxury_category(scores):
+    """Luxury score -> 'Low' (<50), 'Medium' (<150), 'High' (<=175), else missing."""
+    scores = _series(scores).astype(float)
+    return pd.Series(np.select([(scores >= 0) & (scores < 50), (scores >= 50) & (scores < 150),
+                                (scores >= 150) & (scores <= 175)],
+                               ['Low', 'Medium', 'High'], None), index=scores.index, dtype='str')
+
+
+def floor_category(floors):
+    """Floor number -> 'Low Floor' (0-2), 'Mid Floor' (3-10), 'High Floor' (11-51), else missing."""
+    floors = _series(floors).astype(float)
+    return pd.Series(np.select([(floors >= 0) & (floors <= 2), (floors >= 3) & (floors <= 10),
+                                (floors >= 11) & (floors <= 51)],
+                               ['Low Floor', 'Mid Floor', 'High Floor'], None), index=floors.index, dtype='str')
+
+
+# recommender-system.ipynb
+
+@_per_value
+def distance_to_meters(distances):
+    """Vectorised ``distance_to_meters`` from the notebook.
+
+    Only ``Km``/``KM`` and ``Meter``/``meter`` values whose first token is a
+    number are understood; everything else becomes NaN, as before.
+    """
+    value = pd.to_numeric(_first_token(distances), errors='coerce')
+    is_km = distances.str.contains('Km|KM', regex=True)
+    is_meter = distances.str.contains('Meter|meter', regex=True)
+    return pd.Series(np.where(is_km, value * 1000, np.where(is_meter, value, np.nan)), dtype='float64')
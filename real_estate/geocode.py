@@ -0,0 +1,290 @@
+"""Concurrent, rate-limited, cached geocoding of localities.
+
+Replaces the one-request-at-a-time loop in
+``pages/Analysis_datasets/latlong_scraper.py``::
+
+    python -m real_estate.geocode --city gurgaon --sectors 1-115 --out latlong.csv
+    python -m real_estate.geocode --input localities.txt --backend nominatim
+
+- at most ``--concurrency`` requests are in flight, and requests to one host
+  start no faster than ``--rate`` per second
+- timeouts, connection errors, 429 and 5xx responses are retried with
+  exponential backoff and jitter (``Retry-After`` is honoured)
+- every answer, including "not found", is stored in a SQLite cache, so a
+  locality is fetched once across runs; failures are not cached
+- backends only build the request and parse the response, so tests can
+  point ``NominatimBackend(base_url=...)`` at a local stub server
+
+A summary with throughput and cache hit rate is printed at the end.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import sqlite3
+import sys
+import time
+from dataclasses import dataclass
+from urllib.parse import urlsplit
+
+import pandas as pd
+
+from real_estate.artifacts import REPO_DIR
+
+DEFAULT_CACHE = os.environ.get('REAL_ESTATE_GEOCODE_CACHE', os.path.join(REPO_DIR, '.geocode_cache.sqlite'))
+USER_AGENT = "real-estate-ai-suite/1.0 (geocoder)"
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+class RetryableError(Exception):
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+# Backends: ``request(query) -> (url, params, headers)`` and
+# ``parse(text) -> (lat, lon) or None``.
+
+class NominatimBackend:
+    """OpenStreetMap Nominatim search API (or anything speaking its JSON)."""
+
+    def __init__(self, base_url='https://nominatim.openstreetmap.org'):
+        self.base_url = base_url.rstrip('/')
+
+    def request(self, query):
+        params = {'q': query, 'format': 'json', 'limit': '1'}
+        return f'{self.base_url}/search', params, {'User-Agent': USER_AGENT}
+
+    def parse(self, text):
+        results = json.loads(text)
+        if not results:
+            return None
+        return float(results[0]['lat']), float(results[0]['lon'])
+
+
+class GoogleSearchBackend:
+    """The answer box the original scraper read from a Google results page."""
+
+    _COORDINATES = re.compile(r'([\d.]+)°\s*([NS]),\s*([\d.]+)°\s*([EW])')
+
+    def __init__(self, base_url='https://www.google.com'):
+        self.base_url = base_url.rstrip('/')
+
+    def request(self, query):
+        headers = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+                                 "(KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"}
+        return f'{self.base_url}/search', {'q': f'{query} longitude & latitude'}, headers
+
+    def parse(self, text):
+        from bs4 import BeautifulSoup
+
+        box = BeautifulSoup(text, 'html.parser').find("div", class_="Z0LcW t2b5Cf")
+        return parse_coordinates(box.text) if box else None
+
+
+BACKENDS = {'nominatim': NominatimBackend, 'google': GoogleSearchBackend}
+
+
+def parse_coordinates(text):
+    """``'28.3663° N, 76.9456° E'`` -> ``(28.3663, 76.9456)``."""
+    match = GoogleSearchBackend._COORDINATES.search(text or '')
+    if not match:
+        return None
+    lat, ns, lon, ew = match.groups()
+    return float(lat) * (1 if ns == 'N' else -1), float(lon) * (1 if ew == 'E' else -1)
+
+
+def format_coordinates(lat, lon):
+    """Inverse of ``parse_coordinates``, the format of ``latlong.csv``."""
+    return f"{abs(lat):.4f}° {'N' if lat >= 0 else 'S'}, {abs(lon):.4f}° {'E' if lon >= 0 else 'W'}"
+
+
+class GeocodeCache:
+    """SQLite table ``query -> (lat, lon)``; NULL coordinates mean not found."""
+
+    def __init__(self, path=DEFAULT_CACHE):
+        self.path = path
+        self._db = sqlite3.connect(path)
+        self._db.execute("CREATE TABLE IF NOT EXISTS geocode ("
+                         "query TEXT PRIMARY KEY, lat REAL, lon REAL, backend TEXT, fetched REAL)")
+
+    def get_many(self, queries, chunk=500):
+        found = {}
+        queries = list(queries)
+        for start in range(0, len(queries), chunk):
+            part = queries[start:start + chunk]
+            rows = self._db.execute(f"SELECT query, lat, lon FROM geocode WHERE query IN "
+                                    f"({','.join('?' * len(part))})", part)
+            for query, lat, lon in rows:
+                found[query] = None if lat is None else (lat, lon)
+        return found
+
+    def put(self, query, coordinates, backend):
+        lat, lon = coordinates if coordinates else (None, None)
+        self._db.execute("INSERT OR REPLACE INTO geocode VALUES (?, ?, ?, ?, ?)",
+                         (query, lat, lon, backend, time.time()))
+        self._db.commit()
+
+    def close(self):
+        self._db.close()
+
+
+class HostRateLimiter:
+    """Spaces request starts to each host at least ``1 / rate`` seconds apart."""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate else 0.0
+        self._next = {}
+        self._lock = asyncio.Lock()
+
+    async def wait(self, host):
+        if not self.interval:
+            return
+        loop = asyncio.get_running_loop()
+        async with self._lock:
+            now = loop.time()
+            start = max(now, self._next.get(host, now))
+            self._next[host] = start + self.interval
+        if start > now:
+            await asyncio.sleep(start - now)
+
+
+@dataclass
+class GeocodeStats:
+    queries: int = 0
+    cache_hits: int = 0
+    fetched: int = 0
+    not_found: int = 0
+    failed: int = 0
+    requests: int = 0
+    retries: int = 0
+    seconds: float = 0.0
+
+    def summary(self):
+        hit_rate = self.cache_hits / self.queries if self.queries else 0.0
+        rate = self.fetched / self.seconds if self.seconds else 0.0
+        return (f"{self.queries} localities in {self.seconds:.1f}s: {self.cache_hits} cached "
+                f"({hit_rate:.0%} hit rate), {self.fetched} fetched ({rate:.1f}/s, {self.requests} requests, "
+                f"{self.retries} retries), {self.not_found} not found, {self.failed} failed")
+
+
+class Geocoder:
+    def __init__(self, backend, cache, concurrency=8, rate=1.0, retries=4, backoff=0.5, timeout=10.0):
+        self.backend = backend
+        self.cache = cache
+        self.concurrency = concurrency
+        self.rate = rate
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.stats = GeocodeStats()
+
+    async def _fetch(self, session, limiter, query):
+        import aiohttp
+
+        url, params, headers = self.backend.request(query)
+        host = urlsplit(url).netloc
+        for attempt in range(self.retries + 1):
+            await limiter.wait(host)
+            self.stats.requests += 1
+            try:
+                async with session.get(url, params=params, headers=headers) as response:
+                    if response.status in RETRY_STATUS:
+                        retry_after = response.headers.get('Retry-After')
+                        raise RetryableError(f"HTTP {response.status}",
+                                             float(retry_after) if retry_after and retry_after.isdigit() else None)
+                    response.raise_for_status()
+                    return self.backend.parse(await response.text())
+            except (RetryableError, aiohttp.ClientConnectionError, aiohttp.ServerTimeoutError,
+                    asyncio.TimeoutError) as e:
+                if attempt == self.retries:
+                    raise
+                self.stats.retries += 1
+                delay = getattr(e, 'retry_after', None) or self.backoff * 2 ** attempt
+                await asyncio.sleep(delay * random.uniform(1.0, 1.5))
+
+    async def geocode_many(self, queries):
+        """``{query: (lat, lon) or None}``; failures are left out."""
+        import aiohttp
+
+        start = time.perf_counter()
+        queries = list(dict.fromkeys(queries))
+        results = self.cache.get_many(queries)
+        self.stats.queries += len(queries)
+        self.stats.cache_hits += len(results)
+        pending = [q for q in queries if q not in results]
+
+        limiter = HostRateLimiter(self.rate)
+        semaphore = asyncio.Semaphore(self.concurrency)
+        backend_name = type(self.backend).__name__
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        connector = aiohttp.TCPConnector(limit=self.concurrency)
+
+        async with aiohttp.ClientSession(timeout=timeout, connector=connector) as session:
+            async def one(query):
+                async with semaphore:
+                    try:
+                        coordinates = await self._fetch(session, limiter, query)
+                    except Exception as e:
+                        self.stats.failed += 1
+                        print(f"failed {query!r}: {e}", file=sys.stderr)
+                        return
+                self.cache.put(query, coordinates, backend_name)
+                self.stats.fetched += 1
+                self.stats.not_found += coordinates is None
+                results[query] = coordinates
+
+            await asyncio.gather(*(one(q) for q in pending))
+        self.stats.seconds += time.perf_counter() - start
+        return results
+
+
+def _sector_range(text):
+    lo, _, hi = text.partition('-')
+    return range(int(lo), int(hi or lo) + 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Geocode localities concurrently with a persistent cache")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--sectors', type=_sector_range, help="sector numbers, e.g. 1-115")
+    source.add_argument('--input', help="text file with one locality per line")
+    parser.add_argument('--city', default='gurgaon', help="appended to every query")
+    parser.add_argument('--backend', choices=sorted(BACKENDS), default='nominatim')
+    parser.add_argument('--base-url', help="override the backend host, e.g. a local stub server")
+    parser.add_argument('--out', default='latlong.csv')
+    parser.add_argument('--cache', default=DEFAULT_CACHE)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--rate', type=float, default=1.0, help="requests per second per host (0 = unlimited)")
+    parser.add_argument('--retries', type=int, default=4)
+    parser.add_argument('--timeout', type=float, default=10.0)
+    args = parser.parse_args()
+
+    if args.sectors:
+        localities = [f'sector {n}' for n in args.sectors]
+    else:
+        with open(args.input) as f:
+            localities = [line.strip() for line in f if line.strip()]
+    queries = {locality: f'{locality} {args.city}'.strip() for locality in localities}
+
+    backend_cls = BACKENDS[args.backend]
+    backend = backend_cls(args.base_url) if args.base_url else backend_cls()
+    cache = GeocodeCache(args.cache)
+    geocoder = Geocoder(backend, cache, args.concurrency, args.rate, args.retries, timeout=args.timeout)
+    try:
+        results = asyncio.run(geocoder.geocode_many(queries.values()))
+    finally:
+        cache.close()
+
+    rows = []
+    for locality, query in queries.items():
+        coordinates = results.get(query)
+        rows.append({'sector': locality, 'coordinates': format_coordinates(*coordinates) if coordinates else None})
+    pd.DataFrame(rows).to_csv(args.out, index=False)
+    print(geocoder.stats.summary())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,210 @@
+"""Conformal prediction intervals for the price pipeline.
+
+The page used to show ``base_price +- 0.22`` Cr for every listing, which is
+far too wide for a 0.5 Cr flat and far too narrow for a 20 Cr house.  The
+model is trained on ``log1p(price)``, so errors are roughly multiplicative;
+``calibrate`` collects out-of-sample residuals in log space on
+``flats_post_selection2.csv`` and, for a handful of predicted-price bins
+(Mondrian conformal prediction), stores the lower/upper residual quantiles
+with the finite-sample correction.  At request time an interval is one
+``searchsorted`` and two additions, vectorised over any number of rows.
+
+Out-of-sample residuals come from the forest's out-of-bag predictions when
+the regressor is a bootstrapped forest and the caller asserts that the CSV
+holds its training rows in training order (seconds, no refit): by default
+only for the repository's pipeline on ``flats_post_selection2.csv``.  Any
+other model or data is refit in K folds.
+
+Calibrations are stored next to the model blob, keyed by its sha256::
+
+    python -m real_estate.intervals --alpha 0.1
+    python -m real_estate.intervals --city pune --training-csv data/pune/flats_post_selection2.csv --training-set
+"""
+import argparse
+import json
+import math
+import os
+import time
+
+import numpy as np
+
+from real_estate.model_registry import DEFAULT_CACHE_DIR, PRICE_PIPELINE, register_city, registry
+from real_estate.price_model import TRAINING_CSV, load_training_data
+
+DEFAULT_ALPHA = 0.1   # 90% intervals
+DEFAULT_BINS = 4
+
+
+class IntervalModel:
+    """Per-bin log-space residual quantiles around the point prediction."""
+
+    def __init__(self, edges, lower, upper, alpha, meta=None):
+        self.edges = np.asarray(edges, dtype=float)
+        self.lower = np.asarray(lower, dtype=float)
+        self.upper = np.asarray(upper, dtype=float)
+        self.alpha = alpha
+        self.meta = meta or {}
+
+    def log_bounds(self, log_pred):
+        log_pred = np.asarray(log_pred, dtype=float)
+        bins = np.searchsorted(self.edges, log_pred, side='right')
+        return log_pred + self.lower[bins], log_pred + self.upper[bins]
+
+    def bounds(self, price):
+        """``(low, high)`` in Cr around point predictions ``price`` (Cr)."""
+        low, high = self.log_bounds(np.log1p(price))
+        return np.maximum(np.expm1(low), 0.0), np.expm1(high)
+
+    def to_dict(self):
+        return {'edges': self.edges.tolist(), 'lower': self.lower.tolist(),
+                'upper': self.upper.tolist(), 'alpha': self.alpha, 'meta': self.meta}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['edges'], data['lower'], data['upper'], data['alpha'], data.get('meta'))
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f'{path}.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(self.to_dict(), f, indent=1)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
+
+
+def _oob_predictions(pipeline, X):
+    """Out-of-bag predictions of a bootstrapped forest, or None."""
+    forest = pipeline.steps[-1][1]
+    samples = getattr(forest, 'estimators_samples_', None) if getattr(forest, 'bootstrap', False) else None
+    if samples is None or len(X) != getattr(forest, '_n_samples', len(X)):
+        return None
+    Xt = pipeline[:-1].transform(X)
+    total = np.zeros(len(X))
+    count = np.zeros(len(X))
+    for tree, in_bag in zip(forest.estimators_, samples):
+        oob = np.ones(len(X), dtype=bool)
+        oob[in_bag] = False
+        total[oob] += tree.predict(Xt[oob])
+        count[oob] += 1
+    with np.errstate(invalid='ignore'):
+        return np.where(count > 0, total / count, np.nan)
+
+
+def _fixed_categories(pipeline):
+    """Unfitted clone whose encoders know every fitted category, so that a
+    sector seen only once cannot break a cross-validation fold."""
+    from sklearn.base import clone
+
+    model = clone(pipeline)
+    fitted = pipeline.steps[0][1]
+    for (name, transformer, _), (_, fresh, _) in zip(fitted.transformers_, model.steps[0][1].transformers):
+        if hasattr(transformer, 'categories_'):
+            fresh.set_params(categories=[list(c) for c in transformer.categories_])
+    return model
+
+
+def out_of_sample_predictions(pipeline, X, y, folds=5, random_state=0, training_set=False):
+    """Log-space predictions for rows of ``X`` made without seeing that row.
+
+    The forest's bootstrap indices say nothing about which rows they index,
+    so out-of-bag predictions are only used when ``training_set`` asserts
+    that ``X`` holds the pipeline's training rows in training order.
+    """
+    oob = _oob_predictions(pipeline, X) if training_set else None
+    if oob is not None and not np.isnan(oob).any():
+        return oob, 'oob'
+    from sklearn.model_selection import KFold, cross_val_predict
+
+    cv = KFold(folds, shuffle=True, random_state=random_state)
+    return cross_val_predict(_fixed_categories(pipeline), X, y, cv=cv), f'{folds}-fold'
+
+
+def _conformal_quantiles(residuals, alpha):
+    n = len(residuals)
+    hi = min(1.0, math.ceil((n + 1) * (1 - alpha / 2)) / n)
+    lo = max(0.0, math.floor((n + 1) * (alpha / 2)) / n)
+    return np.quantile(residuals, lo, method='lower'), np.quantile(residuals, hi, method='higher')
+
+
+def fit_intervals(predictions, y, alpha=DEFAULT_ALPHA, n_bins=DEFAULT_BINS):
+    """IntervalModel from log-space out-of-sample ``predictions`` and targets."""
+    residuals = np.asarray(y) - np.asarray(predictions)
+    edges = np.quantile(predictions, np.linspace(0, 1, n_bins + 1)[1:-1])
+    bins = np.searchsorted(edges, predictions, side='right')
+    lower, upper = [], []
+    for b in range(n_bins):
+        lo, hi = _conformal_quantiles(residuals[bins == b], alpha)
+        lower.append(lo)
+        upper.append(hi)
+    return IntervalModel(edges, lower, upper, alpha)
+
+
+def calibrate(pipeline, X=None, y=None, alpha=DEFAULT_ALPHA, n_bins=DEFAULT_BINS, training_set=False):
+    """Calibrate on the training CSV (or ``X``/``y`` in log space).
+
+    ``training_set`` as in ``out_of_sample_predictions``; the training CSV
+    counts as the training set.
+    """
+    if X is None:
+        X, y = load_training_data()
+        training_set = True
+    start = time.perf_counter()
+    predictions, method = out_of_sample_predictions(pipeline, X, y, training_set=training_set)
+    model = fit_intervals(predictions, y, alpha, n_bins)
+    model.meta = {'method': method, 'rows': len(X), 'seconds': time.perf_counter() - start}
+    return model
+
+
+def calibration_path(model_sha, alpha=DEFAULT_ALPHA, cache_dir=DEFAULT_CACHE_DIR):
+    return os.path.join(cache_dir, 'intervals', f'{model_sha}-{alpha:g}.json')
+
+
+def load_intervals(name=PRICE_PIPELINE, alpha=DEFAULT_ALPHA, refresh=False, training_csv=TRAINING_CSV,
+                   training_set=None):
+    """Intervals for the registry model, calibrated once per model sha256.
+
+    Without a ``training_csv`` a missing calibration is an error.
+    ``training_set`` says whether ``training_csv`` holds the model's training
+    rows in order; by default only the repository's pipeline and CSV do.
+    """
+    # Only the sha256 is needed to find a stored calibration, not the unpickled model.
+    path = calibration_path(registry.resolve(name)[1], alpha, registry.cache_dir)
+    if not refresh and os.path.exists(path):
+        return IntervalModel.load(path)
+    if training_csv is None:
+        raise FileNotFoundError(f"No {alpha:g} calibration for {name!r}; run "
+                                f"`python -m real_estate.intervals` with its training CSV")
+    if training_set is None:
+        training_set = name == PRICE_PIPELINE and os.path.abspath(training_csv) == TRAINING_CSV
+    model = calibrate(registry.load(name), *load_training_data(training_csv), alpha=alpha,
+                      training_set=training_set)
+    model.save(path)
+    return model
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Calibrate conformal price intervals for the cached model")
+    parser.add_argument('--alpha', type=float, default=DEFAULT_ALPHA, help="miscoverage rate")
+    parser.add_argument('--refresh', action='store_true', help="recalibrate even if stored")
+    parser.add_argument('--city', help="calibrate this city's price pipeline")
+    parser.add_argument('--training-csv', default=TRAINING_CSV, help="rows to calibrate on")
+    parser.add_argument('--training-set', action=argparse.BooleanOptionalAction,
+                        help="the CSV holds the pipeline's training rows in training order, so out-of-bag "
+                             "residuals can be used (default: only for the repository's pipeline and CSV)")
+    args = parser.parse_args()
+
+    name = register_city(args.city) if args.city else PRICE_PIPELINE
+    model = load_intervals(name, args.alpha, args.refresh, args.training_csv, args.training_set)
+    print(f"{1 - model.alpha:.0%} intervals ({model.meta})")
+    edges = np.expm1(np.concatenate([[0.0], model.edges, [np.inf]]))
+    for b, (lo, hi) in enumerate(zip(model.lower, model.upper)):
+        print(f"  predicted {edges[b]:>6.2f} - {edges[b + 1]:>6.2f} Cr: "
+              f"log residual {lo:+.3f} .. {hi:+.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,219 @@
+"""Local, content-addressed cache and process-wide singletons for models.
+
+``Price_Predictor.py`` used to download ``pipeline.pkl`` with gdown and
+unpickle it on every script rerun.  The registry resolves a model name to a
+blob in a local cache directory (``blobs/<sha256>.pkl`` plus a
+``refs/<name>`` pointer), fetches it only when the blob is missing, and
+keeps the deserialised estimator in memory for the life of the process.
+
+Fetchers are plain callables ``fetch(destination_path)`` so tests can stub
+the remote::
+
+    registry = ModelRegistry(tmp_dir)
+    registry.register('price_pipeline', LocalFileFetcher('fixtures/pipeline.pkl'))
+
+Warm the cache when building an image::
+
+    python -m real_estate.model_registry price_pipeline
+
+Every city has its own price pipeline (``price_pipeline_name``).  Gurgaon's
+is the Google Drive model; another city's is read from
+``REAL_ESTATE_PRICE_PIPELINE_<CITY>`` or ``artifacts/<city>/pipeline.pkl``::
+
+    python -m real_estate.model_registry --city pune
+"""
+import argparse
+import os
+import pickle
+import shutil
+import threading
+import time
+from dataclasses import asdict, dataclass
+
+from real_estate.artifacts import REPO_CITY, REPO_DIR, _create_temp, _sha256, city_root
+
+DEFAULT_CACHE_DIR = os.environ.get('REAL_ESTATE_MODEL_CACHE', os.path.join(REPO_DIR, '.model_cache'))
+PRICE_PIPELINE = 'price_pipeline'
+PRICE_PIPELINE_FILE_ID = "1alSmJrC2k5kbGg1-tfeqF_eLQ8yQ0_C7"
+
+
+class GDriveFetcher:
+    """Download a Google Drive file with gdown (imported only when fetching)."""
+
+    def __init__(self, file_id):
+        self.file_id = file_id
+
+    def __call__(self, destination):
+        import gdown
+
+        url = f"https://drive.google.com/uc?id={self.file_id}"
+        if gdown.download(url, destination, quiet=True) is None:
+            raise RuntimeError(f"Could not download {url}")
+
+
+class LocalFileFetcher:
+    """Copy a model file that is already on disk."""
+
+    def __init__(self, path):
+        self.path = path
+
+    def __call__(self, destination):
+        shutil.copyfile(self.path, destination)
+
+
+@dataclass
+class LoadMetrics:
+    sha256: str
+    bytes: int
+    source: str           # 'cache' when the blob was on disk, 'remote' when fetched
+    fetch_seconds: float
+    load_seconds: float
+
+
+class ModelRegistry:
+    """Resolves model names to cached blobs and loaded estimators."""
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR):
+        self.cache_dir = cache_dir
+        self._fetchers = {}
+        self._models = {}
+        self._metrics = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+
+    def register(self, name, fetcher):
+        with self._lock:
+            self._fetchers[name] = fetcher
+            self._locks.setdefault(name, threading.Lock())
+
+    def _ref_path(self, name):
+        return os.path.join(self.cache_dir, 'refs', name)
+
+    def _blob_path(self, sha):
+        return os.path.join(self.cache_dir, 'blobs', f'{sha}.pkl')
+
+    def cached_sha(self, name):
+        """sha256 of the cached blob for ``name``, or None if not cached."""
+        try:
+            with open(self._ref_path(name)) as f:
+                sha = f.read().strip()
+        except FileNotFoundError:
+            return None
+        return sha if os.path.exists(self._blob_path(sha)) else None
+
+    def resolve(self, name):
+        """Return ``(path, sha256, source, fetch_seconds)``, fetching if needed."""
+        sha = self.cached_sha(name)
+        if sha is not None:
+            return self._blob_path(sha), sha, 'cache', 0.0
+
+        try:
+            fetcher = self._fetchers[name]
+        except KeyError:
+            raise KeyError(f"No fetcher registered for model {name!r}") from None
+
+        os.makedirs(os.path.join(self.cache_dir, 'blobs'), exist_ok=True)
+        os.makedirs(os.path.join(self.cache_dir, 'refs'), exist_ok=True)
+        f, tmp = _create_temp(self.cache_dir, '.part')
+        f.close()
+        start = time.perf_counter()
+        try:
+            fetcher(tmp)
+            sha = _sha256(tmp)
+            os.replace(tmp, self._blob_path(sha))
+        finally:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+        fetch_seconds = time.perf_counter() - start
+
+        f, tmp_ref = _create_temp(self.cache_dir, '.ref')
+        with f:
+            f.write(sha.encode())
+        os.replace(tmp_ref, self._ref_path(name))
+        return self._blob_path(sha), sha, 'remote', fetch_seconds
+
+    def load(self, name):
+        """The deserialised model, loaded at most once per process."""
+        model = self._models.get(name)
+        if model is not None:
+            return model
+        with self._lock:
+            lock = self._locks.setdefault(name, threading.Lock())
+        with lock:
+            # Another thread may have finished loading while we waited.
+            if name in self._models:
+                return self._models[name]
+            path, sha, source, fetch_seconds = self.resolve(name)
+            start = time.perf_counter()
+            with open(path, 'rb') as f:
+                model = pickle.load(f)
+            self._metrics[name] = LoadMetrics(
+                sha256=sha,
+                bytes=os.path.getsize(path),
+                source=source,
+                fetch_seconds=fetch_seconds,
+                load_seconds=time.perf_counter() - start,
+            )
+            self._models[name] = model
+            return model
+
+    def metrics(self, name):
+        """LoadMetrics of the last load of ``name`` (None before the first load)."""
+        return self._metrics.get(name)
+
+    def evict(self, name, from_disk=False):
+        """Forget the loaded model; ``from_disk`` also drops the cached ref."""
+        with self._lock:
+            self._models.pop(name, None)
+            self._metrics.pop(name, None)
+        if from_disk and os.path.exists(self._ref_path(name)):
+            os.unlink(self._ref_path(name))
+
+
+def _price_pipeline_fetcher():
+    local = os.environ.get('REAL_ESTATE_PRICE_PIPELINE')
+    return LocalFileFetcher(local) if local else GDriveFetcher(PRICE_PIPELINE_FILE_ID)
+
+
+def price_pipeline_name(city=REPO_CITY):
+    """Registry name of a city's price pipeline."""
+    return PRICE_PIPELINE if city == REPO_CITY else f'{PRICE_PIPELINE}-{city}'
+
+
+def register_city(city):
+    """Register the fetcher of ``city``'s price pipeline; returns its registry name."""
+    name = price_pipeline_name(city)
+    if city != REPO_CITY:
+        local = os.environ.get(f'REAL_ESTATE_PRICE_PIPELINE_{city.upper()}',
+                               os.path.join(city_root(city), 'pipeline.pkl'))
+        registry.register(name, LocalFileFetcher(local))
+    return name
+
+
+# Process-wide registry shared by every Streamlit session.
+registry = ModelRegistry()
+registry.register(PRICE_PIPELINE, _price_pipeline_fetcher())
+
+
+def load_model(name=PRICE_PIPELINE):
+    return registry.load(name)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fetch a model into the local cache and time its load")
+    parser.add_argument('name', nargs='?', default=PRICE_PIPELINE)
+    parser.add_argument('--city', help="load this city's price pipeline instead of NAME")
+    parser.add_argument('--refresh', action='store_true', help="re-fetch even if a cached blob exists")
+    args = parser.parse_args()
+    if args.city:
+        args.name = register_city(args.city)
+
+    if args.refresh:
+        registry.evict(args.name, from_disk=True)
+    registry.load(args.name)
+    for key, value in asdict(registry.metrics(args.name)).items():
+        print(f"{key:<14} {value}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,420 @@
+"""Parallel, cached cross-validation of price models.
+
+``model-selection (1).ipynb`` ran ``scorer()`` over 11 regressors one after
+another, and ``cross_val_score`` refitted the same ``ColumnTransformer`` in
+every fold of every model.  Here the preprocessing is fitted once per
+(preprocessor, fold) and cached on disk with its transformed matrices, and
+the model x fold fits run as independent jobs in a process pool::
+
+    python -m real_estate.model_selection --workers 4
+    python -m real_estate.model_selection --models "random forest" "extra trees" --search --candidates 12
+    python -m real_estate.model_selection --preprocessors ordinal onehot --sort latency
+
+With ``--search`` every (model, preprocessor) pair samples ``--candidates``
+hyperparameter settings (plus the defaults) and races them by successive
+halving over folds: all candidates are scored on ``--min-folds`` folds, the
+best ``1/eta`` of them move on to ``eta`` times as many folds, and so on
+until the survivors have seen every fold.  Fold results already computed
+are reused, within a run and across runs (``<root>/jobs.jsonl``).
+
+Memory stays bounded: workers load one cached fold at a time and at most
+two jobs per worker are in flight.  The leaderboard (``<root>/leaderboard.csv``
+and ``.json``) has, per candidate, mean/std r2 of ``log1p(price)``, MAE in
+Cr, mean fit seconds, batch predict microseconds per row (preprocessing
+included) and the median latency of a single-row predict on the first
+fold, as the service sees it.  Run with ``--workers`` at most the number
+of cores, or the timings include contention.
+"""
+import argparse
+import hashlib
+import inspect
+import json
+import math
+import os
+import pickle
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from real_estate.artifacts import REPO_DIR, _atomic_write
+from real_estate.price_model import load_training_data
+
+DEFAULT_DIR = os.environ.get('REAL_ESTATE_MODEL_SELECTION_DIR', os.path.join(REPO_DIR, '.model_selection'))
+NUMERIC_COLUMNS = ['bedRoom', 'bathroom', 'built_up_area', 'servant room', 'store room']
+ORDINAL_COLUMNS = ['property_type', 'sector', 'balcony', 'agePossession', 'furnishing_type', 'luxury_category',
+                   'floor_category']
+LATENCY_ROWS = 25
+
+# name -> (estimator class, search space), in the notebook's order
+MODELS = {
+    'linear_reg': ('sklearn.linear_model.LinearRegression', {}),
+    'svr': ('sklearn.svm.SVR', {'C': [0.1, 1, 10, 100], 'epsilon': [0.01, 0.05, 0.1, 0.2], 'gamma': ['scale', 'auto']}),
+    'ridge': ('sklearn.linear_model.Ridge', {'alpha': [0.01, 0.1, 1, 10, 100]}),
+    'LASSO': ('sklearn.linear_model.Lasso', {'alpha': [0.0001, 0.001, 0.01, 0.1, 1]}),
+    'decision tree': ('sklearn.tree.DecisionTreeRegressor',
+                      {'max_depth': [None, 5, 10, 20], 'min_samples_leaf': [1, 2, 5, 10]}),
+    'random forest': ('sklearn.ensemble.RandomForestRegressor',
+                      {'n_estimators': [100, 200, 300, 500], 'max_depth': [None, 10, 20, 30],
+                       'max_features': [1.0, 'sqrt', 0.5], 'min_samples_leaf': [1, 2, 4]}),
+    'extra trees': ('sklearn.ensemble.ExtraTreesRegressor',
+                    {'n_estimators': [100, 200, 300, 500], 'max_depth': [None, 10, 20, 30],
+                     'max_features': [1.0, 'sqrt', 0.5], 'min_samples_leaf': [1, 2, 4]}),
+    'gradient boosting': ('sklearn.ensemble.GradientBoostingRegressor',
+                          {'n_estimators': [100, 200, 500], 'learning_rate': [0.01, 0.05, 0.1, 0.2],
+                           'max_depth': [3, 5, 7], 'subsample': [0.6, 0.8, 1.0]}),
+    'adaboost': ('sklearn.ensemble.AdaBoostRegressor',
+                 {'n_estimators': [50, 100, 200], 'learning_rate': [0.01, 0.1, 1.0]}),
+    'mlp': ('sklearn.neural_network.MLPRegressor',
+            {'hidden_layer_sizes': [[50], [50, 50], [100, 50]], 'alpha': [0.0001, 0.001, 0.01],
+             'learning_rate_init': [0.001, 0.01]}),
+    'xgboost': ('xgboost.XGBRegressor',
+                {'n_estimators': [100, 200, 300, 500], 'learning_rate': [0.01, 0.05, 0.1, 0.2],
+                 'max_depth': [3, 5, 7, 10], 'subsample': [0.6, 0.8, 1.0], 'colsample_bytree': [0.6, 0.8, 1.0],
+                 'gamma': [0, 0.1, 0.2, 0.3], 'reg_alpha': [0, 0.1, 1], 'reg_lambda': [1, 1.5, 2]}),
+}
+# The notebook's ColumnTransformer variants; 'onehot' is the one the deployed pipeline uses.
+PREPROCESSORS = ['ordinal', 'onehot', 'onehot_pca', 'target']
+
+
+def _import(path):
+    module, _, name = path.rpartition('.')
+    return getattr(__import__(module, fromlist=[name]), name)
+
+
+def make_model(name, params, seed=42):
+    model = _import(MODELS[name][0])(**params)
+    if 'random_state' in model.get_params() and 'random_state' not in params:
+        model.set_params(random_state=seed)
+    return model
+
+
+def build_preprocessor(name, categories):
+    """Unfitted preprocessor ``name``.
+
+    Encoders get every category of the full table up front, so that a
+    sector seen in one fold only cannot break another.
+    """
+    from sklearn.compose import ColumnTransformer
+    from sklearn.preprocessing import OneHotEncoder, OrdinalEncoder, StandardScaler
+
+    def ordinal(columns):
+        return OrdinalEncoder(categories=[categories[c] for c in columns])
+
+    def onehot(columns):
+        return OneHotEncoder(drop='first', sparse_output=False, categories=[categories[c] for c in columns])
+
+    transformers = [('num', StandardScaler(), NUMERIC_COLUMNS), ('cat', ordinal(ORDINAL_COLUMNS), ORDINAL_COLUMNS)]
+    if name == 'ordinal':
+        pass
+    elif name in ('onehot', 'onehot_pca'):
+        transformers.append(('cat1', onehot(['sector', 'agePossession']), ['sector', 'agePossession']))
+    elif name == 'target':
+        import category_encoders as ce
+
+        transformers += [('cat1', onehot(['agePossession']), ['agePossession']),
+                         ('target_enc', ce.TargetEncoder(), ['sector'])]
+    else:
+        raise ValueError(f"Unknown preprocessor {name!r}; choose from {PREPROCESSORS}")
+    preprocessor = ColumnTransformer(transformers=transformers, remainder='passthrough')
+    if name == 'onehot_pca':
+        from sklearn.decomposition import PCA
+        from sklearn.pipeline import Pipeline
+
+        return Pipeline([('preprocessor', preprocessor), ('pca', PCA(n_components=0.95))])
+    return preprocessor
+
+
+def _hash(*parts):
+    return hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode()).hexdigest()[:24]
+
+
+class FoldCache:
+    """Fitted preprocessing and transformed matrices per (data, preprocessor, fold)."""
+
+    def __init__(self, root, X, y, folds=10, seed=42):
+        import sklearn
+        from sklearn.model_selection import KFold
+
+        self.root = os.path.join(root, 'folds')
+        self.X, self.y = X, y
+        self.folds = folds
+        self.splits = list(KFold(folds, shuffle=True, random_state=seed).split(X))
+        self.categories = {c: sorted(X[c].unique().tolist()) for c in ORDINAL_COLUMNS}
+        data = hashlib.sha256(pd.util.hash_pandas_object(X, index=False).to_numpy().tobytes())
+        data.update(np.ascontiguousarray(y).tobytes())
+        code = hashlib.sha256(inspect.getsource(build_preprocessor).encode()).hexdigest()
+        self.key = _hash(data.hexdigest(), folds, seed, sklearn.__version__, code)
+
+    def path(self, preprocessor, fold):
+        return os.path.join(self.root, f'{self.key}-{preprocessor}-{fold}.pkl')
+
+    def prepare(self, preprocessor, fold):
+        """Path of the cached fold, fitting the preprocessor if needed."""
+        path = self.path(preprocessor, fold)
+        if os.path.exists(path):
+            return path
+        train, test = self.splits[fold]
+        X_train, X_test = self.X.iloc[train], self.X.iloc[test]
+        fitted = build_preprocessor(preprocessor, self.categories)
+        start = time.perf_counter()
+        Xt_train = fitted.fit_transform(X_train, self.y[train])
+        fit_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        Xt_test = fitted.transform(X_test)
+        transform_us = (time.perf_counter() - start) / len(test) * 1e6
+        data = {'X_train': np.asarray(Xt_train, dtype=float), 'y_train': self.y[train],
+                'X_test': np.asarray(Xt_test, dtype=float), 'y_test': self.y[test],
+                'preprocessor': fitted, 'latency_rows': X_test.iloc[:LATENCY_ROWS],
+                'fit_seconds': fit_seconds, 'transform_us_per_row': transform_us}
+        _atomic_write(path, lambda f: pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL))
+        return path
+
+
+_fold = {}
+
+
+def _load_fold(path):
+    # One fold per worker: jobs arrive sorted by fold, so this is mostly a hit.
+    if path not in _fold:
+        _fold.clear()
+        with open(path, 'rb') as f:
+            _fold[path] = pickle.load(f)
+    return _fold[path]
+
+
+def run_job(job):
+    """Fit one candidate on one cached fold; returns its scores and timings."""
+    from sklearn.metrics import mean_absolute_error, r2_score
+
+    fold = _load_fold(job['fold_path'])
+    model = make_model(job['model'], job['params'], job['seed'])
+    start = time.perf_counter()
+    model.fit(fold['X_train'], fold['y_train'])
+    fit_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    pred = model.predict(fold['X_test'])
+    predict_us = (time.perf_counter() - start) / len(pred) * 1e6
+    single = []
+    # Single-row latency hardly varies by fold; timing it on one keeps the overhead off the others.
+    for i in range(len(fold['latency_rows']) if job['fold'] == 0 else 0):
+        row = fold['latency_rows'].iloc[[i]]
+        start = time.perf_counter()
+        model.predict(fold['preprocessor'].transform(row))
+        single.append(time.perf_counter() - start)
+    return {
+        'key': job['key'], 'model': job['model'], 'preprocessor': job['preprocessor'], 'params': job['params'],
+        'fold': job['fold'], 'r2': float(r2_score(fold['y_test'], pred)),
+        'mae': float(mean_absolute_error(np.expm1(fold['y_test']), np.expm1(pred))),
+        'fit_seconds': fit_seconds, 'predict_us_per_row': predict_us + fold['transform_us_per_row'],
+        'single_row_ms': float(np.median(single) * 1e3) if single else float('nan'),
+    }
+
+
+class JobLog:
+    """Results of finished jobs, appended to ``<root>/jobs.jsonl``."""
+
+    def __init__(self, root):
+        os.makedirs(root, exist_ok=True)
+        self.path = os.path.join(root, 'jobs.jsonl')
+        self.results = {}
+        if os.path.exists(self.path):
+            with open(self.path) as f:
+                for line in f:
+                    if line.strip():
+                        result = json.loads(line)
+                        self.results[result['key']] = result
+
+    def add(self, result):
+        self.results[result['key']] = result
+        with open(self.path, 'a') as f:
+            f.write(json.dumps(result) + '\n')
+
+
+class ModelSelection:
+    """Schedules candidate x fold jobs over a process pool, reusing cached work."""
+
+    def __init__(self, X, y, root=DEFAULT_DIR, folds=10, seed=42, workers=1, verbose=True):
+        self.cache = FoldCache(root, X, y, folds, seed)
+        self.log = JobLog(root)
+        self.root = root
+        self.seed = seed
+        self.workers = workers
+        self.verbose = verbose
+        self.ran = 0
+        self.reused = 0
+
+    def job(self, candidate, fold):
+        key = _hash(self.cache.key, candidate['model'], candidate['preprocessor'], candidate['params'], fold,
+                    self.seed)
+        return {'key': key, 'fold': fold, 'seed': self.seed, **candidate}
+
+    def evaluate(self, candidates, folds, pool=None):
+        """Make sure every candidate has results on folds ``0..folds-1``."""
+        todo = []
+        for candidate in candidates:
+            for fold in range(folds):
+                job = self.job(candidate, fold)
+                if job['key'] in self.log.results:
+                    self.reused += 1
+                else:
+                    todo.append(job)
+        for job in todo:
+            job['fold_path'] = self.cache.prepare(job['preprocessor'], job['fold'])
+        todo.sort(key=lambda job: job['fold_path'])
+        if pool is None:
+            for job in todo:
+                self._done(run_job(job))
+            return
+        pending = deque()
+        for job in todo:
+            pending.append(pool.submit(run_job, job))
+            if len(pending) >= 2 * self.workers:
+                self._done(pending.popleft().result())
+        while pending:
+            self._done(pending.popleft().result())
+
+    def _done(self, result):
+        self.log.add(result)
+        self.ran += 1
+        if self.verbose:
+            print(f"{result['model']:<18} {result['preprocessor']:<10} fold {result['fold']:<2} "
+                  f"r2 {result['r2']:.4f}  mae {result['mae']:.3f}  fit {result['fit_seconds']:.2f}s  "
+                  f"{json.dumps(result['params'])}", file=sys.stderr)
+
+    def results(self, candidate, folds):
+        return [self.log.results[self.job(candidate, fold)['key']] for fold in range(folds)]
+
+    def score(self, candidate, folds, metric):
+        results = self.results(candidate, folds)
+        if metric == 'mae':
+            return -np.mean([r['mae'] for r in results])
+        return np.mean([r['r2'] for r in results])
+
+    def halving(self, brackets, min_folds=2, eta=3, metric='r2', pool=None):
+        """Successive halving over folds within each bracket (one per model x preprocessor).
+
+        Returns ``[(candidate, folds evaluated)]`` for every candidate.
+        """
+        folds = self.cache.folds
+        rungs = [min(min_folds, folds)]
+        while rungs[-1] < folds:
+            rungs.append(min(rungs[-1] * eta, folds))
+        alive = [list(bracket) for bracket in brackets]
+        reached = {}
+        for rung in rungs:
+            self.evaluate([c for bracket in alive for c in bracket], rung, pool)
+            for bracket in alive:
+                for candidate in bracket:
+                    reached[_hash(candidate)] = (candidate, rung)
+            if rung == folds:
+                break
+            alive = [sorted(bracket, key=lambda c: self.score(c, rung, metric), reverse=True)
+                     [:max(1, math.ceil(len(bracket) / eta))] for bracket in alive]
+        return list(reached.values())
+
+    def leaderboard(self, reached):
+        rows = []
+        for candidate, folds in reached:
+            results = self.results(candidate, folds)
+            r2 = [r['r2'] for r in results]
+            rows.append({
+                'model': candidate['model'], 'preprocessor': candidate['preprocessor'],
+                'params': json.dumps(candidate['params'], sort_keys=True), 'folds': folds,
+                'r2': np.mean(r2), 'r2_std': np.std(r2), 'mae': np.mean([r['mae'] for r in results]),
+                'fit_seconds': np.mean([r['fit_seconds'] for r in results]),
+                'predict_us_per_row': np.mean([r['predict_us_per_row'] for r in results]),
+                'single_row_ms': results[0]['single_row_ms'],
+            })
+        return pd.DataFrame(rows)
+
+
+def candidates_for(model, preprocessor, search=False, n_candidates=8, seed=42):
+    """The default settings, plus ``n_candidates`` sampled ones with ``search``."""
+    params = [{}]
+    if search and MODELS[model][1]:
+        from sklearn.model_selection import ParameterSampler
+
+        space = MODELS[model][1]
+        n = min(n_candidates, math.prod(len(v) for v in space.values()))
+        params += [dict(p) for p in ParameterSampler(space, n, random_state=seed)]
+    # Settings that only restate a default would rerun the default candidate.
+    defaults = _import(MODELS[model][0])().get_params()
+    params = [{k: v for k, v in p.items() if v != defaults.get(k)} for p in params]
+    unique = {json.dumps(p, sort_keys=True): p for p in params}
+    return [{'model': model, 'preprocessor': preprocessor, 'params': p} for p in unique.values()]
+
+
+SORT_KEYS = {'r2': ('r2', False), 'mae': ('mae', True), 'latency': ('single_row_ms', True)}
+
+
+def run(models=None, preprocessors=('onehot',), root=DEFAULT_DIR, folds=10, workers=1, search=False,
+        n_candidates=8, min_folds=2, eta=3, metric='r2', sort='r2', seed=42, X=None, y=None, verbose=True):
+    """Run the selection; returns ``(leaderboard, stats)`` and writes the leaderboard under ``root``."""
+    if X is None:
+        X, y = load_training_data()
+    models = list(models or MODELS)
+    selection = ModelSelection(X, y, root, folds, seed, workers, verbose)
+    brackets = [candidates_for(m, p, search, n_candidates, seed) for m in models for p in preprocessors]
+    start = time.perf_counter()
+    pool = ProcessPoolExecutor(workers) if workers > 1 else None
+    try:
+        reached = selection.halving(brackets, min_folds if search else folds, eta, metric, pool)
+    finally:
+        if pool:
+            pool.shutdown()
+    board = selection.leaderboard(reached)
+    column, ascending = SORT_KEYS[sort]
+    board = board.sort_values(['folds', column], ascending=[False, ascending]).reset_index(drop=True)
+    board.to_csv(os.path.join(root, 'leaderboard.csv'), index=False)
+    _atomic_write(os.path.join(root, 'leaderboard.json'),
+                  lambda f: f.write(board.to_json(orient='records', indent=1).encode()))
+    stats = {'seconds': time.perf_counter() - start, 'jobs_run': selection.ran, 'jobs_reused': selection.reused}
+    return board, stats
+
+
+def _available(models):
+    """Models whose estimator package is installed; the rest are reported and skipped."""
+    keep = []
+    for name in models:
+        try:
+            _import(MODELS[name][0])
+        except ImportError as e:
+            print(f"skipping {name}: {e}", file=sys.stderr)
+        else:
+            keep.append(name)
+    return keep
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cross-validate price models in parallel with cached folds")
+    parser.add_argument('--models', nargs='+', choices=list(MODELS), help="default: every installed model")
+    parser.add_argument('--preprocessors', nargs='+', choices=PREPROCESSORS, default=['onehot'])
+    parser.add_argument('--folds', type=int, default=10)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--search', action='store_true', help="successive-halving hyperparameter search")
+    parser.add_argument('--candidates', type=int, default=8, help="sampled settings per model with --search")
+    parser.add_argument('--min-folds', type=int, default=2, help="folds in the first halving rung")
+    parser.add_argument('--eta', type=int, default=3, help="keep 1/eta of the candidates per rung")
+    parser.add_argument('--metric', choices=['r2', 'mae'], default='r2', help="what halving ranks by")
+    parser.add_argument('--sort', choices=list(SORT_KEYS), default='r2', help="leaderboard order")
+    parser.add_argument('--root', default=DEFAULT_DIR, help="fold cache, job log and leaderboard")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('-q', '--quiet', action='store_true', help="don't log every finished job")
+    args = parser.parse_args()
+
+    models = _available(args.models or list(MODELS))
+    board, stats = run(models, args.preprocessors, args.root, args.folds, args.workers, args.search,
+                       args.candidates, args.min_folds, args.eta, args.metric, args.sort, args.seed,
+                       verbose=not args.quiet)
+    with pd.option_context('display.width', 200, 'display.max_colwidth', 60):
+        print(board.to_string(index=False, float_format=lambda v: f'{v:.4g}'))
+    print(f"{stats['jobs_run']} jobs run, {stats['jobs_reused']} reused from {args.root} "
+          f"in {stats['seconds']:.1f}s; leaderboard in {os.path.join(args.root, 'leaderboard.csv')}")
+
+
+if __name__ == '__main__':
+    main()
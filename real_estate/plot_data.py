@@ -0,0 +1,120 @@
+"""Server-side reductions for the Analysis_App charts.
+
+Plotly Express embeds every row it is given in the figure JSON, so a
+scatter or box plot of the filtered listings grows with the data.  These
+helpers reduce the rows with numpy before a figure is built (histogram bins
+come from ``real_estate.cube``):
+
+- ``box_stats`` / ``box_traces``: quartiles, Tukey whiskers and a capped
+  sample of outliers, drawn with plotly's precomputed box fields
+- ``downsample``: grid-binned, density-preserving scatter thinning above a
+  point budget (``REAL_ESTATE_SCATTER_BUDGET``, default 5000)
+- ``payload_bytes``: size of the JSON a figure sends to the browser
+"""
+import os
+
+import numpy as np
+
+SCATTER_BUDGET = int(os.environ.get('REAL_ESTATE_SCATTER_BUDGET', 5000))
+MAX_OUTLIERS = 200
+
+
+def box_stats(values, seed=0):
+    """Quartiles, Tukey whiskers, mean and at most ``MAX_OUTLIERS`` outliers."""
+    values = np.asarray(values, dtype=float)
+    q1, median, q3 = np.quantile(values, [0.25, 0.5, 0.75])
+    iqr = q3 - q1
+    inside = values[(values >= q1 - 1.5 * iqr) & (values <= q3 + 1.5 * iqr)]
+    outliers = values[(values < inside.min()) | (values > inside.max())]
+    if len(outliers) > MAX_OUTLIERS:
+        # Keep the extremes and a random sample of the rest.
+        outliers = np.sort(outliers)
+        middle = np.random.default_rng(seed).choice(outliers[1:-1], MAX_OUTLIERS - 2, replace=False)
+        outliers = np.concatenate([outliers[[0, -1]], middle])
+    return {'q1': q1, 'median': median, 'q3': q3, 'lowerfence': inside.min(),
+            'upperfence': inside.max(), 'mean': values.mean(), 'count': len(values),
+            'outliers': outliers}
+
+
+def box_traces(df, value, by=None, color=None, orientation='v', width=0.8, colors=None):
+    """Box traces drawn from precomputed stats, plus outlier markers.
+
+    With ``by`` (a numeric column) there is one box per ``by`` value and
+    ``color`` group, side by side around the value; without it each
+    ``color`` group gets one box at position 0, 1, 2, ...
+    """
+    import plotly.graph_objects as go
+    from plotly.colors import qualitative
+
+    colors = colors or qualitative.Plotly
+    groups = list(df.groupby(color, sort=True)) if color else [(value, df)]
+    if df.empty:
+        return []
+    box_width = width / len(groups) if by else width
+    traces = []
+    for i, (name, frame) in enumerate(groups):
+        parts = frame.groupby(by, sort=True) if by else [(i, frame)]
+        shift = (i - (len(groups) - 1) / 2) * box_width if by else 0.0
+        stats = {key: [] for key in ('q1', 'median', 'q3', 'lowerfence', 'upperfence', 'mean')}
+        positions, outlier_pos, outlier_val = [], [], []
+        for position, part in parts:
+            box = box_stats(part[value].to_numpy())
+            positions.append(float(position) + shift)
+            for key in stats:
+                stats[key].append(box[key])
+            outlier_pos.extend([float(position) + shift] * len(box['outliers']))
+            outlier_val.extend(box['outliers'].tolist())
+        marker_color = colors[i % len(colors)]
+        vertical = orientation == 'v'
+        axis = {'x': positions} if vertical else {'y': positions}
+        traces.append(go.Box(name=str(name), orientation=orientation, width=box_width * 0.9,
+                             marker_color=marker_color, legendgroup=str(name), **axis, **stats))
+        if outlier_val:
+            xy = {'x': outlier_pos, 'y': outlier_val} if vertical else {'x': outlier_val, 'y': outlier_pos}
+            traces.append(go.Scatter(mode='markers', marker=dict(color=marker_color, size=4),
+                                     legendgroup=str(name), showlegend=False, name=str(name), **xy))
+    return traces
+
+
+def downsample(df, x, y, budget=SCATTER_BUDGET, grid=100, seed=0):
+    """At most about ``budget`` rows of ``df`` that keep the (x, y) density.
+
+    The plane is cut into a ``grid`` x ``grid`` mesh; each occupied cell keeps
+    a random share of its rows proportional to its population, but at least
+    one, so sparse regions and outliers survive.  A ``weight`` column holds
+    the number of rows each kept point stands for.  Rows with a non-finite
+    x or y are dropped, as plotly would not draw them.
+    """
+    xs, ys = df[x].to_numpy(dtype=float), df[y].to_numpy(dtype=float)
+    finite = np.isfinite(xs) & np.isfinite(ys)
+    if not finite.all():
+        df, xs, ys = df[finite], xs[finite], ys[finite]
+    n = len(df)
+    if n <= budget:
+        return df.assign(weight=1)
+
+    def cell_index(values):
+        lo, hi = values.min(), values.max()
+        scaled = (values - lo) / (hi - lo) if hi > lo else np.zeros_like(values)
+        return np.minimum((scaled * grid).astype(np.int64), grid - 1)
+
+    cells = cell_index(xs) * grid + cell_index(ys)
+    population = np.bincount(cells, minlength=grid * grid)
+    occupied = np.count_nonzero(population)
+    share = max(budget - occupied, 0) / n
+    quota = np.maximum(1, np.floor(population * share)).astype(np.int64)
+
+    # Random rank of every row inside its cell; keep ranks below the quota.
+    order = np.random.default_rng(seed).permutation(n)
+    order = order[np.argsort(cells[order], kind='stable')]
+    starts = np.cumsum(population) - population
+    rank = np.empty(n, dtype=np.int64)
+    rank[order] = np.arange(n) - starts[cells[order]]
+    keep = rank < quota[cells]
+    kept = df[keep]
+    return kept.assign(weight=(population / np.minimum(quota, population).clip(min=1))[cells[keep]])
+
+
+def payload_bytes(fig):
+    """Bytes of figure JSON sent to the browser."""
+    return len(fig.to_json())
@@ -0,0 +1,133 @@
+"""Process-wide LRU/TTL cache of price predictions.
+
+Users flip between "Predict" and "Show Summary" and press "Predict" again
+with the same form values; every press used to run the pipeline.  Rows are
+reduced to a canonical tuple of the twelve ``FEATURE_COLUMNS``
+(``built_up_area`` snapped to the slider's 50 sqft step, numbers as floats,
+strings stripped) and predictions are cached under that key.  The model
+sha256 is part of the cache state: when it changes the cache is cleared.
+
+Size and lifetime come from ``REAL_ESTATE_PREDICTION_CACHE_SIZE`` (entries)
+and ``REAL_ESTATE_PREDICTION_CACHE_TTL`` (seconds, 0 disables expiry).
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from real_estate.price_model import FEATURE_COLUMNS, predict_batch, to_frame
+
+AREA_STEP = 50.0
+_AREA = FEATURE_COLUMNS.index('built_up_area')
+
+
+def canonical_row(row):
+    """Hashable, normalised form of one row (list/tuple in column order or dict)."""
+    if isinstance(row, dict):
+        row = [row[c] for c in FEATURE_COLUMNS]
+    key = []
+    for i, value in enumerate(row):
+        if isinstance(value, str):
+            value = value.strip()
+        elif isinstance(value, (int, float, np.number)):
+            value = float(value)
+            if i == _AREA:
+                value = round(value / AREA_STEP) * AREA_STEP
+        key.append(value)
+    return tuple(key)
+
+
+class PredictionCache:
+    """Thread-safe LRU with optional TTL and hit/miss counters."""
+
+    def __init__(self, maxsize=4096, ttl=3600.0, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self.model_sha = None
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = self.expirations = self.invalidations = 0
+
+    def _check_model(self, model_sha):
+        if model_sha != self.model_sha:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self.model_sha = model_sha
+
+    def get(self, key, model_sha):
+        with self._lock:
+            self._check_model(model_sha)
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, stored = entry
+                if self.ttl and self.clock() - stored > self.ttl:
+                    del self._entries[key]
+                    self.expirations += 1
+                else:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+            self.misses += 1
+            return None
+
+    def put(self, key, value, model_sha):
+        with self._lock:
+            self._check_model(model_sha)
+            self._entries[key] = (value, self.clock())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self._entries),
+            'maxsize': self.maxsize,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+            'invalidations': self.invalidations,
+        }
+
+
+def cached_predict(rows, pipeline, model_sha, cache=None):
+    """Prices (Cr) for ``rows``, scoring only cache misses in one batch.
+
+    Misses are predicted on their canonical form so a cached value never
+    depends on which of several equivalent inputs arrived first.
+    """
+    if cache is None:
+        cache = prediction_cache
+    keys = [canonical_row(row) for row in rows]
+    prices = np.empty(len(keys))
+    missing = {}
+    for i, key in enumerate(keys):
+        value = cache.get(key, model_sha)
+        if value is None:
+            missing.setdefault(key, []).append(i)
+        else:
+            prices[i] = value
+    if missing:
+        scored = predict_batch(to_frame(missing), pipeline)
+        for (key, positions), value in zip(missing.items(), scored):
+            cache.put(key, float(value), model_sha)
+            prices[positions] = value
+    return prices
+
+
+# Shared by every Streamlit session in the process.
+prediction_cache = PredictionCache(
+    maxsize=int(os.environ.get('REAL_ESTATE_PREDICTION_CACHE_SIZE', 4096)),
+    ttl=float(os.environ.get('REAL_ESTATE_PREDICTION_CACHE_TTL', 3600)),
+)
@@ -0,0 +1,207 @@
+"""The data-preparation notebooks as DataFrame transforms.
+
+Every stage of ``real_estate.data_pipeline`` is an optional
+``fit(df) -> state`` over the whole table, returning JSON-able statistics,
+and an ``apply(df, state) -> df`` that treats rows independently: it may
+drop rows but never lets one row change another.  That split is what lets
+the pipeline reuse the cached output of rows it has already seen.
+
+- ``clean``: ``cleaning.ipynb``, crawl rows -> ``flats_cleaned2.csv`` columns
+- ``engineer_features``: ``feature-engineering.ipynb`` -> ``flats_cleaned3.csv``
+- ``treat_outliers``: ``outlier-detection-treatment.ipynb`` -> ``flats_outlier_cleaned.csv``
+- ``impute_missing``: ``missing-value-treatment.ipynb``
+  -> ``flats_cleaned_missing_value_treatment.csv``
+- ``select_features``: ``feature-selection.ipynb`` -> ``flats_post_selection2.csv``
+- ``predictor_inputs``: the model-selection notebook's ``df.pkl``
+
+The notebooks' hand-picked fixes by row index (``df.drop(index=[818, ...])``,
+``df.loc[48, 'area'] = ...``) belong to one particular scrape and are not
+reproduced.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+from real_estate import features
+from real_estate.artifacts import REPO_DIR
+from real_estate.features import ROOM_COLUMNS
+from real_estate.price_model import FEATURE_COLUMNS
+
+APARTMENTS_CSV = os.path.join(REPO_DIR, 'Data Preprocessing', 'appartments.csv')
+
+CLEANED_COLUMNS = ['property_type', 'society', 'sector', 'price', 'price_per_sqft', 'area', 'areaWithType',
+                   'bedRoom', 'bathroom', 'balcony', 'additionalRoom', 'floorNum', 'facing', 'agePossession',
+                   'nearbyLocations', 'furnishDetails', 'features']
+ENGINEERED_COLUMNS = ['property_type', 'society', 'sector', 'price', 'price_per_sqft', 'area', 'areaWithType',
+                      'bedRoom', 'bathroom', 'balcony', 'floorNum', 'facing', 'agePossession',
+                      'super_built_up_area', 'built_up_area', 'carpet_area', *ROOM_COLUMNS, 'furnishing_type',
+                      'luxury_score']
+SELECTED_COLUMNS = ['property_type', 'sector', 'price', 'bedRoom', 'bathroom', 'balcony', 'agePossession',
+                    'built_up_area', 'servant room', 'store room', 'furnishing_type', 'luxury_category',
+                    'floor_category']
+
+
+# cleaning.ipynb
+
+def clean(df, state=None):
+    df = df.copy()
+    df['society'] = features.society_name(df['society'])
+    df = df[df['price'] != 'Price on Request']
+    df['price'] = features.price_crore(df['price'])
+    df['price_per_sqft'] = features.price_per_sqft(df['area'])
+    df['bedRoom'] = features.room_count(df['bedRoom'])
+    df['bathroom'] = features.room_count(df['bathroom'])
+    df['balcony'] = features.first_token(df['balcony']).replace('No', '0')
+    df = df.dropna(subset=['bedRoom', 'bathroom', 'balcony', 'price_per_sqft'])
+    df['bedRoom'] = df['bedRoom'].astype(int)
+    df['bathroom'] = df['bathroom'].astype(int)
+    df['additionalRoom'] = df['additionalRoom'].fillna('not available')
+    df['floorNum'] = features.floor_number(df['floorNum'])
+    df['area'] = ((df['price'] * 10000000) / df['price_per_sqft']).round()
+    df['property_type'] = 'flat'
+    df['sector'] = features.sector(df['property_name'])
+    return df[CLEANED_COLUMNS]
+
+
+# feature-engineering.ipynb
+
+def fit_features(df):
+    """Furnishing vocabulary and clusters, and the apartment facilities lookup.
+
+    The notebook clustered the standardised furnishing counts with k-means
+    (k=3) and read the labels off by eye; here the clusters are ordered by
+    how many furnishings their members have, so 0/1/2 always mean
+    unfurnished/semifurnished/furnished.
+    """
+    from sklearn.cluster import KMeans
+
+    vocabulary = features.furnishing_vocabulary(df['furnishDetails'])
+    counts = features.furnishing_counts(df['furnishDetails'], vocabulary)
+    mean, scale = counts.mean(axis=0), counts.std(axis=0)
+    scale[scale == 0] = 1.0
+    kmeans = KMeans(n_clusters=3, random_state=42).fit((counts - mean) / scale)
+    totals = [counts[kmeans.labels_ == k].sum(axis=1).mean() for k in range(3)]
+    centers = kmeans.cluster_centers_[np.argsort(totals)]
+
+    apartments = pd.read_csv(APARTMENTS_CSV)
+    facilities = dict(zip(apartments['PropertyName'].str.lower(), apartments['TopFacilities']))
+    return {'vocabulary': vocabulary, 'mean': mean.tolist(), 'scale': scale.tolist(),
+            'centers': centers.tolist(), 'facilities': {k: v for k, v in facilities.items() if isinstance(v, str)}}
+
+
+def engineer_features(df, state):
+    df = df.copy()
+    areas = features.area_columns(df['areaWithType'], df['area'])
+    df[areas.columns] = areas
+    df[ROOM_COLUMNS] = features.room_flags(df['additionalRoom'], ROOM_COLUMNS)
+    df['agePossession'] = features.age_possession_category(df['agePossession'])
+
+    counts = features.furnishing_counts(df['furnishDetails'], state['vocabulary'])
+    scaled = (counts - np.array(state['mean'])) / np.array(state['scale'])
+    centers = np.array(state['centers'])
+    df['furnishing_type'] = ((scaled[:, None, :] - centers[None]) ** 2).sum(axis=2).argmin(axis=1)
+
+    # Missing amenities come from the apartments table, matched by society name.
+    amenities = df['features'].where(df['features'].notna(), df['society'].map(state['facilities']))
+    df['luxury_score'] = features.luxury_score(amenities)
+    return df[ENGINEERED_COLUMNS]
+
+
+# outlier-detection-treatment.ipynb
+
+def fit_outliers(df):
+    q1, q3 = df['price_per_sqft'].quantile([0.25, 0.75])
+    return {'price_per_sqft_q1': float(q1), 'price_per_sqft_q3': float(q3)}
+
+
+def treat_outliers(df, state):
+    df = df.copy()
+    q1, q3 = state['price_per_sqft_q1'], state['price_per_sqft_q3']
+    iqr = q3 - q1
+    outlier = (df['price_per_sqft'] < q1 - 1.5 * iqr) | (df['price_per_sqft'] > q3 + 1.5 * iqr)
+    # Most price-per-sqft outliers quote the area in sq.yard.
+    df.loc[outlier & (df['area'] < 1000), 'area'] *= 9
+    df.loc[outlier, 'price_per_sqft'] = ((df['price'] * 10000000) / df['area'])[outlier].round()
+    df = df[(df['price_per_sqft'] <= 50000) & (df['area'] < 100000) & (df['bedRoom'] <= 10)].copy()
+    df['price_per_sqft'] = ((df['price'] * 10000000) / df['area']).round()
+    df['area_room_ratio'] = df['area'] / df['bedRoom']
+    return df
+
+
+# missing-value-treatment.ipynb
+
+def _modes(df, keys):
+    """``{key: most common agePossession}``, ties broken like ``Series.mode()``."""
+    counts = df.groupby(keys, dropna=True)['agePossession'].value_counts().rename('n').reset_index()
+    counts = counts.sort_values(['n', 'agePossession'], ascending=[False, True]).drop_duplicates(keys)
+    return {'|'.join(map(str, k)) if isinstance(k, tuple) else str(k): v
+            for k, v in zip(counts[keys].itertuples(index=False, name=None) if len(keys) > 1 else counts[keys[0]],
+                            counts['agePossession'])}
+
+
+def _mode_keys(df, keys):
+    key = df[keys[0]].astype(str)
+    for column in keys[1:]:
+        key = key + '|' + df[column].astype(str)
+    return key
+
+
+_MODE_LEVELS = [['sector', 'property_type'], ['sector'], ['property_type']]
+
+
+def _impute_age(age, df, modes, keys):
+    undefined = age == 'Undefined'
+    return age.where(~undefined, _mode_keys(df, keys).map(modes))
+
+
+def fit_missing(df):
+    """Modes of agePossession by sector and type, then sector, then type.
+
+    Each level is computed after the previous one has been imputed, as the
+    notebook's three passes did.
+    """
+    age = df['agePossession']
+    state = {}
+    for keys in _MODE_LEVELS:
+        name = '+'.join(keys)
+        state[name] = _modes(df.assign(agePossession=age), keys)
+        age = _impute_age(age, df, state[name], keys)
+    return state
+
+
+def impute_missing(df, state):
+    df = df.copy()
+    sb, bu, carpet = df['super_built_up_area'], df['built_up_area'], df['carpet_area']
+    estimate = pd.Series(np.nan, index=df.index)
+    estimate[sb.notna() & carpet.notna()] = ((sb / 1.105 + carpet / 0.9) / 2).round()
+    estimate[sb.notna() & carpet.isna()] = (sb / 1.105).round()
+    estimate[sb.isna() & carpet.notna()] = (carpet / 0.9).round()
+    df['built_up_area'] = bu.fillna(estimate)
+    # Expensive listings with a small built-up area use the total area instead.
+    anomaly = (df['built_up_area'] < 2000) & (df['price'] > 2.5) & df['area'].notna()
+    df.loc[anomaly, 'built_up_area'] = df.loc[anomaly, 'area']
+    df = df.drop(columns=['area', 'areaWithType', 'super_built_up_area', 'carpet_area', 'area_room_ratio',
+                          'facing'])
+    df['floorNum'] = df['floorNum'].fillna(2.0)
+    age = df['agePossession']
+    for keys in _MODE_LEVELS:
+        age = _impute_age(age, df, state['+'.join(keys)], keys)
+    df['agePossession'] = age
+    return df
+
+
+# feature-selection.ipynb
+
+def select_features(df, state=None):
+    df = df.copy()
+    df['luxury_category'] = features.luxury_category(df['luxury_score'])
+    df['floor_category'] = features.floor_category(df['floorNum'])
+    return df[SELECTED_COLUMNS]
+
+
+def predictor_inputs(df, state=None):
+    """``df.pkl``: the model's feature columns with furnishing labels."""
+    df = df[FEATURE_COLUMNS].copy()
+    df['furnishing_type'] = features.furnishing_labels(df['furnishing_type'])
+    return df
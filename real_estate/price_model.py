@@ -0,0 +1,87 @@
+"""Feature schema and vectorised scoring for the price pipeline.
+
+The pipeline from ``model-selection (1).ipynb`` is trained on ``log1p(price)``
+over the twelve columns of ``df.pkl``; ``predict_batch`` applies it to a
+whole DataFrame at once and returns prices in crores.  Training and scoring
+both go through ``model_inputs``, which derives the categorical columns
+with ``real_estate.features`` when only their sources are given.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+from real_estate import features
+from real_estate.artifacts import REPO_DIR
+from real_estate.model_registry import load_model
+
+TRAINING_CSV = os.path.join(REPO_DIR, 'Model Selection', 'flats_post_selection2.csv')
+
+FEATURE_COLUMNS = ['property_type', 'sector', 'bedRoom', 'bathroom', 'balcony',
+                   'agePossession', 'built_up_area', 'servant room', 'store room',
+                   'furnishing_type', 'luxury_category', 'floor_category']
+# Columns the pipeline encodes as categories; their categories are strings.
+CATEGORICAL_COLUMNS = ['property_type', 'sector', 'balcony', 'agePossession', 'furnishing_type',
+                       'luxury_category', 'floor_category']
+# Feature column -> (source column, transform) for callers that only have the raw value.
+DERIVED_FEATURES = {
+    'luxury_category': ('luxury_score', features.luxury_category),
+    'floor_category': ('floorNum', features.floor_category),
+}
+
+
+def to_frame(rows):
+    """DataFrame in pipeline column order from rows (lists, tuples or dicts)."""
+    return pd.DataFrame(list(rows), columns=FEATURE_COLUMNS)
+
+
+def category_string(value):
+    """A categorical value as the pipeline's string: 3 and 3.0 -> '3'; strings and NaN pass through."""
+    if isinstance(value, str) or pd.isna(value):
+        return value
+    if isinstance(value, (float, np.floating)) and float(value).is_integer():
+        value = int(value)
+    return str(value)
+
+
+def model_inputs(df):
+    """``df``'s ``FEATURE_COLUMNS``, deriving those it lacks from ``DERIVED_FEATURES``.
+
+    Furnishing cluster codes (0/1/2) become their labels, and numbers in the
+    other ``CATEGORICAL_COLUMNS`` their ``category_string``, so that a
+    CSV chunk or JSON request whose ``balcony`` happens to be all numeric
+    scores like one holding '3+'.
+    """
+    derived = {column: derive(df[source]) for column, (source, derive) in DERIVED_FEATURES.items()
+               if column not in df.columns and source in df.columns}
+    if 'furnishing_type' in df.columns and not pd.api.types.is_string_dtype(df['furnishing_type']):
+        derived['furnishing_type'] = features.furnishing_labels(df['furnishing_type'])
+    for column in CATEGORICAL_COLUMNS:
+        if column in df.columns and column not in derived and not pd.api.types.is_string_dtype(df[column]):
+            derived[column] = df[column].map(category_string).astype(object)
+    if derived:
+        df = df.assign(**derived)
+    missing = [c for c in FEATURE_COLUMNS if c not in df.columns]
+    if missing:
+        raise ValueError(f"Missing feature columns: {missing}")
+    return df[FEATURE_COLUMNS]
+
+
+def load_training_data(path=TRAINING_CSV):
+    """``(X, log1p(price))`` prepared as in the model-selection notebook."""
+    df = pd.read_csv(path)
+    return model_inputs(df), np.log1p(df['price'].to_numpy())
+
+
+def predict_batch(df, pipeline=None):
+    """Predicted prices (Cr) for every row of ``df``.
+
+    ``df`` needs the twelve ``FEATURE_COLUMNS``, or ``luxury_score``/``floorNum``
+    in place of their categories; extra columns are ignored.
+    """
+    X = model_inputs(df)
+    if pipeline is None:
+        pipeline = load_model()
+    if len(X) == 0:
+        return np.empty(0)
+    return np.expm1(pipeline.predict(X))
@@ -0,0 +1,29 @@
+"""Similarity blocks and weights of the Recommender page.
+
+The page scores a property as the weighted sum of its facilities, price and
+location similarities; ``FeatureIndex`` serves that blend, with weights
+given by block name or in ``BLOCK_NAMES`` order.
+"""
+from collections.abc import Mapping
+from types import MappingProxyType
+
+# Similarity blocks in blend order: cosine_sim1, cosine_sim2 and cosine_sim3 of the notebook.
+BLOCK_NAMES = ('facilities', 'price', 'location')
+# Weight of each block used by the page.
+DEFAULT_WEIGHTS = MappingProxyType({'facilities': 0.5, 'price': 0.8, 'location': 1.0})
+
+
+def weight_vector(weights, block_names=BLOCK_NAMES):
+    """Weights as a tuple in ``block_names`` order.
+
+    ``weights`` maps block names to weights, or is a sequence already in
+    block order.
+    """
+    if isinstance(weights, Mapping):
+        if set(weights) != set(block_names):
+            raise ValueError(f"Expected weights for {list(block_names)}, got {sorted(weights)}")
+        return tuple(float(weights[name]) for name in block_names)
+    weights = tuple(float(w) for w in weights)
+    if len(weights) != len(block_names):
+        raise ValueError(f"Expected {len(block_names)} weights, got {len(weights)}")
+    return weights
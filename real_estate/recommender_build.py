@@ -0,0 +1,336 @@
+"""Rebuild the recommender artifacts from ``appartments.csv``.
+
+Replaces the manual cells of ``recommender-system.ipynb`` with one
+vectorised pass: the CSV is parsed in chunks (optionally across a process
+pool) with pandas ``.str`` regexes instead of ``iterrows`` +
+``ast.literal_eval``/``json.loads``, then the global fits (TF-IDF,
+standard scaling) run once over the concatenated chunks.
+
+    python -m real_estate.recommender_build "Data Preprocessing/appartments.csv" --workers 4
+
+Writes the ``recommender/*`` feature blocks read by the Recommender page
+(the facilities TF-IDF as CSR, with its vocabulary and idf) into the shared
+artifact store, and for the Location Finder a ``GeoGrid`` over property
+coordinates (``recommender/geo``), the ``places`` it can search around and
+each place's presorted list of nearby properties (``recommender/nearby``).
+A landmark's list holds the distances the listings scraped to it, as the
+old properties x landmarks table did, so every landmark answers exactly.
+A locality's list holds the properties within 20 km on the grid, where a
+property is placed at its locality (``latlong.csv``, else a hit in the
+geocode cache).  Landmarks get coordinates when multilateration from their
+scraped distances fits the placed properties to within 2 km.
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+from real_estate.artifacts import DEFAULT_ROOT, REPO_DIR, ArtifactStore
+from real_estate.facility_similarity import FacilitySimilarity
+from real_estate.features import distance_to_meters, extract_list
+from real_estate.geocode import DEFAULT_CACHE, GeocodeCache, parse_coordinates
+from real_estate.recommender_index import FeatureIndex
+from real_estate.spatial import GeoGrid, NearbyLists, multilaterate
+
+CONFIGS = ['1 BHK', '2 BHK', '3 BHK', '4 BHK', '5 BHK', '6 BHK', '1 RK', 'Land']
+MISSING_DISTANCE = 54000
+LATLONG_CSV = os.path.join(REPO_DIR, 'pages', 'Analysis_datasets', 'latlong.csv')
+LATLONG_CITY = 'gurgaon'
+
+_QUOTED = r"""(?:'([^']*)'|"([^"]*)")"""
+_PAIR = _QUOTED + r'\s*:\s*' + _QUOTED
+_CONFIG = r"'([^']*)':\s*\{([^{}]*)\}"
+_LOCALITY = r'\bin ([^,]+),\s*([^,]+)$'
+
+
+class StageTimer:
+    """Collects wall-clock time per build stage."""
+
+    def __init__(self, verbose=True):
+        self.timings = {}
+        self.verbose = verbose
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        yield
+        elapsed = time.perf_counter() - start
+        self.timings[name] = self.timings.get(name, 0.0) + elapsed
+        if self.verbose:
+            print(f"{name:<22} {elapsed:8.3f}s")
+
+
+def _first_group(frame, a, b):
+    return frame[a].fillna(frame[b])
+
+
+def _unescape(text):
+    # Python-literal escapes such as \u200b, as ast.literal_eval decoded them.
+    return text.encode('latin-1', 'backslashreplace').decode('unicode_escape')
+
+
+def parse_locations(location_advantages):
+    """Long ``(row, landmark, meters)`` table from the LocationAdvantages dicts."""
+    pairs = location_advantages.str.extractall(_PAIR)
+    if pairs.empty:
+        return pd.DataFrame({'row': [], 'landmark': [], 'meters': []})
+    landmark = _first_group(pairs, 0, 1)
+    escaped = landmark.str.contains('\\', regex=False)
+    if escaped.any():
+        landmark[escaped] = landmark[escaped].map(_unescape)
+    long = pd.DataFrame({
+        'row': pairs.index.get_level_values(0),
+        'landmark': landmark.to_numpy(),
+        'meters': distance_to_meters(_first_group(pairs, 2, 3)).to_numpy(),
+    })
+    # A dict literal keeps the last value of a repeated key.
+    return long.drop_duplicates(['row', 'landmark'], keep='last')
+
+
+def _parse_number(text):
+    cleaned = (text.str.replace('₹', '', regex=False)
+                   .str.replace(' Cr', '', regex=False)
+                   .str.replace(' L', '', regex=False)
+                   .str.replace(',', '', regex=False)
+                   .str.replace(' sq.ft.', '', regex=False)
+                   .str.strip())
+    return pd.to_numeric(cleaned, errors='coerce')
+
+
+def parse_price_details(price_details, index):
+    """Wide per-configuration features, as ``refined_parse_modified_v2`` built."""
+    columns = {}
+    configs = price_details.str.extractall(_CONFIG)
+    configs.columns = ['config', 'body']
+    rows = configs.index.get_level_values(0)
+    body = configs['body']
+
+    building = body.str.extract(r"'building_type':\s*'([^']*)'")[0]
+    area = body.str.extract(r"'area':\s*'([^']*)'")[0].fillna('')
+    price = body.str.extract(r"'price-range':\s*'([^']*)'")[0].fillna('')
+
+    area_parts = area.str.split('-', expand=True).reindex(columns=[0, 1, 2])
+    n_area = area.str.count('-') + 1
+    area_low = _parse_number(area_parts[0])
+    area_high = _parse_number(area_parts[1].where(n_area == 2, area_parts[0]))
+    area_ok = (n_area <= 2) & area_low.notna() & area_high.notna()
+
+    price_parts = price.str.split('-', expand=True).reindex(columns=[0, 1, 2])
+    n_price = price.str.count('-') + 1
+    price_low = _parse_number(price_parts[0]) / np.where(price_parts[0].str.contains('L', na=False), 100, 1)
+    price_high = _parse_number(price_parts[1]) / np.where(price_parts[1].str.contains('L', na=False), 100, 1)
+    price_ok = (n_price == 2) & price_low.notna() & price_high.notna()
+
+    parsed = pd.DataFrame({
+        'row': rows,
+        'config': configs['config'].to_numpy(),
+        'building type': building.to_numpy(),
+        'area low': area_low.where(area_ok).to_numpy(),
+        'area high': area_high.where(area_ok).to_numpy(),
+        'price low': price_low.where(price_ok).to_numpy(),
+        'price high': price_high.where(price_ok).to_numpy(),
+    }).drop_duplicates(['row', 'config'], keep='last')
+
+    for config in CONFIGS:
+        part = parsed[parsed['config'] == config].set_index('row').reindex(index)
+        building = part['building type']
+        if config == 'Land':
+            building = building.replace({'': 'Land'})
+        columns[f'building type_{config}'] = building
+        for field in ('area low', 'area high', 'price low', 'price high'):
+            columns[f'{field} {config}'] = part[field]
+    return pd.DataFrame(columns, index=index)
+
+
+def parse_localities(sub_names):
+    """Geocoder queries ``'<locality> <city>'`` from ``'2, 3 BHK Apartment in Sector 113, Gurgaon'``."""
+    parts = sub_names.str.extract(_LOCALITY)
+    locality = parts[0].str.strip().str.lower().str.replace(r'^sector[\s-]*(\d+)[a-z]?$', r'sector \1', regex=True)
+    return locality + ' ' + parts[1].str.strip().str.lower()
+
+
+def parse_chunk(chunk):
+    """Parse one raw CSV chunk into the pieces the global fits need."""
+    # Repeated header rows (row 22 of the original scrape) are dropped.
+    chunk = chunk[chunk['PropertyName'] != 'PropertyName']
+    facilities = extract_list(chunk['TopFacilities']).str.join(' ')
+    return {
+        'names': chunk['PropertyName'].to_numpy(),
+        'localities': parse_localities(chunk['PropertySubName'].fillna('')).to_numpy(),
+        'facilities': facilities.to_numpy(),
+        'locations': parse_locations(chunk['LocationAdvantages'].fillna('')),
+        'prices': parse_price_details(chunk['PriceDetails'].fillna(''), chunk.index),
+    }
+
+
+def _standardize(values):
+    """``StandardScaler().fit_transform`` without the sklearn import."""
+    mean = values.mean(axis=0)
+    scale = values.std(axis=0)
+    scale[scale == 0] = 1.0
+    return (values - mean) / scale
+
+
+def price_features(prices):
+    categorical = [c for c in prices.columns if c.startswith('building type_')]
+    encoded = pd.get_dummies(prices, columns=categorical, drop_first=True, dtype=float)
+    return _standardize(encoded.fillna(0).to_numpy(dtype=np.float64))
+
+
+def location_table(locations, names):
+    """Dense properties x landmarks distance table, missing filled with 54000 m."""
+    landmarks = pd.unique(locations['landmark'])
+    table = np.full((len(names), len(landmarks)), np.nan)
+    table[locations['row'].to_numpy(), pd.Index(landmarks).get_indexer(locations['landmark'])] = locations['meters']
+    location_df = pd.DataFrame(table, index=pd.Index(names, name='PropertyName'), columns=landmarks)
+    return location_df.fillna(MISSING_DISTANCE)
+
+
+def known_localities(path=LATLONG_CSV, city=LATLONG_CITY):
+    """``{'<locality> <city>': (lat, lon)}`` from ``latlong.csv``."""
+    table = pd.read_csv(path).dropna()
+    points = {f'{name.lower()} {city}': parse_coordinates(text)
+              for name, text in zip(table['sector'], table['coordinates'])}
+    return {query: point for query, point in points.items() if point}
+
+
+def property_coordinates(localities, known, cache_path=DEFAULT_CACHE):
+    """Latitude and longitude arrays, NaN where the locality is unknown."""
+    points = [known.get(query) if isinstance(query, str) else None for query in localities]
+    missing = sorted({q for q, p in zip(localities, points) if p is None and isinstance(q, str)})
+    if missing and os.path.exists(cache_path):
+        cache = GeocodeCache(cache_path)
+        try:
+            cached = cache.get_many(missing)
+        finally:
+            cache.close()
+        points = [p or cached.get(q) for q, p in zip(localities, points)]
+    lat = np.array([p[0] if p else np.nan for p in points])
+    lon = np.array([p[1] if p else np.nan for p in points])
+    return lat, lon
+
+
+def locate_landmarks(locations, lat, lon, min_mentions=3, max_error=2000):
+    """Landmarks multilaterated from their distances to properties with coordinates."""
+    rows = locations['row'].to_numpy()
+    known = locations[np.isfinite(lat[rows]) & locations['meters'].notna().to_numpy()]
+    located = []
+    for landmark, group in known.groupby('landmark', sort=False):
+        if len(group) < min_mentions:
+            continue
+        rows = group['row'].to_numpy()
+        point_lat, point_lon, error = multilaterate(lat[rows], lon[rows], group['meters'])
+        if error <= max_error:
+            located.append((landmark, point_lat, point_lon, 'landmark', error))
+    return pd.DataFrame(located, columns=['place', 'lat', 'lon', 'kind', 'error_m'])
+
+
+def places_table(known, locations, located):
+    """Everything the Location Finder can search around, indexed by display name.
+
+    Every scraped landmark is a place; those not ``located`` have NaN coordinates.
+    """
+    localities = pd.DataFrame([(query.rsplit(' ', 1)[0].title(), lat, lon, 'locality', 0.0)
+                               for query, (lat, lon) in known.items()], columns=located.columns)
+    landmarks = (pd.DataFrame({'place': pd.unique(locations['landmark'])})
+                 .merge(located.drop(columns='kind'), on='place', how='left')
+                 .assign(kind='landmark')[located.columns])
+    # A landmark named like a locality keeps its scraped distances.
+    places = pd.concat([localities, landmarks], ignore_index=True).drop_duplicates('place', keep='last')
+    return places.set_index('place')
+
+
+def nearby_lists(places, locations, grid, max_meters=20000):
+    """Landmarks list their scraped distances; localities the properties within ``max_meters``."""
+    scraped = locations[locations['meters'].notna()]
+    place_ids = [places.index.get_indexer(scraped['landmark'])]
+    ids, meters = [scraped['row'].to_numpy()], [scraped['meters'].to_numpy()]
+    for place in np.flatnonzero(places['kind'].to_numpy() == 'locality'):
+        found, distances = grid.radius(places['lat'].iat[place], places['lon'].iat[place], max_meters)
+        place_ids.append(np.full(len(found), place))
+        ids.append(found)
+        meters.append(distances)
+    return NearbyLists.from_pairs(np.concatenate(place_ids), np.concatenate(ids), np.concatenate(meters),
+                                  len(places), max_meters)
+
+
+def read_chunks(path, chunksize):
+    return pd.read_csv(path, chunksize=chunksize)
+
+
+def build(path, root=DEFAULT_ROOT, chunksize=50_000, workers=1, verbose=True, latlong=LATLONG_CSV,
+          city=LATLONG_CITY):
+    """Run every stage and write the artifacts; returns per-stage timings.
+
+    ``latlong`` holds the coordinates of the city's localities.
+    """
+    timer = StageTimer(verbose)
+    with timer.stage('parse'):
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                parts = list(pool.map(parse_chunk, read_chunks(path, chunksize)))
+        else:
+            parts = [parse_chunk(chunk) for chunk in read_chunks(path, chunksize)]
+
+    with timer.stage('concat'):
+        names = np.concatenate([p['names'] for p in parts])
+        localities = np.concatenate([p['localities'] for p in parts])
+        facilities = np.concatenate([p['facilities'] for p in parts])
+        prices = pd.concat([p['prices'] for p in parts])
+        offsets = np.cumsum([0] + [len(p['names']) for p in parts])
+        locations = []
+        for part, offset in zip(parts, offsets):
+            # Chunk rows keep the CSV index; map them to 0..N-1 positions.
+            positions = pd.Index(part['prices'].index).get_indexer(part['locations']['row'])
+            locations.append(part['locations'].assign(row=positions + offset))
+        locations = pd.concat(locations, ignore_index=True)
+
+    with timer.stage('tfidf'):
+        tfidf = FacilitySimilarity.fit(facilities, names)
+
+    with timer.stage('price features'):
+        price = price_features(prices)
+
+    with timer.stage('location features'):
+        location_df = location_table(locations, names)
+        location = _standardize(location_df.to_numpy())
+
+    with timer.stage('coordinates'):
+        known = known_localities(latlong, city)
+        lat, lon = property_coordinates(localities, known)
+        grid = GeoGrid.build(lat, lon)
+        places = places_table(known, locations, locate_landmarks(locations, lat, lon))
+        nearby = nearby_lists(places, locations, grid)
+
+    with timer.stage('write'):
+        store = ArtifactStore(root)
+        FeatureIndex.from_features([tfidf.matrix, price, location], names).save(store)
+        tfidf.save_vectorizer(store)
+        grid.save(store, 'recommender/geo')
+        nearby.save(store, 'recommender/nearby')
+        store.put_table('places', places)
+        store.commit()
+
+    if verbose:
+        print(f"{'total':<22} {sum(timer.timings.values()):8.3f}s  ({len(names)} properties)")
+    return timer.timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the recommender artifacts from appartments.csv")
+    parser.add_argument('input', help="path to appartments.csv")
+    parser.add_argument('--root', default=DEFAULT_ROOT, help="artifact store to write into")
+    parser.add_argument('--chunksize', type=int, default=50_000)
+    parser.add_argument('--workers', type=int, default=1, help="processes used to parse chunks")
+    parser.add_argument('--latlong', default=LATLONG_CSV, help="locality coordinates (sector, coordinates)")
+    parser.add_argument('--city', default=LATLONG_CITY, help="city named in the listings' addresses")
+    args = parser.parse_args()
+    build(args.input, args.root, args.chunksize, args.workers, latlong=args.latlong, city=args.city)
+
+
+if __name__ == '__main__':
+    main()
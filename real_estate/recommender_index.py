@@ -0,0 +1,217 @@
+"""Top-k property search over stored feature matrices.
+
+The dense ``cosine_sim*.pkl`` artifacts grow with N^2.  ``FeatureIndex``
+keeps the three L2-normalised feature matrices the notebook builds them from
+(TF-IDF facilities, scaled PriceDetails, scaled landmark distances) and scores
+a query as the weighted sum of one mat-vec per block, so memory grows
+linearly with the number of listings.  Sparse blocks (the TF-IDF) stay CSR,
+as ``CSRRows``.
+
+Two search modes are available:
+
+- ``exact``: blocked BLAS over all rows, identical ranking to the dense path.
+- ``ivf``: inverted file over a random projection of the weighted features;
+  only the ``n_probe`` closest lists are re-ranked exactly.
+"""
+import json
+
+import numpy as np
+
+from real_estate.csr import CSRRows
+from real_estate.recommender import BLOCK_NAMES, DEFAULT_WEIGHTS, weight_vector
+
+
+def normalize_rows(matrix):
+    """L2-normalise rows as float32; all-zero rows stay zero like sklearn.
+
+    Sparse input comes back as ``CSRRows``.
+    """
+    if _is_sparse(matrix):
+        matrix = CSRRows.from_matrix(matrix)
+        rows = np.repeat(np.arange(matrix.shape[0]), np.diff(matrix.indptr))
+        norms = np.sqrt(np.bincount(rows, weights=matrix.data.astype(np.float64) ** 2, minlength=matrix.shape[0]))
+        norms[norms == 0] = 1.0
+        return CSRRows((matrix.data / norms[rows]).astype(np.float32), matrix.indices, matrix.indptr,
+                       matrix.shape[1])
+    matrix = np.asarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def _is_sparse(block):
+    # CSRRows or any scipy sparse matrix, without importing scipy.
+    return hasattr(block, 'tocsr')
+
+
+def _dot(block, queries, target):
+    """``block[queries] @ target.T`` as a dense array."""
+    if _is_sparse(block):
+        # One sparse mat-vec per query row.
+        return target.dot(block[queries].toarray().T).T
+    return block[queries] @ target.T
+
+
+def _top_k_rows(scores, k):
+    """Row-wise top-k of a 2D score array, ordered by descending score."""
+    k = min(k, scores.shape[1])
+    top = np.argpartition(scores, -k, axis=1)[:, -k:]
+    top_scores = np.take_along_axis(scores, top, axis=1)
+    order = np.argsort(-top_scores, axis=1, kind='stable')
+    return np.take_along_axis(top, order, axis=1), np.take_along_axis(top_scores, order, axis=1)
+
+
+def _kmeans(points, n_clusters, n_iter=20, seed=0):
+    """Plain Lloyd's iterations, enough for a coarse quantiser."""
+    rng = np.random.default_rng(seed)
+    centroids = points[rng.choice(len(points), n_clusters, replace=False)].copy()
+    for _ in range(n_iter):
+        assign = _nearest_centroids(points, centroids, 1)[:, 0]
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, points)
+        counts = np.bincount(assign, minlength=n_clusters)
+        filled = counts > 0
+        centroids[filled] = sums[filled] / counts[filled, None]
+    return centroids
+
+
+def _nearest_centroids(points, centroids, n):
+    # Squared euclidean distance without the constant |x|^2 term.
+    dist = (centroids ** 2).sum(axis=1) - 2 * points @ centroids.T
+    n = min(n, len(centroids))
+    nearest = np.argpartition(dist, n - 1, axis=1)[:, :n]
+    order = np.argsort(np.take_along_axis(dist, nearest, axis=1), axis=1)
+    return np.take_along_axis(nearest, order, axis=1)
+
+
+class FeatureIndex:
+    """Weighted cosine top-k over per-block normalised feature matrices."""
+
+    def __init__(self, blocks, names, block_names=BLOCK_NAMES, block_size=8192):
+        self.blocks = list(blocks)
+        self.names = list(names)
+        self.block_names = tuple(block_names)
+        self.block_size = block_size
+        self.size = len(self.names)
+        if any(block.shape[0] != self.size for block in self.blocks):
+            raise ValueError("Every feature block needs one row per property")
+        self._ivf = None
+
+    @classmethod
+    def from_features(cls, features, names, **kwargs):
+        """Build from raw (unnormalised) feature matrices, dense or sparse."""
+        return cls([normalize_rows(f) for f in features], names, **kwargs)
+
+    @property
+    def nbytes(self):
+        total = sum(block.nbytes for block in self.blocks)
+        if self._ivf is not None:
+            total += sum(arr.nbytes for arr in self._ivf.values())
+        return total
+
+    def scores(self, queries, rows=None, weights=DEFAULT_WEIGHTS):
+        """Weighted cosine scores of ``queries`` against ``rows`` (default: all)."""
+        weights = weight_vector(weights, self.block_names)
+        queries = np.atleast_1d(queries)
+        total = None
+        for block, weight in zip(self.blocks, weights):
+            target = block if rows is None else block[rows]
+            part = _dot(block, queries, target) * np.float32(weight)
+            total = part if total is None else total + part
+        return total
+
+    def search(self, queries, k=10, weights=DEFAULT_WEIGHTS, mode='exact', n_probe=8):
+        """Top-k neighbours for each query row, excluding the query itself.
+
+        Returns ``(indices, scores)`` arrays of shape ``(len(queries), k)``.
+        """
+        queries = np.atleast_1d(np.asarray(queries))
+        if mode == 'exact':
+            return self._search_exact(queries, k, weights)
+        if mode == 'ivf':
+            return self._search_ivf(queries, k, weights, n_probe)
+        raise ValueError(f"Unknown search mode: {mode!r}")
+
+    def top_k(self, index, k=5, weights=DEFAULT_WEIGHTS, mode='exact'):
+        """``(indices, scores)`` of the ``k`` best matches for row ``index``."""
+        indices, scores = self.search([index], k, weights, mode)
+        return indices[0], scores[0]
+
+    def _search_exact(self, queries, k, weights):
+        k = min(k, self.size - 1)
+        best_idx = np.empty((len(queries), 0), dtype=np.intp)
+        best_scores = np.empty((len(queries), 0), dtype=np.float32)
+        # Score one slab of rows at a time so temporaries stay at
+        # len(queries) x block_size regardless of catalogue size.
+        for start in range(0, self.size, self.block_size):
+            stop = min(start + self.block_size, self.size)
+            scores = self.scores(queries, slice(start, stop), weights)
+            own = (queries >= start) & (queries < stop)
+            scores[own, queries[own] - start] = -np.inf
+            idx, top = _top_k_rows(scores, k)
+            best_idx = np.concatenate([best_idx, idx + start], axis=1)
+            best_scores = np.concatenate([best_scores, top], axis=1)
+            if best_idx.shape[1] > k:
+                keep, best_scores = _top_k_rows(best_scores, k)
+                best_idx = np.take_along_axis(best_idx, keep, axis=1)
+        return best_idx, best_scores
+
+    def build_ivf(self, n_lists=None, proj_dim=64, weights=DEFAULT_WEIGHTS, seed=0):
+        """Train the coarse quantiser used by ``mode='ivf'``."""
+        weights = weight_vector(weights, self.block_names)
+        n_lists = n_lists or max(1, int(np.sqrt(self.size)))
+        rng = np.random.default_rng(seed)
+        projected = np.zeros((self.size, proj_dim), dtype=np.float32)
+        for block, weight in zip(self.blocks, weights):
+            # Gaussian random projection keeps inner products in expectation.
+            proj = rng.standard_normal((block.shape[1], proj_dim)).astype(np.float32)
+            projected += np.sqrt(weight) * (block @ proj) / np.sqrt(proj_dim)
+
+        centroids = _kmeans(projected, min(n_lists, self.size), seed=seed)
+        assign = _nearest_centroids(projected, centroids, 1)[:, 0]
+        order = np.argsort(assign, kind='stable')
+        offsets = np.searchsorted(assign[order], np.arange(len(centroids) + 1))
+        self._ivf = {
+            'projected': projected,
+            'centroids': centroids,
+            'members': order.astype(np.int32),
+            'offsets': offsets.astype(np.int64),
+        }
+        return self
+
+    def _search_ivf(self, queries, k, weights, n_probe):
+        if self._ivf is None:
+            self.build_ivf()
+        ivf = self._ivf
+        probes = _nearest_centroids(ivf['projected'][queries], ivf['centroids'], n_probe)
+        k = min(k, self.size - 1)
+        out_idx = np.full((len(queries), k), -1, dtype=np.intp)
+        out_scores = np.full((len(queries), k), -np.inf, dtype=np.float32)
+        for row, (query, lists) in enumerate(zip(queries, probes)):
+            candidates = np.concatenate(
+                [ivf['members'][ivf['offsets'][l]:ivf['offsets'][l + 1]] for l in lists])
+            candidates = candidates[candidates != query]
+            if len(candidates) == 0:
+                continue
+            scores = self.scores([query], candidates, weights)
+            idx, top = _top_k_rows(scores, k)
+            out_idx[row, :idx.shape[1]] = candidates[idx[0]]
+            out_scores[row, :idx.shape[1]] = top[0]
+        return out_idx, out_scores
+
+    def save(self, store, prefix='recommender'):
+        """Write one array per block into an ``ArtifactStore`` (commit separately)."""
+        for name, block in zip(self.block_names, self.blocks):
+            if _is_sparse(block):
+                store.put_sparse(f'{prefix}/{name}', block)
+            else:
+                store.put_array(f'{prefix}/{name}', block)
+        store.put_text(f'{prefix}/names', json.dumps(self.names))
+
+    @classmethod
+    def load(cls, store, prefix='recommender', block_names=BLOCK_NAMES):
+        """Load from an ``ArtifactStore``; blocks are memory-mapped."""
+        blocks = [store.sparse(f'{prefix}/{name}') if store.entries[f'{prefix}/{name}']['kind'] == 'sparse'
+                  else store.array(f'{prefix}/{name}') for name in block_names]
+        names = json.loads(store.text(f'{prefix}/names'))
+        return cls(blocks, names, block_names=block_names)
@@ -0,0 +1,246 @@
+"""Standalone HTTP inference service for the price pipeline.
+
+    python -m real_estate.service --port 8080 --max-batch 256 --max-wait-ms 5
+
+Endpoints:
+
+- ``POST /predict``: one listing as a JSON object with the twelve
+  ``FEATURE_COLUMNS`` (``servant_room``/``store_room`` are accepted as
+  aliases, ``luxury_score``/``floorNum`` in place of their categories), or
+  ``{"instances": [...]}`` for several.  Returns prices in Cr, or 422 for
+  a request that cannot be scored: a missing, non-numeric or non-finite
+  feature, or a category the model has not seen.
+- ``GET /health``: liveness plus the sha256 of the loaded model.
+- ``GET /metrics``: request/batch counters and latency percentiles.
+
+Concurrent requests are coalesced by ``MicroBatcher``: the first request
+opens a window of ``max_wait_ms`` and everything that arrives before it
+closes (up to ``max_batch`` rows) is scored with a single vectorised
+``pipeline.predict`` call in a worker thread.
+"""
+import argparse
+import asyncio
+import math
+import time
+from collections import deque
+
+import numpy as np
+
+from real_estate import features
+from real_estate.price_model import (CATEGORICAL_COLUMNS, DERIVED_FEATURES, FEATURE_COLUMNS, category_string,
+                                     predict_batch, to_frame)
+
+ALIASES = {'servant_room': 'servant room', 'store_room': 'store room'}
+NUMERIC_COLUMNS = [c for c in FEATURE_COLUMNS if c not in CATEGORICAL_COLUMNS]
+
+
+class ServiceMetrics:
+    """Counters and a sliding window of request latencies."""
+
+    def __init__(self, window=10_000):
+        self.requests = 0
+        self.errors = 0
+        self.rows = 0
+        self.batches = 0
+        self.latencies = deque(maxlen=window)
+        self.started = time.time()
+
+    def snapshot(self):
+        latencies = np.fromiter(self.latencies, dtype=float)
+        percentiles = {}
+        if len(latencies):
+            for p in (50, 90, 99):
+                percentiles[f'p{p}_ms'] = float(np.percentile(latencies, p) * 1e3)
+        return {
+            'uptime_seconds': time.time() - self.started,
+            'requests': self.requests,
+            'errors': self.errors,
+            'rows': self.rows,
+            'batches': self.batches,
+            'mean_batch_rows': self.rows / self.batches if self.batches else 0.0,
+            **percentiles,
+        }
+
+
+class MicroBatcher:
+    """Coalesces concurrent single-row predictions into batched calls."""
+
+    def __init__(self, predict_fn, max_batch=256, max_wait_ms=5.0, metrics=None):
+        self.predict_fn = predict_fn
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.metrics = metrics or ServiceMetrics()
+        self._queue = asyncio.Queue()
+        self._worker = None
+
+    def start(self):
+        if self._worker is None:
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+    async def predict(self, row):
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((row, future))
+        return await future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            rows = [row for row, _ in batch]
+            results = await loop.run_in_executor(None, self._score, rows)
+            self.metrics.batches += 1
+            self.metrics.rows += len(rows)
+            for (_, future), result in zip(batch, results):
+                if future.done():
+                    continue
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+
+    def _score(self, rows):
+        try:
+            return [float(p) for p in self.predict_fn(to_frame(rows))]
+        except Exception:
+            # One bad row (e.g. an unseen sector) must not fail its neighbours:
+            # fall back to scoring the batch row by row.
+            results = []
+            for row in rows:
+                try:
+                    results.append(float(self.predict_fn(to_frame([row]))[0]))
+                except Exception as e:
+                    results.append(e)
+            return results
+
+
+def parse_instance(payload):
+    """Validate one JSON object into a row in ``FEATURE_COLUMNS`` order."""
+    if not isinstance(payload, dict):
+        raise ValueError("Each instance must be a JSON object")
+    payload = {ALIASES.get(key, key): value for key, value in payload.items()}
+    for column, (source, derive) in DERIVED_FEATURES.items():
+        if column not in payload and source in payload:
+            payload[column] = derive([payload[source]]).iloc[0]
+    if 'furnishing_type' in payload and not isinstance(payload['furnishing_type'], str):
+        payload['furnishing_type'] = features.furnishing_labels([payload['furnishing_type']]).iloc[0]
+    missing = [c for c in FEATURE_COLUMNS if c not in payload]
+    if missing:
+        raise ValueError(f"Missing features: {missing}")
+    for column in NUMERIC_COLUMNS:
+        try:
+            payload[column] = float(payload[column])
+        except (TypeError, ValueError):
+            raise ValueError(f"{column!r} must be a number, got {payload[column]!r}") from None
+        if not math.isfinite(payload[column]):
+            raise ValueError(f"{column!r} must be finite, got {payload[column]!r}")
+    # {"bedRoom": 3, "balcony": 3} scores like {"balcony": "3"}.
+    for column in CATEGORICAL_COLUMNS:
+        payload[column] = category_string(payload[column])
+    return [payload[c] for c in FEATURE_COLUMNS]
+
+
+def parse_request(payload):
+    """``(rows, single)`` from a ``/predict`` body: one instance or ``{"instances": [...]}``."""
+    if isinstance(payload, dict) and 'instances' in payload:
+        instances = payload['instances']
+        if not isinstance(instances, list) or not instances:
+            raise ValueError('"instances" must be a non-empty list of JSON objects')
+        return [parse_instance(instance) for instance in instances], False
+    return [parse_instance(payload)], True
+
+
+def create_app(predict_fn=None, model_sha=None, max_batch=256, max_wait_ms=5.0):
+    """Build the Starlette app; ``predict_fn`` defaults to the registry model."""
+    from contextlib import asynccontextmanager
+
+    from starlette.applications import Starlette
+    from starlette.responses import JSONResponse
+    from starlette.routing import Route
+
+    if predict_fn is None:
+        from real_estate.fastpath import compile_or_fallback
+        from real_estate.model_registry import PRICE_PIPELINE, registry
+
+        pipeline = compile_or_fallback(registry.load(PRICE_PIPELINE))
+        model_sha = registry.metrics(PRICE_PIPELINE).sha256
+
+        def predict_fn(frame):
+            return predict_batch(frame, pipeline)
+
+    metrics = ServiceMetrics()
+    batcher = MicroBatcher(predict_fn, max_batch, max_wait_ms, metrics)
+
+    async def predict(request):
+        start = time.perf_counter()
+        metrics.requests += 1
+        try:
+            rows, single = parse_request(await request.json())
+        except ValueError as e:
+            metrics.errors += 1
+            return JSONResponse({'error': str(e)}, status_code=422)
+        try:
+            prices = await asyncio.gather(*(batcher.predict(row) for row in rows))
+        except Exception as e:
+            # Valid JSON the model cannot score, such as an unseen sector
+            metrics.errors += 1
+            return JSONResponse({'error': str(e)}, status_code=422)
+        finally:
+            metrics.latencies.append(time.perf_counter() - start)
+        return JSONResponse({'price': prices[0]} if single else {'prices': prices})
+
+    async def health(request):
+        return JSONResponse({'status': 'ok', 'model_sha256': model_sha})
+
+    async def metrics_endpoint(request):
+        return JSONResponse(metrics.snapshot())
+
+    @asynccontextmanager
+    async def lifespan(app):
+        batcher.start()
+        yield
+        await batcher.stop()
+
+    return Starlette(
+        routes=[
+            Route('/predict', predict, methods=['POST']),
+            Route('/health', health),
+            Route('/metrics', metrics_endpoint),
+        ],
+        lifespan=lifespan,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the price pipeline over HTTP")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--max-batch', type=int, default=256)
+    parser.add_argument('--max-wait-ms', type=float, default=5.0)
+    args = parser.parse_args()
+
+    import uvicorn
+
+    app = create_app(max_batch=args.max_batch, max_wait_ms=args.max_wait_ms)
+    uvicorn.run(app, host=args.host, port=args.port, log_level='warning')
+
+
+if __name__ == '__main__':
+    main()
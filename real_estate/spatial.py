@@ -0,0 +1,250 @@
+"""Radius and nearest-neighbour search over property coordinates.
+
+The Location Finder used to filter a properties x landmarks table of scraped
+distances (missing pairs filled with 54000 m), which only answers queries
+around landmarks some listing mentioned and grows a column per landmark.
+``GeoGrid`` indexes the coordinates themselves: points are bucketed into
+equal-angle cells (a geohash-like grid) and stored sorted by cell, so the
+points of one row of cells are a contiguous slice of the coordinate arrays
+found with ``np.searchsorted``.  A radius query reads only the cells
+overlapping the circle's bounding box and measures great-circle distances
+there; a k-nearest query grows the radius until it holds ``k`` points.
+
+The places the Location Finder searches around are fixed when the artifacts
+are built, so ``NearbyLists`` keeps, for each of them, its nearby properties
+presorted by distance: a search is then one ``np.searchsorted`` on that
+place's distances and a slice.  The lists come either from the grid (every
+property within the slider's 20 km) or from given pairs, such as the
+distances the listings scraped for their landmarks.
+
+``multilaterate`` places a landmark from its scraped distances to properties
+whose coordinates are known.
+"""
+import json
+
+import numpy as np
+
+EARTH_RADIUS_M = 6371008.8
+METERS_PER_DEGREE = np.pi * EARTH_RADIUS_M / 180
+
+
+def haversine(lat1, lon1, lat2, lon2):
+    """Great-circle distance in meters between points given in degrees."""
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(v, dtype=np.float64)) for v in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+class GeoGrid:
+    """Points bucketed into ``cell_deg`` x ``cell_deg`` cells, sorted by cell.
+
+    ``lat``, ``lon``, ``order`` (point ids) and ``keys`` (cell keys) are
+    aligned in cell order; ``position`` maps a point id back to it, -1 for
+    points without coordinates.
+    """
+
+    _ARRAYS = ('lat', 'lon', 'order', 'keys', 'position')
+
+    def __init__(self, lat, lon, order, keys, position, cell_deg):
+        self.lat = lat
+        self.lon = lon
+        self.order = order
+        self.keys = keys
+        self.position = position
+        self.cell_deg = float(cell_deg)
+        self.n_rows = int(np.ceil(180 / self.cell_deg)) + 1
+        self.n_cols = int(np.ceil(360 / self.cell_deg))
+
+    @classmethod
+    def build(cls, lat, lon, cell_km=1.0):
+        """Index points ``0..N-1``; points with missing coordinates are left out."""
+        lat = np.asarray(lat, dtype=np.float64)
+        lon = np.asarray(lon, dtype=np.float64)
+        ids = np.flatnonzero(np.isfinite(lat) & np.isfinite(lon)).astype(np.int32)
+        grid = cls(lat[ids], lon[ids], ids, None, None, cell_km * 1000 / METERS_PER_DEGREE)
+        keys = grid._keys(grid.lat, grid.lon)
+        order = np.argsort(keys, kind='stable')
+        grid.lat, grid.lon, grid.order, grid.keys = grid.lat[order], grid.lon[order], ids[order], keys[order]
+        grid.position = np.full(len(lat), -1, dtype=np.int32)
+        grid.position[grid.order] = np.arange(len(ids), dtype=np.int32)
+        return grid
+
+    @property
+    def size(self):
+        """Number of indexed points."""
+        return len(self.order)
+
+    @property
+    def nbytes(self):
+        return sum(getattr(self, name).nbytes for name in self._ARRAYS)
+
+    def _keys(self, lat, lon):
+        rows = np.floor((lat + 90) / self.cell_deg).astype(np.int64)
+        cols = np.floor((lon + 180) / self.cell_deg).astype(np.int64) % self.n_cols
+        return rows * self.n_cols + cols
+
+    def _slices(self, lat, lon, meters):
+        """``(start, stop)`` of every run of cells overlapping the circle's bounding box."""
+        dlat = meters / METERS_PER_DEGREE
+        row_lo = max(int(np.floor((lat - dlat + 90) / self.cell_deg)), 0)
+        row_hi = min(int(np.floor((lat + dlat + 90) / self.cell_deg)), self.n_rows - 1)
+        widest = max(abs(lat - dlat), abs(lat + dlat))
+        if widest >= 90 or dlat / np.cos(np.radians(widest)) >= 180:
+            spans = [(0, self.n_cols - 1)]
+        else:
+            dlon = dlat / np.cos(np.radians(widest))
+            col_lo = int(np.floor((lon - dlon + 180) / self.cell_deg))
+            col_hi = int(np.floor((lon + dlon + 180) / self.cell_deg))
+            if col_hi - col_lo + 1 >= self.n_cols:
+                spans = [(0, self.n_cols - 1)]
+            else:
+                # Split the span where it wraps around the antimeridian.
+                col_lo, col_hi = col_lo % self.n_cols, col_hi % self.n_cols
+                spans = [(col_lo, col_hi)] if col_lo <= col_hi else [(0, col_hi), (col_lo, self.n_cols - 1)]
+        rows = np.arange(row_lo, row_hi + 1, dtype=np.int64) * self.n_cols
+        slices = []
+        for col_lo, col_hi in spans:
+            starts = np.searchsorted(self.keys, rows + col_lo, side='left')
+            stops = np.searchsorted(self.keys, rows + col_hi, side='right')
+            slices += [(a, b) for a, b in zip(starts, stops) if b > a]
+        return slices
+
+    def distance(self, lat, lon, ids):
+        """Meters from ``(lat, lon)`` to points ``ids``; NaN where a point has no coordinates."""
+        position = self.position[np.asarray(ids)]
+        distances = haversine(lat, lon, self.lat[position], self.lon[position])
+        return np.where(position >= 0, distances, np.nan)
+
+    def radius(self, lat, lon, meters):
+        """``(ids, meters)`` of points closer than ``meters``, nearest first."""
+        ids, distances = [np.empty(0, np.int32)], [np.empty(0)]
+        for a, b in self._slices(lat, lon, meters):
+            found = haversine(lat, lon, self.lat[a:b], self.lon[a:b])
+            inside = found < meters
+            ids.append(self.order[a:b][inside])
+            distances.append(found[inside])
+        ids, distances = np.concatenate(ids), np.concatenate(distances)
+        order = np.lexsort((ids, distances))
+        return ids[order], distances[order]
+
+    def nearest(self, lat, lon, k=10):
+        """``(ids, meters)`` of the ``k`` nearest points, nearest first."""
+        k = min(k, self.size)
+        meters = self.cell_deg * METERS_PER_DEGREE
+        while True:
+            ids, distances = self.radius(lat, lon, meters)
+            # Every point outside the radius is farther than all ``k`` found.
+            if len(ids) >= k or meters > np.pi * EARTH_RADIUS_M:
+                return ids[:k], distances[:k]
+            meters *= 2
+
+    def save(self, store, prefix='geo'):
+        """Write the arrays into an ``ArtifactStore`` (commit separately)."""
+        for name in self._ARRAYS:
+            store.put_array(f'{prefix}/{name}', getattr(self, name))
+        store.put_text(f'{prefix}/meta', json.dumps({'cell_deg': self.cell_deg}))
+
+    @classmethod
+    def load(cls, store, prefix='geo'):
+        """Load from an ``ArtifactStore``; arrays are memory-mapped."""
+        meta = json.loads(store.text(f'{prefix}/meta'))
+        arrays = [store.array(f'{prefix}/{name}') for name in cls._ARRAYS]
+        return cls(*arrays, meta['cell_deg'])
+
+
+class NearbyLists:
+    """Per place, ``(meters, ids)`` of its nearby properties, nearest first.
+
+    Every list holds at least the properties within ``max_meters``.  The
+    lists of all places are concatenated (float32 ``meters``, int32
+    ``ids``); place ``p`` owns ``offsets[p]:offsets[p + 1]``.
+    """
+
+    _ARRAYS = ('offsets', 'meters', 'ids')
+
+    def __init__(self, offsets, meters, ids, max_meters):
+        self.offsets = offsets
+        self.meters = meters
+        self.ids = ids
+        self.max_meters = float(max_meters)
+
+    @classmethod
+    def build(cls, grid, lat, lon, max_meters=20000):
+        """Lists around the points ``(lat[p], lon[p])`` from a ``GeoGrid`` of the properties."""
+        found = [grid.radius(point_lat, point_lon, max_meters) for point_lat, point_lon in zip(lat, lon)]
+        places = np.repeat(np.arange(len(found)), [len(ids) for ids, _ in found])
+        ids = np.concatenate([np.empty(0, np.int32)] + [ids for ids, _ in found])
+        meters = np.concatenate([np.empty(0)] + [meters for _, meters in found])
+        return cls.from_pairs(places, ids, meters, len(found), max_meters)
+
+    @classmethod
+    def from_pairs(cls, places, ids, meters, n_places, max_meters=20000):
+        """Lists from ``(places[i], ids[i], meters[i])`` pairs, ties in id order."""
+        places, ids, meters = np.asarray(places, dtype=np.int64), np.asarray(ids), np.asarray(meters)
+        order = np.lexsort((ids, meters, places))
+        offsets = np.zeros(n_places + 1, dtype=np.int64)
+        np.cumsum(np.bincount(places, minlength=n_places), out=offsets[1:])
+        return cls(offsets, meters[order].astype(np.float32), ids[order].astype(np.int32), max_meters)
+
+    @property
+    def size(self):
+        """Number of places."""
+        return len(self.offsets) - 1
+
+    @property
+    def nbytes(self):
+        return sum(getattr(self, name).nbytes for name in self._ARRAYS)
+
+    def within(self, place, meters):
+        """``(ids, meters)`` of properties closer than ``meters`` to place ``place``, nearest first."""
+        if meters > self.max_meters:
+            raise ValueError(f"lists only reach {self.max_meters:.0f} m, asked for {meters} m")
+        start, stop = self.offsets[place], self.offsets[place + 1]
+        # Compared in float32: a float64 key would make searchsorted cast the whole list.
+        stop = start + np.searchsorted(self.meters[start:stop], np.float32(meters), side='left')
+        return self.ids[start:stop], self.meters[start:stop]
+
+    def distance(self, place, ids):
+        """Meters from place ``place`` to properties ``ids``; NaN for those not in its list."""
+        start, stop = self.offsets[place], self.offsets[place + 1]
+        listed, ids = self.ids[start:stop], np.asarray(ids)
+        meters = np.full(len(ids), np.nan)
+        if len(listed):
+            order = np.argsort(listed)
+            at = order[np.minimum(np.searchsorted(listed, ids, sorter=order), len(listed) - 1)]
+            hit = listed[at] == ids
+            meters[hit] = self.meters[start:stop][at[hit]]
+        return meters
+
+    def save(self, store, prefix='nearby'):
+        """Write the arrays into an ``ArtifactStore`` (commit separately)."""
+        for name in self._ARRAYS:
+            store.put_array(f'{prefix}/{name}', getattr(self, name))
+        store.put_text(f'{prefix}/meta', json.dumps({'max_meters': self.max_meters}))
+
+    @classmethod
+    def load(cls, store, prefix='nearby'):
+        """Load from an ``ArtifactStore``; arrays are memory-mapped."""
+        meta = json.loads(store.text(f'{prefix}/meta'))
+        arrays = [store.array(f'{prefix}/{name}') for name in cls._ARRAYS]
+        return cls(*arrays, meta['max_meters'])
+
+
+def multilaterate(lat, lon, meters):
+    """Point whose distances to ``(lat, lon)`` best match ``meters``.
+
+    Robust least squares on a local equirectangular projection, started from
+    the inverse-distance weighted centroid.  Returns ``(lat, lon, error)``
+    with ``error`` the median absolute distance residual in meters.
+    """
+    from scipy.optimize import least_squares
+
+    lat, lon, meters = (np.asarray(v, dtype=np.float64) for v in (lat, lon, meters))
+    scale = np.cos(np.radians(lat.mean()))
+    x, y = lon * scale * METERS_PER_DEGREE, lat * METERS_PER_DEGREE
+    weights = 1 / (meters + 500)
+    start = [np.average(x, weights=weights), np.average(y, weights=weights)]
+    fit = least_squares(lambda p: np.hypot(p[0] - x, p[1] - y) - meters, start, loss='soft_l1', f_scale=500)
+    px, py = fit.x
+    error = float(np.median(np.abs(np.hypot(px - x, py - y) - meters)))
+    return py / METERS_PER_DEGREE, px / (scale * METERS_PER_DEGREE), error
@@ -0,0 +1,113 @@
+"""Word frequencies and a disk cache of rendered word-cloud images.
+
+``Analysis_App.py`` used to run ``WordCloud(...).generate(feature_text)``
+on the ~770 KB facilities text and draw the result through matplotlib on
+every rerun.  The tokenising/counting half of ``generate`` is done once at
+artifact build time (``word_frequencies``, stored as the
+``feature_word_counts`` table), and the layout half renders straight to a
+PNG that is cached under ``cache_dir/<key>.png``, where the key hashes the
+source text's sha256, the image size, the colormap and the background.
+
+The page's image is pre-rendered by ``python -m real_estate.artifacts
+--prerender`` or on its own (e.g. when building a container image)::
+
+    python -m real_estate.wordcloud_cache
+"""
+import argparse
+import hashlib
+import io
+import os
+import threading
+import time
+
+import pandas as pd
+
+from real_estate.artifacts import REPO_DIR, ArtifactStore, _create_temp
+
+DEFAULT_CACHE_DIR = os.environ.get('REAL_ESTATE_RENDER_CACHE', os.path.join(REPO_DIR, '.render_cache'))
+STOPWORDS = frozenset(['s'])
+RANDOM_STATE = 42
+
+# What the dashboard shows
+PAGE_OPTIONS = {'width': 400, 'height': 400, 'colormap': 'Blues', 'background_color': 'white'}
+
+
+def word_frequencies(text, stopwords=STOPWORDS):
+    """``word``/``count`` table with WordCloud's own tokenising and collocations."""
+    from wordcloud import WordCloud
+
+    counts = WordCloud(stopwords=set(stopwords)).process_text(text)
+    table = pd.DataFrame(list(counts.items()), columns=['word', 'count'])
+    return table.sort_values('count', ascending=False, ignore_index=True)
+
+
+def render_png(frequencies, width=400, height=400, colormap='Blues', background_color='white'):
+    """PNG bytes of a word cloud laid out from a ``word_frequencies`` table."""
+    from wordcloud import WordCloud
+
+    cloud = WordCloud(width=width, height=height, background_color=background_color,
+                      colormap=colormap, random_state=RANDOM_STATE)
+    cloud.generate_from_frequencies(dict(zip(frequencies['word'], frequencies['count'])))
+    buffer = io.BytesIO()
+    cloud.to_image().save(buffer, format='PNG', optimize=True)
+    return buffer.getvalue()
+
+
+def render_key(text_sha, width, height, colormap, background_color):
+    raw = f"{text_sha}|{width}x{height}|{colormap}|{background_color}"
+    return hashlib.sha256(raw.encode()).hexdigest()[:32]
+
+
+class WordCloudCache:
+    """Rendered PNGs on disk, rendered at most once per key and process."""
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR):
+        self.cache_dir = cache_dir
+        self.hits = self.renders = 0
+        self._lock = threading.Lock()
+
+    def path(self, key):
+        return os.path.join(self.cache_dir, f'{key}.png')
+
+    def get_or_render(self, text_sha, frequencies, width=400, height=400, colormap='Blues',
+                      background_color='white'):
+        """PNG bytes, read from disk or rendered and stored atomically."""
+        key = render_key(text_sha, width, height, colormap, background_color)
+        path = self.path(key)
+        with self._lock:
+            if os.path.exists(path):
+                self.hits += 1
+                with open(path, 'rb') as f:
+                    return f.read()
+            png = render_png(frequencies, width, height, colormap, background_color)
+            os.makedirs(self.cache_dir, exist_ok=True)
+            f, tmp = _create_temp(self.cache_dir, '.part')
+            with f:
+                f.write(png)
+            os.replace(tmp, path)
+            self.renders += 1
+            return png
+
+
+def page_image(store=None, cache=None):
+    """PNG bytes of the dashboard's word cloud."""
+    store = store or ArtifactStore()
+    cache = cache or WordCloudCache()
+    return cache.get_or_render(store.entries['feature_text']['sha256'],
+                               store.table('feature_word_counts'), **PAGE_OPTIONS)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-render the dashboard word cloud into the render cache")
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR)
+    args = parser.parse_args()
+
+    cache = WordCloudCache(args.cache_dir)
+    start = time.perf_counter()
+    png = page_image(cache=cache)
+    state = 'cached' if cache.hits else 'rendered'
+    print(f"{state} {len(png) / 1e3:.1f} KB in {(time.perf_counter() - start) * 1e3:.0f} ms -> {args.cache_dir}")
+
+
+if __name__ == '__main__':
+    main()
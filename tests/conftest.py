@@ -0,0 +1,25 @@
+import pytest
+
+from real_estate.model_selection import ORDINAL_COLUMNS, build_preprocessor
+from real_estate.price_model import load_training_data
+
+
+@pytest.fixture(scope='session')
+def training_data():
+    """``(X, log1p(price))`` of ``flats_post_selection2.csv``."""
+    return load_training_data()
+
+
+@pytest.fixture(scope='session')
+def fit_pipeline(training_data):
+    """Fit the deployed pipeline's preprocessing (one-hot variant) with a given regressor."""
+    from sklearn.pipeline import Pipeline
+
+    X, y = training_data
+    categories = {c: sorted(X[c].unique().tolist()) for c in ORDINAL_COLUMNS}
+
+    def fit(regressor):
+        pipeline = Pipeline([('preprocessor', build_preprocessor('onehot', categories)), ('regressor', regressor)])
+        return pipeline.fit(X, y)
+
+    return fit
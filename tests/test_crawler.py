@@ -0,0 +1,85 @@
+"""Crawler sessions and resume against the benchmark's fixture site."""
+import asyncio
+import os
+
+import pandas as pd
+import pytest
+
+from benchmarks.bench_crawler import CITY, expected_rows, session, start_fixture
+from real_estate.crawler.crawl import crawl, search_urls
+from real_estate.crawler.frontier import SEARCH
+from real_estate.crawler.shards import merge_shards
+
+SEARCH_PAGES = 4
+PER_PAGE = 10
+OPTIONS = dict(rate=0, backoff=0.01, retries=6)
+
+
+async def crawl_in_sessions(state_dir):
+    """A run capped by ``max_pages``, one cancelled mid-flight and one resuming to the end."""
+    runner, base_url = await start_fixture(PER_PAGE, 0.02, error_rate=0.05, blocked=0)
+    pages = range(1, SEARCH_PAGES + 1)
+    total_pages = len(pages) + len(expected_rows(pages, PER_PAGE))
+    counts = {}
+    try:
+        frontier, shards = session(state_dir, 5)
+        frontier.add(search_urls(base_url, CITY, pages), SEARCH)
+        counts['capped'] = (await crawl(frontier, shards, OPTIONS, concurrency=4, max_pages=total_pages // 3)).pages
+        frontier.close()
+
+        frontier, shards = session(state_dir, 5)
+        task = asyncio.ensure_future(crawl(frontier, shards, OPTIONS, concurrency=4))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        counts['cancelled'] = frontier.counts()
+        frontier.close()
+
+        frontier, shards = session(state_dir, 5)
+        await crawl(frontier, shards, OPTIONS, concurrency=4)
+        counts['resumed'] = frontier.counts()
+        frontier.close()
+    finally:
+        await runner.cleanup()
+    return total_pages, counts
+
+
+@pytest.fixture(scope='module')
+def crawled(tmp_path_factory):
+    state_dir = str(tmp_path_factory.mktemp('crawl'))
+    total_pages, counts = asyncio.run(crawl_in_sessions(state_dir))
+    return state_dir, total_pages, counts
+
+
+def test_sessions_stop_and_resume(crawled):
+    _, total_pages, counts = crawled
+
+    assert counts['capped'] == total_pages // 3
+    assert counts['cancelled'].get(('detail', 'pending'), 0) > 0
+    assert {state for _, state in counts['resumed']} == {'done'}
+    assert sum(counts['resumed'].values()) == total_pages
+
+
+def test_merge_holds_every_listing_once(crawled):
+    state_dir, _, _ = crawled
+    expected = expected_rows(range(1, SEARCH_PAGES + 1), PER_PAGE)
+
+    # A shard written but never committed (crash before the checkpoint) is discarded.
+    stray = os.path.join(state_dir, 'shards', 'part-999999.parquet')
+    open(stray, 'w').close()
+    frontier, shards = session(state_dir, 5)
+    assert not os.path.exists(stray)
+    out, csv = os.path.join(state_dir, 'flats.parquet'), os.path.join(state_dir, 'flats.csv')
+    rows = merge_shards(shards.paths(), out, csv)
+    frontier.close()
+
+    merged = pd.read_parquet(out)
+    assert rows == len(merged) == len(expected)
+    assert sorted(merged['property_id']) == sorted(expected)
+    for row in merged.itertuples():
+        item = expected[row.property_id]
+        assert (row.price, row.society, row.area) == (item['price'], item['society'], item['area'])
+        assert list(row.features) == item['features']
+        assert list(row.nearbyLocations) == item['nearbyLocations']
+    assert len(pd.read_csv(csv)) == rows
@@ -0,0 +1,88 @@
+"""``FastPredictor`` against ``pipeline.predict`` on the training CSV."""
+import os
+import pickle
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from real_estate.fastpath import COMPILED_FORMAT, FastPredictor, compile_pipeline, load_compiled
+from real_estate.model_registry import LocalFileFetcher, ModelRegistry
+from real_estate.price_model import CATEGORICAL_COLUMNS, FEATURE_COLUMNS
+
+ATOL = 1e-9
+NUMERIC = [c for c in FEATURE_COLUMNS if c not in CATEGORICAL_COLUMNS]
+
+
+def regressors():
+    from sklearn.ensemble import ExtraTreesRegressor, GradientBoostingRegressor, RandomForestRegressor
+    from sklearn.linear_model import Ridge
+    from sklearn.tree import DecisionTreeRegressor
+
+    return {
+        'random forest': RandomForestRegressor(n_estimators=20, random_state=0),
+        'extra trees': ExtraTreesRegressor(n_estimators=20, random_state=0),
+        'gradient boosting': GradientBoostingRegressor(n_estimators=50, random_state=0),
+        'decision tree': DecisionTreeRegressor(random_state=0),
+        'ridge': Ridge(),
+    }
+
+
+@pytest.fixture(scope='module', params=list(regressors()))
+def pipeline(request, fit_pipeline):
+    return fit_pipeline(regressors()[request.param])
+
+
+def with_missing(X, rows=100):
+    """The first ``rows`` rows of ``X`` once per numeric feature, with that feature NaN."""
+    return pd.concat([X.iloc[:rows].assign(**{c: np.nan}) for c in NUMERIC], ignore_index=True)
+
+
+def test_parity_on_training_csv(pipeline, training_data):
+    X, _ = training_data
+    fast = compile_pipeline(pipeline)
+    expected = pipeline.predict(X)
+    assert np.max(np.abs(fast.predict(X) - expected)) <= ATOL
+    rows = X[fast.input_columns].values.tolist()
+    assert np.max(np.abs(fast.predict(rows[:50]) - expected[:50])) <= ATOL
+
+
+def test_parity_on_missing_values(pipeline, training_data):
+    X = with_missing(training_data[0])
+    fast = compile_pipeline(pipeline)
+    try:
+        expected = pipeline.predict(X)
+    except ValueError:
+        with pytest.raises(ValueError):
+            fast.predict(X)
+        return
+    assert np.max(np.abs(fast.predict(X) - expected)) <= ATOL
+
+
+def test_save_load_round_trip(pipeline, training_data, tmp_path):
+    X, _ = training_data
+    fast = compile_pipeline(pipeline)
+    fast.save(tmp_path / 'fast.npz')
+    loaded = FastPredictor.load(tmp_path / 'fast.npz')
+    assert np.array_equal(loaded.predict(X.iloc[:200]), fast.predict(X.iloc[:200]))
+
+
+def test_load_compiled_keys_cache_by_format(fit_pipeline, training_data, tmp_path):
+    from sklearn.tree import DecisionTreeRegressor
+
+    X, _ = training_data
+    pipeline = fit_pipeline(DecisionTreeRegressor(random_state=0))
+    with open(tmp_path / 'pipeline.pkl', 'wb') as f:
+        pickle.dump(pipeline, f)
+    registry = ModelRegistry(str(tmp_path / 'cache'))
+    registry.register('model', LocalFileFetcher(str(tmp_path / 'pipeline.pkl')))
+    sha = registry.resolve('model')[1]
+    compiled = tmp_path / 'cache' / 'compiled'
+    compiled.mkdir()
+    # A file in an older layout under the bare sha must not be picked up.
+    (compiled / f'{sha}.npz').write_bytes(b'stale')
+
+    fast = load_compiled('model', registry)
+    assert os.path.exists(compiled / f'{sha}.v{COMPILED_FORMAT}.npz')
+    assert np.max(np.abs(fast.predict(X.iloc[:50]) - pipeline.predict(X.iloc[:50]))) <= ATOL
+    assert isinstance(load_compiled('model', registry), FastPredictor)
@@ -0,0 +1,74 @@
+"""``real_estate.features`` against the notebooks' row-wise code and outputs."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.bench_features import (APARTMENTS, EXPECTED, SOURCE, TRANSFORMS, categorize_floor,
+                                       categorize_luxury, distance_values, synthetic)
+from real_estate import preprocessing
+
+
+def assert_same(name, old, new):
+    if isinstance(old, np.ndarray):
+        assert np.array_equal(old, new), f"{name} differs"
+    elif isinstance(old, pd.DataFrame):
+        pd.testing.assert_frame_equal(old.reset_index(drop=True), new.reset_index(drop=True), check_dtype=False,
+                                      obj=name)
+    else:
+        old, new = old.reset_index(drop=True), new.reset_index(drop=True)
+        same = (old == new) | (old.isna() & new.isna())
+        assert same.all(), f"{name} differs at rows {list(np.flatnonzero(~same)[:5])}"
+
+
+@pytest.fixture(scope='module')
+def source():
+    return pd.read_csv(SOURCE)
+
+
+@pytest.fixture(scope='module')
+def state(source):
+    return preprocessing.fit_features(source)
+
+
+@pytest.fixture(scope='module')
+def real(source, state):
+    """The real rows, with distance and facility texts from ``appartments.csv`` alongside."""
+    distances = distance_values()
+    facilities = pd.read_csv(APARTMENTS)['TopFacilities']
+    return source.assign(luxury_score=preprocessing.engineer_features(source, state)['luxury_score'],
+                         distance=distances.to_numpy()[np.arange(len(source)) % len(distances)],
+                         TopFacilities=facilities.to_numpy()[np.arange(len(source)) % len(facilities)])
+
+
+@pytest.fixture(scope='module', params=[False, True], ids=['repeated', 'distinct'])
+def synthetic_rows(request, real):
+    """20k rows drawn from the real ones; ``distinct`` makes every text value unique."""
+    return synthetic(real, distance_values(), pd.read_csv(APARTMENTS)['TopFacilities'], 20_000, request.param)
+
+
+def test_reproduces_flats_cleaned3(source, state):
+    expected = pd.read_csv(EXPECTED)
+    got = preprocessing.engineer_features(source, state)
+    columns = [c for c in expected.columns if c != 'furnishing_type']
+    pd.testing.assert_frame_equal(got[columns].reset_index(drop=True), expected[columns], check_dtype=False)
+    # The furnishing clusters may be numbered differently; the partition must agree.
+    pairs = pd.crosstab(got['furnishing_type'].to_numpy(), expected['furnishing_type'].to_numpy())
+    assert ((pairs > 0).sum(axis=1) == 1).all()
+
+
+def test_selection_categories_match_notebook(source, state):
+    got = preprocessing.engineer_features(source, state)
+    got = got.assign(floorNum=got['floorNum'].fillna(2.0))
+    selected = preprocessing.select_features(got)
+    assert_same('luxury_category', got['luxury_score'].apply(categorize_luxury), selected['luxury_category'])
+    assert_same('floor_category', got['floorNum'].apply(categorize_floor), selected['floor_category'])
+
+
+@pytest.mark.parametrize('name, old, new', TRANSFORMS, ids=[name for name, _, _ in TRANSFORMS])
+def test_transform_on_real_rows(real, state, name, old, new):
+    assert_same(name, old(real, state), new(real, state))
+
+
+@pytest.mark.parametrize('name, old, new', TRANSFORMS, ids=[name for name, _, _ in TRANSFORMS])
+def test_transform_on_synthetic_rows(synthetic_rows, state, name, old, new):
+    assert_same(name, old(synthetic_rows, state), new(synthetic_rows, state))
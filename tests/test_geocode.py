@@ -0,0 +1,61 @@
+"""Geocoder against the local Nominatim-style stub from the benchmark."""
+import asyncio
+
+import pytest
+
+from benchmarks.bench_geocode import start_stub
+from real_estate.geocode import GeocodeCache, Geocoder, NominatimBackend, format_coordinates, parse_coordinates
+
+LOCALITIES = 200
+
+
+def geocode_twice(cache_path, error_rate, retries=6):
+    """Cold then warm run over one cache: ``[(results, stats), (results, stats)]``."""
+    async def run():
+        runner, base_url = await start_stub(0.001, error_rate)
+        queries = [f'sector {n} gurgaon' for n in range(1, LOCALITIES + 1)]
+        cache = GeocodeCache(cache_path)
+        runs = []
+        try:
+            for _ in range(2):
+                geocoder = Geocoder(NominatimBackend(base_url), cache, concurrency=16, rate=0,
+                                    retries=retries, backoff=0.01)
+                runs.append((await geocoder.geocode_many(queries), geocoder.stats))
+        finally:
+            cache.close()
+            await runner.cleanup()
+        return runs
+
+    return asyncio.run(run())
+
+
+def test_cold_run_fetches_every_locality_and_warm_run_is_cached(tmp_path):
+    (cold, cold_stats), (warm, warm_stats) = geocode_twice(str(tmp_path / 'cache.sqlite'), error_rate=0.2)
+
+    assert cold_stats.retries > 0
+    assert cold_stats.failed == 0
+    assert cold_stats.fetched == LOCALITIES
+    assert cold_stats.not_found == LOCALITIES // 10
+    for n in range(1, LOCALITIES + 1):
+        expected = None if n % 10 == 0 else (28.3 + n * 1e-3, 76.9 + n * 1e-3)
+        assert cold[f'sector {n} gurgaon'] == pytest.approx(expected)
+
+    assert warm == cold
+    assert warm_stats.cache_hits == LOCALITIES
+    assert warm_stats.requests == 0
+
+
+def test_failures_are_reported_and_not_cached(tmp_path):
+    (cold, cold_stats), (warm, warm_stats) = geocode_twice(str(tmp_path / 'cache.sqlite'), error_rate=1.0,
+                                                           retries=1)
+
+    assert cold == {}
+    assert cold_stats.failed == LOCALITIES
+    assert cold_stats.requests == 2 * LOCALITIES
+    assert warm_stats.cache_hits == 0
+    assert warm_stats.failed == LOCALITIES
+
+
+def test_coordinates_round_trip():
+    assert parse_coordinates(format_coordinates(28.3663, -76.9456)) == (28.3663, -76.9456)
+    assert parse_coordinates('no answer') is None
@@ -0,0 +1,46 @@
+"""Held-out coverage of the conformal price intervals."""
+import numpy as np
+import pytest
+
+from real_estate.intervals import fit_intervals, out_of_sample_predictions
+
+SPLITS = 10
+TOLERANCE = 0.02
+
+
+@pytest.fixture(scope='module')
+def forest(fit_pipeline):
+    from sklearn.ensemble import RandomForestRegressor
+
+    return fit_pipeline(RandomForestRegressor(n_estimators=50, random_state=0, n_jobs=-1))
+
+
+def held_out_coverage(predictions, y, alpha):
+    """Mean coverage over random halves: calibrated on one, measured on the other."""
+    coverage = []
+    for seed in range(SPLITS):
+        order = np.random.default_rng(seed).permutation(len(y))
+        calib, test = order[:len(y) // 2], order[len(y) // 2:]
+        low, high = fit_intervals(predictions[calib], y[calib], alpha).log_bounds(predictions[test])
+        coverage.append(np.mean((y[test] >= low) & (y[test] <= high)))
+    return float(np.mean(coverage))
+
+
+@pytest.mark.parametrize('alpha', [0.1, 0.2])
+def test_out_of_bag_coverage(forest, training_data, alpha):
+    X, y = training_data
+    predictions, method = out_of_sample_predictions(forest, X, y, training_set=True)
+    assert method == 'oob'
+    assert abs(held_out_coverage(predictions, y, alpha) - (1 - alpha)) <= TOLERANCE
+
+
+def test_cross_validated_coverage_on_other_rows(fit_pipeline, training_data):
+    from sklearn.ensemble import RandomForestRegressor
+
+    X, y = training_data
+    order = np.random.default_rng(0).permutation(len(y))
+    forest = fit_pipeline(RandomForestRegressor(n_estimators=20, random_state=0, n_jobs=-1))
+    # Reordered rows are not the forest's training set: no out-of-bag shortcut.
+    predictions, method = out_of_sample_predictions(forest, X.iloc[order], y[order])
+    assert method == '5-fold'
+    assert abs(held_out_coverage(predictions, y[order], 0.1) - 0.9) <= TOLERANCE
@@ -0,0 +1,49 @@
+"""Recall@10 of ``FeatureIndex`` against the dense cosine path it replaced."""
+import numpy as np
+import pytest
+
+from benchmarks.bench_recommender_index import synthetic_features
+from real_estate.cities import cities
+from real_estate.recommender import DEFAULT_WEIGHTS, weight_vector
+from real_estate.recommender_index import FeatureIndex
+
+K = 10
+
+
+def dense_scores(index):
+    """The weighted sum of the notebook's N x N cosine matrices, self-matches excluded."""
+    blocks = [block.toarray() if hasattr(block, 'toarray') else np.asarray(block) for block in index.blocks]
+    weights = weight_vector(DEFAULT_WEIGHTS, index.block_names)
+    scores = sum(weight * (block @ block.T) for weight, block in zip(weights, blocks))
+    np.fill_diagonal(scores, -np.inf)
+    return scores
+
+
+def recall_at_k(index, mode, queries):
+    scores = dense_scores(index)
+    found, _ = index.search(queries, K, DEFAULT_WEIGHTS, mode=mode)
+    hits = sum(len(set(np.argsort(-scores[q], kind='stable')[:K].tolist()) & set(row.tolist()))
+               for q, row in zip(queries, found))
+    return hits / (len(queries) * K)
+
+
+@pytest.fixture(scope='module', params=['real', 'synthetic'])
+def index(request):
+    if request.param == 'real':
+        index = cities.get().recommender.index
+    else:
+        index = FeatureIndex.from_features(synthetic_features(3000), names=range(3000))
+    index.build_ivf(seed=0)
+    return index
+
+
+def queries(index, n=200):
+    return np.random.default_rng(1).choice(index.size, size=min(n, index.size), replace=False)
+
+
+def test_exact_search_matches_dense_path(index):
+    assert recall_at_k(index, 'exact', queries(index)) == 1.0
+
+
+def test_ivf_recall(index):
+    assert recall_at_k(index, 'ivf', queries(index)) >= 0.9